@@ -7,15 +7,95 @@ geometric operations, and conversions.
 
 Classes:
     Bbox: A class to represent a bounding box.
+    BboxArray: A columnar collection of bounding boxes backed by a NumPy array.
+    BboxView: A lightweight read-only view of one box of a BboxArray.
+    LazyBboxArray: A collection of boxes kept in their source format, converted on demand.
+    Deduplicator: A streaming filter of near-duplicate bounding boxes.
+    BboxKNN: An index answering k-nearest box queries from points or boxes.
+    BboxQuery: An index answering attribute range queries over a collection of boxes.
+    BoxStats: Streaming, mergeable dataset statistics over chunks of bounding boxes.
+    BoxStore: The bounding boxes of many images, grouped by image id in flat arrays.
+    SharedBoxStore: A read-only BoxStore in shared memory, for multiprocessing workers.
+    StreamingNMS: An incremental Non-Maximum Suppression over chunks of boxes.
+
+Modules:
+    profiling: Opt-in call counters and timings of the hot paths.
+    serialization: Compact binary and JSON serialization of lists of bounding boxes.
 
 Functions:
     nms: Perform Non-Maximum Suppression on a list of bounding boxes.
+    convert_dataset: Convert an annotation dataset between the COCO, YOLO and VOC formats.
+    dedupe: Remove exact and near-duplicate bounding boxes.
+    points_in_boxes: Check which points are inside which bounding boxes.
+    points_to_boxes_distance: Calculate the distance from many points to many bounding boxes.
+    nearest_box: Find the closest bounding box of many points, in bounded memory.
+    box_iou, box_giou, box_diou, box_ciou: Vectorized IoU metrics, pairwise or aligned.
+    rasterize: Paint bounding boxes into a mask, a count map or a heatmap.
+    pairwise, pairwise_topk, pairwise_threshold: Thread-parallel tiled pairwise kernels.
+    generate_anchors, match_anchors: Multi-scale anchor grids and anchor matching.
+    encode, decode: Vectorized conversions between boxes and anchor regression deltas.
+    crop_many: Crop every bounding box from an image, as views or as a resized batch.
 """
 
 from importlib.metadata import version as _version
 
+from . import profiling, serialization
+from .anchors import decode, encode, generate_anchors, match_anchors
 from .bbox import Bbox
-from .utils import nms
+from .bbox_array import BboxArray
+from .bbox_view import BboxView
+from .image import crop_many, rasterize
+from .knn import BboxKNN
+from .lazy import LazyBboxArray
+from .ops import (
+    box_ciou,
+    box_diou,
+    box_giou,
+    box_iou,
+    nearest_box,
+    points_in_boxes,
+    points_to_boxes_distance,
+)
+from .parallel import pairwise, pairwise_threshold, pairwise_topk
+from .pipeline import convert_dataset
+from .query import BboxQuery
+from .shared import SharedBoxStore
+from .stats import BoxStats
+from .store import BoxStore
+from .utils import Deduplicator, StreamingNMS, dedupe, nms
 
 __version__ = _version("easy-bbox")
-__all__ = ["Bbox", "nms"]
+__all__ = [
+    "Bbox",
+    "BboxArray",
+    "BboxKNN",
+    "BboxQuery",
+    "BboxView",
+    "BoxStats",
+    "BoxStore",
+    "Deduplicator",
+    "LazyBboxArray",
+    "SharedBoxStore",
+    "StreamingNMS",
+    "box_ciou",
+    "box_diou",
+    "box_giou",
+    "box_iou",
+    "convert_dataset",
+    "crop_many",
+    "decode",
+    "dedupe",
+    "encode",
+    "generate_anchors",
+    "match_anchors",
+    "nearest_box",
+    "nms",
+    "pairwise",
+    "pairwise_threshold",
+    "pairwise_topk",
+    "points_in_boxes",
+    "points_to_boxes_distance",
+    "profiling",
+    "rasterize",
+    "serialization",
+]
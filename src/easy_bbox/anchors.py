@@ -0,0 +1,280 @@
+"""
+anchors.py
+
+Anchor-based detection helpers working on whole arrays: multi-scale anchor grid generation,
+anchor to ground truth matching, and encoding of boxes as regression deltas.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .bbox_array import BboxArray
+from .ops import Boxes, _as_box_data, box_iou
+
+MATCH_NEGATIVE = -1
+MATCH_IGNORE = -2
+
+# Default bound of the decoded (dw, dh), preventing exp overflows on bad predictions
+DEFAULT_DELTA_CLAMP = math.log(1000.0 / 16)
+
+
+def generate_anchors(
+    feature_sizes: Sequence[Tuple[int, int]],
+    strides: Sequence[float],
+    scales: Union[Sequence[float], Sequence[Sequence[float]]],
+    aspect_ratios: Sequence[float] = (0.5, 1.0, 2.0),
+    offset: float = 0.5,
+) -> BboxArray:
+    """
+    Generates the anchors of a multi-level feature pyramid.
+
+    At each level, an anchor of every scale and aspect ratio is centered on each cell of
+    the (width, height) feature map, at `((x + offset) * stride, (y + offset) * stride)`.
+    An anchor of scale s and aspect ratio r has an area of s^2 and a width over height of
+    r. Anchors are ordered by level, then by cell (row-major), then by scale and aspect
+    ratio.
+
+    Args:
+        feature_sizes (Sequence[Tuple[int, int]]): The (width, height) of the feature map
+            of each level.
+        strides (Sequence[float]): The stride in pixels of each level.
+        scales (Union[Sequence[float], Sequence[Sequence[float]]]): The anchor scales in
+            pixels, either one sequence per level or a single sequence for all levels.
+        aspect_ratios (Sequence[float], optional): The anchor aspect ratios (width over
+            height). Defaults to (0.5, 1.0, 2.0).
+        offset (float, optional): The position of the anchor centers in the cells, 0.5 for
+            the cell centers. Defaults to 0.5.
+
+    Returns:
+        BboxArray: The anchors, in pixels.
+
+    Raises:
+        ValueError: If the number of levels is inconsistent, or if a scale or an aspect
+            ratio is not positive.
+
+    Example:
+        >>> anchors = generate_anchors([(100, 80), (50, 40)], [8, 16], [[32], [64]])
+        >>> len(anchors)
+        30000
+    """
+    num_levels = len(feature_sizes)
+    if len(strides) != num_levels:
+        raise ValueError("The length of feature_sizes and strides must be the same.")
+    if scales and np.ndim(scales[0]) == 0:
+        scales = [scales] * num_levels  # type: ignore[assignment]
+    if len(scales) != num_levels:
+        raise ValueError("There must be one sequence of scales per level.")
+    ratios = np.asarray(aspect_ratios, dtype=np.float64)
+    if np.any(ratios <= 0):
+        raise ValueError("The aspect ratios must be positive.")
+
+    levels = [np.zeros((0, 4))]
+    for (width, height), stride, level_scales in zip(feature_sizes, strides, scales):
+        sizes = np.asarray(level_scales, dtype=np.float64)
+        if np.any(sizes <= 0):
+            raise ValueError("The scales must be positive.")
+        # (S * R, 2) half sizes of the base anchors
+        sqrt_ratios = np.sqrt(ratios)
+        half_w = (sizes[:, None] * sqrt_ratios[None, :]).ravel() / 2
+        half_h = (sizes[:, None] / sqrt_ratios[None, :]).ravel() / 2
+        base = np.stack((-half_w, -half_h, half_w, half_h), axis=1)
+
+        xs = (np.arange(width) + offset) * stride
+        ys = (np.arange(height) + offset) * stride
+        cx, cy = np.meshgrid(xs, ys)
+        centers = np.stack((cx, cy, cx, cy), axis=-1).reshape(-1, 1, 4)
+        levels.append((centers + base[None]).reshape(-1, 4))
+
+    return BboxArray._wrap(np.concatenate(levels))
+
+
+def match_anchors(
+    anchors: Boxes,
+    gt_boxes: Boxes,
+    pos_threshold: float = 0.5,
+    neg_threshold: float = 0.4,
+    allow_low_quality_matches: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Assigns each anchor to the ground truth box it overlaps the most.
+
+    An anchor whose best IoU is at least `pos_threshold` is positive and matched to its
+    best ground truth box. It is negative (`MATCH_NEGATIVE`) if its best IoU is below
+    `neg_threshold`, and ignored (`MATCH_IGNORE`) in between.
+
+    With `allow_low_quality_matches`, the anchors having the highest IoU with some ground
+    truth box are also positive, even below `pos_threshold`, so that every ground truth
+    box overlapping an anchor gets at least one match. They are matched to their own best
+    ground truth box.
+
+    Args:
+        anchors (Boxes): The A anchors.
+        gt_boxes (Boxes): The G ground truth boxes.
+        pos_threshold (float, optional): The minimal IoU of positive anchors.
+            Defaults to 0.5.
+        neg_threshold (float, optional): The IoU under which anchors are negative.
+            Defaults to 0.4.
+        allow_low_quality_matches (bool, optional): Whether to also match the best anchors
+            of each ground truth box. Defaults to True.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (A,) index of the ground truth box matched to
+        each anchor, or `MATCH_NEGATIVE` or `MATCH_IGNORE`, and the (A,) best IoU of each
+        anchor.
+
+    Raises:
+        ValueError: If `neg_threshold` is greater than `pos_threshold`.
+    """
+    if neg_threshold > pos_threshold:
+        raise ValueError(
+            f"neg_threshold ({neg_threshold}) cannot be greater than pos_threshold "
+            f"({pos_threshold})."
+        )
+    anchor_data = _as_box_data(anchors)
+    gt_data = _as_box_data(gt_boxes)
+    if not len(gt_data):
+        return (
+            np.full(len(anchor_data), MATCH_NEGATIVE, dtype=np.int64),
+            np.zeros(len(anchor_data)),
+        )
+
+    iou = box_iou(BboxArray._wrap(anchor_data), BboxArray._wrap(gt_data))
+    best_gt = iou.argmax(axis=1)
+    best_iou = iou[np.arange(len(anchor_data)), best_gt]
+
+    matches = np.where(best_iou >= pos_threshold, best_gt, MATCH_IGNORE)
+    matches[best_iou < neg_threshold] = MATCH_NEGATIVE
+
+    if allow_low_quality_matches and len(anchor_data):
+        best_per_gt = iou.max(axis=0)
+        candidates = (iou == best_per_gt[None, :]) & (best_per_gt[None, :] > 0)
+        low_quality = candidates.any(axis=1)
+        matches[low_quality] = best_gt[low_quality]
+
+    return matches, best_iou
+
+
+def encode(
+    boxes: Boxes,
+    anchors: Boxes,
+    weights: Sequence[float] = (1.0, 1.0, 1.0, 1.0),
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Encodes boxes as (dx, dy, dw, dh) regression deltas relative to their anchors.
+
+    With (cx, cy, w, h) the center and size of a box, and (ax, ay, aw, ah) those of its
+    anchor: `dx = wx * (cx - ax) / aw`, `dy = wy * (cy - ay) / ah`, `dw = ww * log(w / aw)`
+    and `dh = wh * log(h / ah)`. Anchors must have a positive width and height.
+
+    Args:
+        boxes (Boxes): The N target bounding boxes.
+        anchors (Boxes): The N anchors.
+        weights (Sequence[float], optional): The (wx, wy, ww, wh) weights of the deltas.
+            Defaults to (1.0, 1.0, 1.0, 1.0).
+        out (Optional[np.ndarray], optional): A float64 (N, 4) array to write the deltas
+            into. Defaults to None.
+
+    Returns:
+        np.ndarray: The (N, 4) deltas.
+
+    Raises:
+        ValueError: If the lengths of the boxes and anchors do not match, or if `out`
+            does not have the expected shape and dtype.
+    """
+    data = _as_box_data(boxes)
+    anchor_data = _as_box_data(anchors)
+    if len(data) != len(anchor_data):
+        raise ValueError("The length of boxes and anchors must be the same.")
+    out = _check_out(out, len(data))
+    wx, wy, ww, wh = weights
+
+    anchor_size = anchor_data[:, 2:] - anchor_data[:, :2]
+    anchor_center = anchor_data[:, :2] + anchor_size / 2
+    size = data[:, 2:] - data[:, :2]
+    center = data[:, :2] + size / 2
+
+    np.divide(center - anchor_center, anchor_size, out=out[:, :2])
+    with np.errstate(divide="ignore"):
+        np.log(size / anchor_size, out=out[:, 2:])
+    out *= (wx, wy, ww, wh)
+    return out
+
+
+def decode(
+    deltas: ArrayLike,
+    anchors: Boxes,
+    weights: Sequence[float] = (1.0, 1.0, 1.0, 1.0),
+    clamp: Optional[float] = DEFAULT_DELTA_CLAMP,
+    out: Optional[np.ndarray] = None,
+) -> BboxArray:
+    """
+    Decodes (dx, dy, dw, dh) regression deltas into boxes, the inverse of `encode`.
+
+    The result is a `BboxArray`, so that decoding can be followed by `clip_to_img` and the
+    other bulk operations without creating any `Bbox`.
+
+    Args:
+        deltas (ArrayLike): The (N, 4) deltas.
+        anchors (Boxes): The N anchors.
+        weights (Sequence[float], optional): The (wx, wy, ww, wh) weights used to encode
+            the deltas. Defaults to (1.0, 1.0, 1.0, 1.0).
+        clamp (Optional[float], optional): The upper bound of the unweighted dw and dh,
+            None for no bound. Defaults to log(1000 / 16).
+        out (Optional[np.ndarray], optional): A float64 (N, 4) array to write the boxes
+            into, which then backs the returned `BboxArray`. It may be the deltas array
+            itself. Defaults to None.
+
+    Returns:
+        BboxArray: The decoded boxes.
+
+    Raises:
+        ValueError: If the deltas do not have shape (N, 4), if the lengths of the deltas
+            and anchors do not match, or if `out` does not have the expected shape and
+            dtype.
+    """
+    delta_data = np.asarray(deltas, dtype=np.float64)
+    if delta_data.ndim != 2 or delta_data.shape[1] != 4:
+        raise ValueError(
+            f"An array of shape {delta_data.shape} has been passed. "
+            "Need an array of shape (N, 4)."
+        )
+    anchor_data = _as_box_data(anchors)
+    if len(delta_data) != len(anchor_data):
+        raise ValueError("The length of deltas and anchors must be the same.")
+    out = _check_out(out, len(delta_data))
+
+    anchor_size = anchor_data[:, 2:] - anchor_data[:, :2]
+    anchor_center = anchor_data[:, :2] + anchor_size / 2
+    scaled = delta_data / np.asarray(weights, dtype=np.float64)
+    size_deltas = scaled[:, 2:]
+    if clamp is not None:
+        size_deltas = np.minimum(size_deltas, clamp)
+
+    center = anchor_center + scaled[:, :2] * anchor_size
+    half_size = np.exp(size_deltas) * anchor_size / 2
+    np.subtract(center, half_size, out=out[:, :2])
+    np.add(center, half_size, out=out[:, 2:])
+    return BboxArray._wrap(out)
+
+
+def _check_out(out: Optional[np.ndarray], length: int) -> np.ndarray:
+    """
+    Returns `out`, or a new (length, 4) float64 array if it is None.
+
+    Raises:
+        ValueError: If `out` does not have shape (length, 4) and dtype float64.
+    """
+    if out is None:
+        return np.empty((length, 4))
+    if out.shape != (length, 4) or out.dtype != np.float64:
+        raise ValueError(
+            f"`out` must be a float64 array of shape {(length, 4)}. "
+            f"Received {out.dtype} {out.shape}."
+        )
+    return out
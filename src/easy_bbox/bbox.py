@@ -627,10 +627,30 @@ class Bbox(BaseModel):
         """The aspect ratio of the Bbox (width over height)."""
         return self.width / self.height
 
+    def __reduce_ex__(self, protocol):
+        """
+        Pickles a Bbox as its four coordinates only, rebuilt without validation.
+
+        Subclasses may hold other fields, and use the default Pydantic pickling instead.
+        """
+        if type(self) is not Bbox:
+            return super().__reduce_ex__(protocol)
+        return _trusted_bbox, (self.left, self.top, self.right, self.bottom)
+
     __or__ = union
     __and__ = intersection
 
 
+def _trusted_bbox(left: float, top: float, right: float, bottom: float) -> Bbox:
+    """
+    Builds a Bbox from trusted coordinates, skipping Pydantic validation.
+
+    The coordinates must be floats describing a valid box, e.g. coming from an already
+    validated Bbox or BboxArray.
+    """
+    return Bbox.model_construct(left=left, top=top, right=right, bottom=bottom)
+
+
 def _assert_sequence_len(seq: Sequence[float], target_len: int = 4) -> None:
     """
     Asserts that the length of the sequence is 4.
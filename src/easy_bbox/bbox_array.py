@@ -0,0 +1,834 @@
+"""
+bbox_array.py
+
+Provides the `BboxArray` class, a columnar collection of bounding boxes backed by a single
+NumPy array. It mirrors the conversion API of `Bbox` but works on whole collections at once,
+without creating one Pydantic model per box.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+import numpy as np
+from numpy.typing import ArrayLike, DTypeLike
+
+from .bbox import Bbox
+from .bbox_view import BboxView
+
+
+class BboxArray:
+    """
+    A collection of N bounding boxes stored as an (N, 4) NumPy array.
+
+    Like `Bbox`, boxes are stored in Pascal_VOC format: (left, top, right, bottom) with a
+    top-left origin, and the bottom and right edges are considered excluded from the box.
+
+    Indexing with an integer returns a `Bbox`, while indexing with a slice, a boolean mask or
+    an index array returns a new `BboxArray`. To read a few elements of a large collection,
+    `view` and `views` return lightweight `BboxView` objects instead, which expose the same
+    read API as `Bbox` without building Pydantic models.
+
+    Coordinates are stored as float64 by default. Integer pixel boxes can be stored as int32
+    or int16 instead, which divides the memory footprint by 2 or 4 and makes `clip_to_img`
+    and cropping (see `to_slices`) exact. Derived quantities (width, area, ...) of integer
+    boxes are computed in int64 so that they cannot overflow.
+
+    Float coordinates can also be stored as float32, which halves the memory footprint and
+    bandwidth. Derived quantities and the kernels of `ops` are then computed in float32,
+    with a relative error of about 1e-7 (integers up to 2**24 are exact). Validity is
+    checked before rounding to float32: since rounding preserves the order of the
+    coordinates, valid boxes stay valid, but boxes thinner than the float32 resolution
+    may become empty.
+
+    Invalid boxes raise a ValueError on construction, unless `validate=False` is passed: the
+    check is then deferred to `invalid_mask` and `repair`, which handle whole batches of
+    untrusted boxes without per-box exception handling.
+
+    Attributes:
+        data (np.ndarray): The (N, 4) array of (left, top, right, bottom) coordinates.
+        dtype (np.dtype): The dtype of the coordinates.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(
+        self, data: ArrayLike, dtype: Optional[DTypeLike] = None, validate: bool = True
+    ) -> None:
+        """
+        Initializes the collection from an (N, 4) array-like in Pascal VOC format.
+
+        Args:
+            data (ArrayLike): The (left, top, right, bottom) coordinates of the boxes.
+            dtype (Optional[DTypeLike], optional): The storage dtype, one of float64,
+                float32, int32 and int16. If None, float64 is used. Defaults to None.
+            validate (bool, optional): Whether to raise if a box is not valid. When False,
+                the collection may hold invalid boxes until `repair` is called.
+                Defaults to True.
+
+        Raises:
+            ValueError: If the data does not have shape (N, 4), if any box is not valid
+                (ie `left > right`, `top > bottom`, or a NaN or infinite coordinate), or
+                if an integer dtype is requested for coordinates that are not integers or
+                do not fit in it.
+        """
+        dtype = _resolve_dtype(dtype)
+        arr = _as_coords(data, dtype)
+        if validate and np.any(_invalid_mask(arr)):
+            raise ValueError(
+                "The BboxArray contains invalid Bboxes (negative width or height, or "
+                "non-finite coordinates)."
+            )
+        self._data = _to_storage(arr, dtype)
+
+    @classmethod
+    def _wrap(cls, data: np.ndarray) -> BboxArray:
+        """Wraps an already validated (N, 4) array without copying nor checking it."""
+        obj = cls.__new__(cls)
+        obj._data = data
+        return obj
+
+    # region From methods
+    @classmethod
+    def from_tlbr(
+        cls, tlbr: ArrayLike, dtype: Optional[DTypeLike] = None, validate: bool = True
+    ) -> BboxArray:
+        """
+        Initializes the collection from top-left and bottom-right coordinates.
+
+        Args:
+            tlbr (ArrayLike): An (N, 4) array-like in the format (left, top, right, bottom).
+            dtype (Optional[DTypeLike], optional): The storage dtype.
+                Defaults to None (float64).
+            validate (bool, optional): Whether to raise if a box is not valid.
+                Defaults to True.
+
+        Returns:
+            BboxArray: The BboxArray instance.
+
+        Raises:
+            ValueError: If the data does not have shape (N, 4), or if any box is not valid.
+
+        Example:
+            >>> boxes = BboxArray.from_tlbr([(10, 20, 30, 40), (0, 0, 5, 5)])
+            >>> len(boxes)
+            2
+        """
+        return cls(tlbr, dtype, validate)
+
+    @classmethod
+    def from_tlwh(
+        cls, tlwh: ArrayLike, dtype: Optional[DTypeLike] = None, validate: bool = True
+    ) -> BboxArray:
+        """
+        Initializes the collection from top-left and width-height coordinates.
+
+        Args:
+            tlwh (ArrayLike): An (N, 4) array-like in the format (left, top, width, height).
+            dtype (Optional[DTypeLike], optional): The storage dtype.
+                Defaults to None (float64).
+            validate (bool, optional): Whether to raise if a box is not valid.
+                Defaults to True.
+
+        Returns:
+            BboxArray: The BboxArray instance.
+
+        Raises:
+            ValueError: If the data does not have shape (N, 4), or if any box is not valid
+                (ie `width < 0` or `height < 0`).
+        """
+        dtype = _resolve_dtype(dtype)
+        arr = _as_coords(tlwh, dtype).copy()
+        arr[:, 2:] += arr[:, :2]
+        return cls(arr, dtype, validate)
+
+    @classmethod
+    def from_cwh(
+        cls, cwh: ArrayLike, dtype: Optional[DTypeLike] = None, validate: bool = True
+    ) -> BboxArray:
+        """
+        Initializes the collection from center and width-height coordinates.
+
+        Args:
+            cwh (ArrayLike): An (N, 4) array-like in the format (center_x, center_y, width,
+                height).
+            dtype (Optional[DTypeLike], optional): The storage dtype.
+                Defaults to None (float64).
+            validate (bool, optional): Whether to raise if a box is not valid.
+                Defaults to True.
+
+        Returns:
+            BboxArray: The BboxArray instance.
+
+        Raises:
+            ValueError: If the data does not have shape (N, 4), or if any box is not valid
+                (ie `width < 0` or `height < 0`).
+        """
+        arr = _as_coords(cwh)
+        half = arr[:, 2:] / 2
+        return cls(
+            np.concatenate((arr[:, :2] - half, arr[:, :2] + half), axis=1),
+            dtype,
+            validate,
+        )
+
+    @classmethod
+    def from_norm_tlbr(
+        cls,
+        tlbr: ArrayLike,
+        img_w: ArrayLike,
+        img_h: ArrayLike,
+        dtype: Optional[DTypeLike] = None,
+        validate: bool = True,
+    ) -> BboxArray:
+        """
+        Initializes the collection from normalized top-left and bottom-right coordinates.
+
+        Args:
+            tlbr (ArrayLike): An (N, 4) array-like of NORMALIZED (left, top, right, bottom).
+            img_w (ArrayLike): The image width in pixels, either a scalar or one per box.
+            img_h (ArrayLike): The image height in pixels, either a scalar or one per box.
+            dtype (Optional[DTypeLike], optional): The storage dtype.
+                Defaults to None (float64).
+            validate (bool, optional): Whether to raise if a box is not valid.
+                Defaults to True.
+
+        Returns:
+            BboxArray: The BboxArray instance.
+        """
+        return cls.from_tlbr(
+            _as_coords(tlbr) * _scale_factors(img_w, img_h), dtype, validate
+        )
+
+    @classmethod
+    def from_norm_tlwh(
+        cls,
+        tlwh: ArrayLike,
+        img_w: ArrayLike,
+        img_h: ArrayLike,
+        dtype: Optional[DTypeLike] = None,
+        validate: bool = True,
+    ) -> BboxArray:
+        """
+        Initializes the collection from normalized top-left and width-height coordinates.
+
+        Args:
+            tlwh (ArrayLike): An (N, 4) array-like of NORMALIZED (left, top, width, height).
+            img_w (ArrayLike): The image width in pixels, either a scalar or one per box.
+            img_h (ArrayLike): The image height in pixels, either a scalar or one per box.
+            dtype (Optional[DTypeLike], optional): The storage dtype.
+                Defaults to None (float64).
+            validate (bool, optional): Whether to raise if a box is not valid.
+                Defaults to True.
+
+        Returns:
+            BboxArray: The BboxArray instance.
+        """
+        return cls.from_tlwh(
+            _as_coords(tlwh) * _scale_factors(img_w, img_h), dtype, validate
+        )
+
+    @classmethod
+    def from_norm_cwh(
+        cls,
+        cwh: ArrayLike,
+        img_w: ArrayLike,
+        img_h: ArrayLike,
+        dtype: Optional[DTypeLike] = None,
+        validate: bool = True,
+    ) -> BboxArray:
+        """
+        Initializes the collection from normalized center and width-height coordinates.
+
+        Args:
+            cwh (ArrayLike): An (N, 4) array-like of NORMALIZED (center_x, center_y, width,
+                height).
+            img_w (ArrayLike): The image width in pixels, either a scalar or one per box.
+            img_h (ArrayLike): The image height in pixels, either a scalar or one per box.
+            dtype (Optional[DTypeLike], optional): The storage dtype.
+                Defaults to None (float64).
+            validate (bool, optional): Whether to raise if a box is not valid.
+                Defaults to True.
+
+        Returns:
+            BboxArray: The BboxArray instance.
+        """
+        return cls.from_cwh(
+            _as_coords(cwh) * _scale_factors(img_w, img_h), dtype, validate
+        )
+
+    @classmethod
+    def from_masks(cls, masks: ArrayLike, dtype: DTypeLike = np.int32) -> BboxArray:
+        """
+        Initializes the collection from the tight boxes of a stack of instance masks.
+
+        The box of a mask spans its nonzero pixels, with the right and bottom edges
+        excluded, so that `mask[top:bottom, left:right]` (see `to_slices`) contains all of
+        them. It is computed from the row and column any-reductions of the mask, without
+        listing its pixels. An empty mask, including one with a zero height or width, gives
+        the (0, 0, 0, 0) box.
+
+        Args:
+            masks (ArrayLike): The (N, H, W) stack of masks, nonzero inside the instances.
+            dtype (DTypeLike, optional): The storage dtype. Defaults to int32.
+
+        Returns:
+            BboxArray: The BboxArray instance.
+
+        Raises:
+            ValueError: If the masks do not have shape (N, H, W).
+
+        Example:
+            >>> masks = np.zeros((1, 10, 10), dtype=bool)
+            >>> masks[0, 2:5, 3:8] = True
+            >>> BboxArray.from_masks(masks).data
+            array([[3, 2, 8, 5]], dtype=int32)
+        """
+        arr = np.asarray(masks)
+        if arr.ndim != 3:
+            raise ValueError(
+                f"An array of shape {arr.shape} has been passed. "
+                "Need an array of shape (N, H, W)."
+            )
+        if not arr.shape[1] or not arr.shape[2]:
+            return cls(np.zeros((len(arr), 4)), dtype)
+        rows = arr.any(axis=2)
+        cols = arr.any(axis=1)
+        data = np.stack(
+            (
+                cols.argmax(axis=1),
+                rows.argmax(axis=1),
+                cols.shape[1] - cols[:, ::-1].argmax(axis=1),
+                rows.shape[1] - rows[:, ::-1].argmax(axis=1),
+            ),
+            axis=1,
+        )
+        data[~rows.any(axis=1)] = 0
+        return cls(data, dtype)
+
+    @classmethod
+    def from_polygons(
+        cls, polygons: Sequence[ArrayLike], dtype: Optional[DTypeLike] = None
+    ) -> BboxArray:
+        """
+        Initializes the collection from the bounding boxes of polygons.
+
+        The polygons may have different numbers of vertices: they are concatenated and
+        reduced all at once. A polygon without vertices gives the (0, 0, 0, 0) box.
+
+        Args:
+            polygons (Sequence[ArrayLike]): The N polygons, each either a (K, 2) array of
+                (x, y) vertices or a flat `[x0, y0, x1, y1, ...]` sequence as in COCO.
+            dtype (Optional[DTypeLike], optional): The storage dtype.
+                Defaults to None (float64).
+
+        Returns:
+            BboxArray: The BboxArray instance.
+
+        Raises:
+            ValueError: If a polygon has an odd number of coordinates.
+
+        Example:
+            >>> boxes = BboxArray.from_polygons([[0, 0, 4, 1, 2, 3], [(5, 5), (6, 9)]])
+            >>> boxes.data
+            array([[0., 0., 4., 3.],
+                   [5., 5., 6., 9.]])
+        """
+        flat = [np.asarray(polygon, dtype=np.float64).ravel() for polygon in polygons]
+        sizes = np.array([len(coords) for coords in flat], dtype=np.int64)
+        if np.any(sizes % 2):
+            raise ValueError("The polygons must have an even number of coordinates.")
+
+        data = np.zeros((len(flat), 4))
+        nonempty = sizes > 0
+        if np.any(nonempty):
+            points = np.concatenate(flat).reshape(-1, 2)
+            starts = np.concatenate(([0], np.cumsum(sizes[nonempty] // 2)[:-1]))
+            data[nonempty, :2] = np.minimum.reduceat(points, starts)
+            data[nonempty, 2:] = np.maximum.reduceat(points, starts)
+        return cls(data, dtype)
+
+    @classmethod
+    def from_bboxes(
+        cls, bboxes: Sequence[Bbox], dtype: Optional[DTypeLike] = None
+    ) -> BboxArray:
+        """
+        Initializes the collection from a sequence of `Bbox`.
+
+        Args:
+            bboxes (Sequence[Bbox]): The bounding boxes.
+            dtype (Optional[DTypeLike], optional): The storage dtype.
+                Defaults to None (float64).
+
+        Returns:
+            BboxArray: The BboxArray instance.
+        """
+        data = np.array([b.to_tlbr() for b in bboxes], dtype=np.float64).reshape(-1, 4)
+        if dtype is None:
+            return cls._wrap(data)
+        return cls(data, dtype)
+
+    from_xyxy = from_tlbr
+    from_pascal_voc = from_tlbr
+    from_coco = from_tlwh
+    from_albu = from_norm_tlbr
+    from_yolo = from_norm_cwh
+
+    # endregion
+
+    # region To methods
+    def to_tlbr(self) -> np.ndarray:
+        """Returns the (N, 4) array of (left, top, right, bottom) coordinates."""
+        return self._data.copy()
+
+    def to_tlwh(self) -> np.ndarray:
+        """Returns the (N, 4) array of (left, top, width, height) coordinates."""
+        out = self._wide()
+        out[:, 2:] -= out[:, :2]
+        return out
+
+    def to_cwh(self) -> np.ndarray:
+        """Returns the (N, 4) array of (center_x, center_y, width, height) coordinates."""
+        wide = self._wide()
+        tl = wide[:, :2]
+        br = wide[:, 2:]
+        return np.concatenate(((tl + br) / 2, br - tl), axis=1)
+
+    def to_norm_tlbr(self, img_w: ArrayLike, img_h: ArrayLike) -> np.ndarray:
+        """
+        Returns the (N, 4) array of (left, top, right, bottom) coordinates, normalized based
+        on the image dimensions.
+
+        Args:
+            img_w (ArrayLike): The image width in pixels, either a scalar or one per box.
+            img_h (ArrayLike): The image height in pixels, either a scalar or one per box.
+        """
+        return self._data / _scale_factors(img_w, img_h)
+
+    def to_norm_tlwh(self, img_w: ArrayLike, img_h: ArrayLike) -> np.ndarray:
+        """
+        Returns the (N, 4) array of (left, top, width, height) coordinates, normalized based
+        on the image dimensions.
+
+        Args:
+            img_w (ArrayLike): The image width in pixels, either a scalar or one per box.
+            img_h (ArrayLike): The image height in pixels, either a scalar or one per box.
+        """
+        return self.to_tlwh() / _scale_factors(img_w, img_h)
+
+    def to_norm_cwh(self, img_w: ArrayLike, img_h: ArrayLike) -> np.ndarray:
+        """
+        Returns the (N, 4) array of (center_x, center_y, width, height) coordinates,
+        normalized based on the image dimensions.
+
+        Args:
+            img_w (ArrayLike): The image width in pixels, either a scalar or one per box.
+            img_h (ArrayLike): The image height in pixels, either a scalar or one per box.
+        """
+        return self.to_cwh() / _scale_factors(img_w, img_h)
+
+    def to_bboxes(self) -> List[Bbox]:
+        """Returns the boxes as a list of `Bbox`."""
+        return [
+            Bbox(left=left, top=top, right=right, bottom=bottom)
+            for left, top, right, bottom in self._data.tolist()
+        ]
+
+    to_pascal_voc = to_tlbr
+    to_xyxy = to_tlbr
+    to_albu = to_norm_tlbr
+    to_coco = to_tlwh
+    to_yolo = to_norm_cwh
+
+    # endregion
+
+    def clip_to_img(self, img_w: ArrayLike, img_h: ArrayLike) -> BboxArray:
+        """
+        Returns the boxes clipped to the image dimensions.
+
+        Like `Bbox.clip_to_img`, the bottom and right edges are considered excluded, so
+        they are clipped to `img_w` and `img_h` respectively. Boxes lying fully outside of the
+        image collapse to zero-area boxes on its border instead of raising.
+
+        The storage dtype is preserved, so integer boxes stay exact.
+
+        Args:
+            img_w (ArrayLike): The image width in pixels, either a scalar or one per box.
+            img_h (ArrayLike): The image height in pixels, either a scalar or one per box.
+
+        Returns:
+            BboxArray: The clipped boxes.
+        """
+        upper = _scale_factors(img_w, img_h)
+        clipped = np.clip(self._data, 0, upper).astype(self._data.dtype, copy=False)
+        return BboxArray._wrap(clipped)
+
+    def invalid_mask(self) -> np.ndarray:
+        """
+        Returns the (N,) boolean mask of the invalid boxes (ie `left > right`,
+        `top > bottom`, or a NaN or infinite coordinate), computed in a single vectorized
+        pass.
+
+        Only collections built with `validate=False` can contain invalid boxes.
+        """
+        return _invalid_mask(self._data)
+
+    def repair(self, policy: str = "drop") -> Tuple[BboxArray, np.ndarray]:
+        """
+        Repairs the invalid boxes of a collection built with `validate=False`.
+
+        The available policies are:
+
+        - `"drop"`: invalid boxes are removed.
+        - `"swap"`: inverted coordinates are swapped, so that `left <= right` and
+          `top <= bottom`.
+        - `"clip"`: negative widths and heights are clipped to 0, by moving the right and
+          bottom edges onto the left and top ones.
+
+        Boxes with a NaN or infinite coordinate cannot be repaired, and are removed by every
+        policy.
+
+        Args:
+            policy (str, optional): The repair policy. Defaults to "drop".
+
+        Returns:
+            Tuple[BboxArray, np.ndarray]: The valid boxes and the (N,) boolean mask of the
+            boxes that were invalid.
+
+        Raises:
+            ValueError: If the policy is unknown.
+
+        Example:
+            >>> raw = BboxArray.from_coco([(0, 0, 10, 10), (5, 5, -2, 3)], validate=False)
+            >>> boxes, invalid = raw.repair("drop")
+            >>> len(boxes), invalid.tolist()
+            (1, [False, True])
+        """
+        if policy not in REPAIR_POLICIES:
+            raise ValueError(
+                f"Unknown repair policy {policy!r}. Expected one of {REPAIR_POLICIES}."
+            )
+        invalid = _invalid_mask(self._data)
+        data = self._data
+        if policy != "drop":
+            data = data[np.isfinite(data).all(axis=1)]
+        if policy == "drop":
+            repaired = data[~invalid]
+        elif policy == "swap":
+            repaired = np.concatenate(
+                (
+                    np.minimum(data[:, :2], data[:, 2:]),
+                    np.maximum(data[:, :2], data[:, 2:]),
+                ),
+                axis=1,
+            )
+        else:
+            repaired = np.concatenate(
+                (data[:, :2], np.maximum(data[:, :2], data[:, 2:])), axis=1
+            )
+        return BboxArray._wrap(repaired), invalid
+
+    def astype(self, dtype: DTypeLike) -> BboxArray:
+        """
+        Returns a copy of the boxes stored with another dtype.
+
+        Args:
+            dtype (DTypeLike): The storage dtype, one of float64, float32, int32 and
+                int16.
+
+        Returns:
+            BboxArray: The converted boxes.
+
+        Raises:
+            ValueError: If an integer dtype is requested for coordinates that are not
+                integers or do not fit in it.
+        """
+        dtype = _resolve_dtype(dtype)
+        return BboxArray._wrap(_to_storage(_as_coords(self._data, dtype), dtype).copy())
+
+    def to_pixels(self, dtype: DTypeLike = np.int32) -> BboxArray:
+        """
+        Returns the smallest integer boxes containing these boxes.
+
+        Left and top coordinates are floored, while the (excluded) right and bottom ones
+        are ceiled, so that every pixel touched by a box belongs to its integer box.
+
+        Args:
+            dtype (DTypeLike, optional): The integer storage dtype, int32 or int16.
+                Defaults to int32.
+
+        Returns:
+            BboxArray: The integer boxes.
+
+        Raises:
+            ValueError: If the dtype is not an integer one, or if the coordinates do not fit
+                in it.
+        """
+        dtype = _resolve_dtype(dtype)
+        if dtype.kind != "i":
+            raise ValueError(f"Pixel boxes need an integer dtype. Received {dtype}.")
+        data = np.concatenate(
+            (np.floor(self._data[:, :2]), np.ceil(self._data[:, 2:])), axis=1
+        )
+        return BboxArray(data, dtype)
+
+    def to_slices(self) -> List[Tuple[slice, slice]]:
+        """
+        Returns the (rows, columns) slices of each box, to crop images with `image[s]`.
+
+        The right and bottom edges are excluded, as for array slicing. The boxes should be
+        clipped to the image first, since negative coordinates would wrap around.
+
+        Returns:
+            List[Tuple[slice, slice]]: The slices of each box.
+
+        Raises:
+            ValueError: If the boxes are not stored with an integer dtype.
+        """
+        if self._data.dtype.kind != "i":
+            raise ValueError(
+                "Only integer boxes can be converted to slices. Use `to_pixels` first."
+            )
+        return [
+            (slice(top, bottom), slice(left, right))
+            for left, top, right, bottom in self._data.tolist()
+        ]
+
+    def view(self, index: int) -> BboxView:
+        """
+        Returns a lightweight read-only view of a box, see `BboxView`.
+
+        Args:
+            index (int): The index of the box, negative values counting from the end.
+
+        Returns:
+            BboxView: The view of the box.
+
+        Raises:
+            IndexError: If the index is out of range.
+        """
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Index {index} out of range for {len(self)} boxes.")
+        return BboxView(self._data, int(index) % len(self))
+
+    def views(self) -> Iterator[BboxView]:
+        """
+        Iterates over lightweight read-only views of the boxes, see `BboxView`.
+
+        Returns:
+            Iterator[BboxView]: The views of the boxes, in order.
+        """
+        data = self._data
+        return (BboxView(data, k) for k in range(len(data)))
+
+    def _wide(self) -> np.ndarray:
+        """Returns a copy of the coordinates, widened to int64 for integer boxes."""
+        if self._data.dtype.kind == "i":
+            return self._data.astype(np.int64)
+        return self._data.copy()
+
+    @property
+    def data(self) -> np.ndarray:
+        """The (N, 4) array of (left, top, right, bottom) coordinates."""
+        return self._data
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The dtype of the coordinates."""
+        return self._data.dtype
+
+    @property
+    def left(self) -> np.ndarray:
+        """The left coordinates of the boxes."""
+        return self._data[:, 0]
+
+    @property
+    def top(self) -> np.ndarray:
+        """The top coordinates of the boxes."""
+        return self._data[:, 1]
+
+    @property
+    def right(self) -> np.ndarray:
+        """The right coordinates of the boxes."""
+        return self._data[:, 2]
+
+    @property
+    def bottom(self) -> np.ndarray:
+        """The bottom coordinates of the boxes."""
+        return self._data[:, 3]
+
+    @property
+    def width(self) -> np.ndarray:
+        """The widths of the boxes."""
+        return np.subtract(self._data[:, 2], self._data[:, 0], dtype=self._wide_dtype)
+
+    @property
+    def height(self) -> np.ndarray:
+        """The heights of the boxes."""
+        return np.subtract(self._data[:, 3], self._data[:, 1], dtype=self._wide_dtype)
+
+    @property
+    def area(self) -> np.ndarray:
+        """The areas of the boxes."""
+        return self.width * self.height
+
+    @property
+    def center(self) -> np.ndarray:
+        """The (N, 2) array of box centers in (x, y) format."""
+        return np.add(self._data[:, :2], self._data[:, 2:], dtype=self._wide_dtype) / 2
+
+    @property
+    def _wide_dtype(self) -> np.dtype:
+        """The dtype used for derived quantities: int64 for integer boxes."""
+        return np.dtype(np.int64) if self._data.dtype.kind == "i" else self._data.dtype
+
+    @property
+    def aspect_ratio(self) -> np.ndarray:
+        """The aspect ratios of the boxes (width over height)."""
+        return self.width / self.height
+
+    def __len__(self) -> int:
+        return self._data.shape[0]
+
+    def __iter__(self) -> Iterator[Bbox]:
+        """
+        Iterates over the boxes as `Bbox` instances, kept for compatibility.
+
+        Each box builds and validates a Pydantic model. To read many boxes, prefer `views`,
+        or the vectorized properties and conversions of the collection.
+        """
+        for left, top, right, bottom in self._data.tolist():
+            yield Bbox(left=left, top=top, right=right, bottom=bottom)
+
+    @overload
+    def __getitem__(self, index: int) -> Bbox: ...
+
+    @overload
+    def __getitem__(self, index: Union[slice, ArrayLike]) -> BboxArray: ...
+
+    def __getitem__(self, index):
+        """
+        Returns the box at an integer index as a `Bbox`, or a new `BboxArray` for a slice,
+        a boolean mask or an index array.
+
+        An integer index builds and validates a Pydantic model, kept for compatibility.
+        Use `view` to read a box without building one.
+        """
+        if isinstance(index, (int, np.integer)):
+            left, top, right, bottom = self._data[index].tolist()
+            return Bbox(left=left, top=top, right=right, bottom=bottom)
+        return BboxArray._wrap(self._data[index].reshape(-1, 4))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BboxArray):
+            return NotImplemented
+        return np.array_equal(self._data, other._data)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"BboxArray(n={len(self)}, dtype={self._data.dtype})"
+
+
+_FLOAT64 = np.dtype(np.float64)
+SUPPORTED_DTYPES = (
+    np.dtype(np.float64),
+    np.dtype(np.float32),
+    np.dtype(np.int32),
+    np.dtype(np.int16),
+)
+REPAIR_POLICIES = ("drop", "swap", "clip")
+
+
+def _invalid_mask(data: np.ndarray, sizes: bool = False) -> np.ndarray:
+    """
+    Returns the boolean mask of the (N, 4) boxes with a negative width or height, or a NaN
+    or infinite coordinate. With `sizes`, the boxes are (x, y, width, height) rather than
+    (left, top, right, bottom).
+    """
+    if sizes:
+        negative = (data[:, 2] < 0) | (data[:, 3] < 0)
+    else:
+        negative = (data[:, 0] > data[:, 2]) | (data[:, 1] > data[:, 3])
+    return negative | ~np.isfinite(data).all(axis=1)
+
+
+def _resolve_dtype(dtype: Optional[DTypeLike]) -> np.dtype:
+    """
+    Resolves a storage dtype, None meaning float64.
+
+    Raises:
+        ValueError: If the dtype is not one of `SUPPORTED_DTYPES`.
+    """
+    resolved = np.dtype(np.float64 if dtype is None else dtype)
+    if resolved not in SUPPORTED_DTYPES:
+        raise ValueError(
+            f"Unsupported dtype {resolved}. Expected one of "
+            f"{', '.join(str(d) for d in SUPPORTED_DTYPES)}."
+        )
+    return resolved
+
+
+def _as_coords(data: ArrayLike, dtype: np.dtype = _FLOAT64) -> np.ndarray:
+    """
+    Converts an array-like to an array of shape (N, 4).
+
+    The array is float64, or int64 if `dtype` is an integer dtype.
+
+    Args:
+        data (ArrayLike): The coordinates to convert.
+        dtype (np.dtype, optional): The storage dtype the coordinates are meant for.
+            Defaults to float64.
+
+    Returns:
+        np.ndarray: The (N, 4) array.
+
+    Raises:
+        ValueError: If the data cannot be seen as an (N, 4) array, or if an integer dtype
+            is requested for coordinates that are not integers.
+    """
+    arr = np.asarray(data)
+    if arr.ndim == 1 and arr.size == 0:
+        arr = arr.reshape(0, 4)
+    if arr.ndim != 2 or arr.shape[1] != 4:
+        raise ValueError(
+            f"An array of shape {arr.shape} has been passed. Need an array of shape (N, 4)."
+        )
+    if dtype.kind != "i":
+        return arr.astype(np.float64, copy=False)
+    if arr.dtype.kind not in "iub" and not np.all(np.floor(arr) == arr):
+        raise ValueError("Integer boxes need integer coordinates. Use `to_pixels`.")
+    return arr.astype(np.int64, copy=False)
+
+
+def _to_storage(arr: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """
+    Casts (N, 4) coordinates to their storage dtype.
+
+    Raises:
+        ValueError: If the coordinates do not fit in an integer dtype.
+    """
+    if dtype.kind == "i" and arr.size:
+        info = np.iinfo(dtype)
+        if arr.min() < info.min or arr.max() > info.max:
+            raise ValueError(f"The coordinates do not fit in {dtype}.")
+    return arr.astype(dtype, copy=False)
+
+
+def _scale_factors(img_w: ArrayLike, img_h: ArrayLike) -> np.ndarray:
+    """
+    Builds the (w, h, w, h) factors used to (de)normalize (N, 4) coordinates.
+
+    Args:
+        img_w (ArrayLike): The image width(s), either a scalar or an (N,) array.
+        img_h (ArrayLike): The image height(s), either a scalar or an (N,) array.
+
+    Returns:
+        np.ndarray: An array broadcastable against (N, 4) coordinates.
+    """
+    w = np.asarray(img_w, dtype=np.float64)
+    h = np.asarray(img_h, dtype=np.float64)
+    if w.ndim == 0 and h.ndim == 0:
+        return np.array([w, h, w, h])
+    w, h = np.broadcast_arrays(w, h)
+    return np.stack((w, h, w, h), axis=-1)
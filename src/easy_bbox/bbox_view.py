@@ -0,0 +1,249 @@
+"""
+bbox_view.py
+
+Provides the `BboxView` class, a lightweight read-only view of one box of a `BboxArray`.
+It exposes the read API of `Bbox` (properties, conversions and comparisons) by reading
+the backing array directly, without building a Pydantic model.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from .bbox import Bbox
+
+
+class BboxView:
+    """
+    A read-only view of the box at a given row of an (N, 4) coordinates array.
+
+    Views are obtained with `BboxArray.view` and `BboxArray.views`. They cost a reference
+    and an index, and read their coordinates from the array on each access, so they
+    reflect later changes of the array. Coordinates are returned as Python numbers: floats
+    for float arrays, ints for integer ones.
+
+    Methods building new boxes (`union`, `intersection`) return real `Bbox` instances,
+    and `to_bbox` converts the view itself. Their arguments can be `Bbox` or `BboxView`.
+    The transformations of `Bbox` (`shift`, `scale`, ...) are available on `to_bbox()`.
+
+    Example:
+        >>> boxes = BboxArray([(10, 20, 30, 40), (0, 0, 5, 10)])
+        >>> sum(box.area for box in boxes.views())
+        450.0
+    """
+
+    __slots__ = ("_data", "_index")
+
+    def __init__(self, data: np.ndarray, index: int) -> None:
+        """
+        Initializes the view of a row. Use `BboxArray.view` instead.
+
+        Args:
+            data (np.ndarray): The (N, 4) array of (left, top, right, bottom) coordinates.
+            index (int): The row of the box, in [0, N).
+        """
+        self._data = data
+        self._index = index
+
+    def to_bbox(self) -> Bbox:
+        """
+        Builds a `Bbox` from the view.
+
+        Returns:
+            Bbox: The bounding box.
+
+        Raises:
+            ValueError: If the box is not valid (the array may hold invalid boxes if it
+                was built without validation).
+        """
+        left, top, right, bottom = self._row()
+        return Bbox(left=left, top=top, right=right, bottom=bottom)
+
+    # region To methods
+    def to_tlbr(self) -> Tuple[float, float, float, float]:
+        """Returns the (left, top, right, bottom) coordinates, see `Bbox.to_tlbr`."""
+        left, top, right, bottom = self._row()
+        return (left, top, right, bottom)
+
+    def to_list(self) -> List[float]:
+        """Returns the [left, top, right, bottom] coordinates, see `Bbox.to_list`."""
+        return self._row()
+
+    def to_norm_tlbr(self, img_w: int, img_h: int) -> Tuple[float, float, float, float]:
+        """Returns the normalized tlbr coordinates, see `Bbox.to_norm_tlbr`."""
+        left, top, right, bottom = self._row()
+        return (left / img_w, top / img_h, right / img_w, bottom / img_h)
+
+    def to_tlwh(self) -> Tuple[float, float, float, float]:
+        """Returns the (left, top, width, height) coordinates, see `Bbox.to_tlwh`."""
+        left, top, right, bottom = self._row()
+        return (left, top, right - left, bottom - top)
+
+    def to_norm_tlwh(self, img_w: int, img_h: int) -> Tuple[float, float, float, float]:
+        """
+        Returns the normalized (left, top, width, height) coordinates, as
+        `BboxArray.to_norm_tlwh` does.
+
+        Unlike this method, `Bbox.to_norm_tlwh` currently returns the normalized right and
+        bottom coordinates instead of the width and height.
+        """
+        left, top, width, height = self.to_tlwh()
+        return (left / img_w, top / img_h, width / img_w, height / img_h)
+
+    def to_cwh(self) -> Tuple[float, float, float, float]:
+        """Returns the (center_x, center_y, width, height) coordinates, see `Bbox.to_cwh`."""
+        left, top, right, bottom = self._row()
+        return ((left + right) / 2, (top + bottom) / 2, right - left, bottom - top)
+
+    def to_norm_cwh(self, img_w: int, img_h: int) -> Tuple[float, float, float, float]:
+        """Returns the normalized cwh coordinates, see `Bbox.to_norm_cwh`."""
+        cx, cy, width, height = self.to_cwh()
+        return (cx / img_w, cy / img_h, width / img_w, height / img_h)
+
+    def to_polygon(
+        self,
+    ) -> Tuple[
+        Tuple[float, float],
+        Tuple[float, float],
+        Tuple[float, float],
+        Tuple[float, float],
+    ]:
+        """Returns the corners, from top-left clockwise, see `Bbox.to_polygon`."""
+        left, top, right, bottom = self._row()
+        return ((left, top), (right, top), (right, bottom), (left, bottom))
+
+    to_pascal_voc = to_tlbr
+    to_xyxy = to_tlbr
+    to_albu = to_norm_tlbr
+    to_coco = to_tlwh
+    to_yolo = to_norm_cwh
+
+    # endregion
+
+    def overlaps(self, other: Union[Bbox, BboxView]) -> bool:
+        """Checks if the box overlaps another one with a non-zero area, see `Bbox.overlaps`."""
+        return _intersection_area(self.to_tlbr(), other.to_tlbr()) > 0
+
+    def contains_point(self, x: float, y: float) -> bool:
+        """Checks if a point is inside the box, see `Bbox.contains_point`."""
+        left, top, right, bottom = self._row()
+        return left <= x <= right and top <= y <= bottom
+
+    def union(self, other: Union[Bbox, BboxView]) -> Bbox:
+        """Returns the minimal `Bbox` englobing both boxes, see `Bbox.union`."""
+        a = self.to_tlbr()
+        b = other.to_tlbr()
+        return Bbox(
+            left=min(a[0], b[0]),
+            top=min(a[1], b[1]),
+            right=max(a[2], b[2]),
+            bottom=max(a[3], b[3]),
+        )
+
+    def intersection(self, other: Union[Bbox, BboxView]) -> Optional[Bbox]:
+        """Returns the intersection `Bbox`, or None, see `Bbox.intersection`."""
+        a = self.to_tlbr()
+        b = other.to_tlbr()
+        left, top = max(a[0], b[0]), max(a[1], b[1])
+        right, bottom = min(a[2], b[2]), min(a[3], b[3])
+        if left > right or top > bottom:
+            return None
+        return Bbox(left=left, top=top, right=right, bottom=bottom)
+
+    def iou(self, other: Union[Bbox, BboxView]) -> float:
+        """Calculates the IoU with another box, see `Bbox.iou`."""
+        a = self.to_tlbr()
+        b = other.to_tlbr()
+        inter = _intersection_area(a, b)
+        union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+        if union == 0:
+            return 0
+        return inter / union
+
+    def distance_to_point(self, x: float, y: float) -> float:
+        """Calculates the distance from the box to a point, see `Bbox.distance_to_point`."""
+        left, top, right, bottom = self._row()
+        dx = max(left - x, 0, x - right)
+        dy = max(top - y, 0, y - bottom)
+        return (dx**2 + dy**2) ** 0.5
+
+    @property
+    def left(self) -> float:
+        """The left coordinate of the box."""
+        return self._data[self._index, 0].item()
+
+    @property
+    def top(self) -> float:
+        """The top coordinate of the box."""
+        return self._data[self._index, 1].item()
+
+    @property
+    def right(self) -> float:
+        """The right coordinate of the box."""
+        return self._data[self._index, 2].item()
+
+    @property
+    def bottom(self) -> float:
+        """The bottom coordinate of the box."""
+        return self._data[self._index, 3].item()
+
+    @property
+    def width(self) -> float:
+        """The width of the box."""
+        left, _, right, _ = self._row()
+        return right - left
+
+    @property
+    def height(self) -> float:
+        """The height of the box."""
+        _, top, _, bottom = self._row()
+        return bottom - top
+
+    @property
+    def area(self) -> float:
+        """The area of the box."""
+        left, top, right, bottom = self._row()
+        return (right - left) * (bottom - top)
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        """The center of the box in (x, y) format."""
+        left, top, right, bottom = self._row()
+        return (left + right) / 2, (top + bottom) / 2
+
+    @property
+    def aspect_ratio(self) -> float:
+        """The aspect ratio of the box (width over height)."""
+        left, top, right, bottom = self._row()
+        return (right - left) / (bottom - top)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (Bbox, BboxView)):
+            return NotImplemented
+        return self.to_tlbr() == other.to_tlbr()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        left, top, right, bottom = self._row()
+        return f"BboxView(left={left}, top={top}, right={right}, bottom={bottom})"
+
+    def _row(self) -> List[float]:
+        """Returns the [left, top, right, bottom] coordinates as Python numbers."""
+        return self._data[self._index].tolist()
+
+    __or__ = union
+    __and__ = intersection
+
+
+def _intersection_area(
+    a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]
+) -> float:
+    """Returns the intersection area of two (left, top, right, bottom) boxes."""
+    inter_w = min(a[2], b[2]) - max(a[0], b[0])
+    inter_h = min(a[3], b[3]) - max(a[1], b[1])
+    if inter_w < 0 or inter_h < 0:
+        return 0
+    return inter_w * inter_h
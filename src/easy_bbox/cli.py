@@ -0,0 +1,459 @@
+"""
+cli.py
+
+The `easy-bbox` command, running bulk offline jobs on large collections of boxes:
+
+- `convert`: converts an annotation dataset between the COCO, YOLO and VOC formats, with
+  the pipeline of `convert_dataset`.
+- `nms`: runs Non-Maximum Suppression on the boxes of each image.
+- `clip`: clips the boxes to their image.
+- `dedupe`: removes the near-duplicate boxes of each image (see `Deduplicator`).
+- `stats`: prints the statistics of the boxes (see `BoxStats`) as JSON.
+
+Except for `convert`, the commands read box tables: CSV files whose header has the
+`image`, `left`, `top`, `right` and `bottom` columns, and optionally `score`, `label`,
+`width` and `height` (the image size). Other columns are passed through unchanged.
+
+The input is streamed in chunks of whole images, so the rows of an image must be
+contiguous: the command fails if they are interleaved with the rows of another image.
+Chunks are processed with `BboxArray` operations, in parallel on `--workers`
+processes, and written in the input order. Every command reports its throughput on
+stderr.
+
+Example:
+    $ easy-bbox nms detections.csv -o kept.csv --iou-threshold 0.6 --workers 4
+    $ easy-bbox stats labels.csv --img-size 640 480
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import functools
+import json
+import math
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from time import perf_counter
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+
+from . import pipeline
+from .bbox_array import BboxArray
+from .formats import format_number
+from .stats import BoxStats
+from .utils import Deduplicator, StreamingNMS
+
+REQUIRED_COLUMNS = ("image", "left", "top", "right", "bottom")
+DEFAULT_CHUNK_SIZE = 65536
+
+Rows = List[List[str]]
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """Entry point of the `easy-bbox` command."""
+    parser = argparse.ArgumentParser(
+        prog="easy-bbox", description="Bulk bounding box jobs on large files."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser(
+        "convert",
+        help="Convert an annotation dataset between the COCO, YOLO and VOC formats.",
+    )
+    pipeline.add_arguments(convert)
+
+    nms = _add_table_command(commands, "nms", "Non-Maximum Suppression per image.")
+    nms.add_argument("--iou-threshold", type=float, default=0.5)
+    nms.add_argument(
+        "--score-threshold",
+        type=float,
+        help="Discard the boxes whose score is not above this threshold.",
+    )
+
+    clip = _add_table_command(commands, "clip", "Clip the boxes to their image.")
+    _add_img_size_argument(clip)
+    clip.add_argument(
+        "--drop-empty",
+        action="store_true",
+        help="Drop the boxes with a zero area after clipping.",
+    )
+
+    dedupe = _add_table_command(
+        commands, "dedupe", "Remove the near-duplicate boxes of each image."
+    )
+    dedupe.add_argument("--tolerance", type=float, default=1.0)
+    dedupe.add_argument("--iou-threshold", type=float, default=0.9)
+
+    stats = _add_table_command(commands, "stats", "Print box statistics as JSON.")
+    _add_img_size_argument(stats)
+    stats.add_argument("--bins", type=int, default=128)
+
+    args = parser.parse_args(None if argv is None else list(argv))
+    try:
+        return _run(args)
+    except ValueError as err:
+        # Invalid inputs and arguments, including those found by the worker processes
+        commands.choices[args.command].error(str(err))
+
+
+def _run(args: argparse.Namespace) -> int:
+    """
+    Runs a parsed command.
+
+    Raises:
+        ValueError: If an argument or the input is not valid.
+    """
+    start = perf_counter()
+    if args.command == "convert":
+        report = pipeline.run(args)
+        _report(
+            f"convert: {report.images} images, {report.boxes} boxes "
+            f"({report.skipped} images skipped)",
+            report.boxes,
+            start,
+        )
+        return 0
+
+    with ExitStack() as stack:
+        src = _open(stack, args.input, "r")
+        header, columns, chunks = _read_table(src, args.chunk_size)
+        job = _make_job(args, columns)
+        results = _map_chunks(job, chunks, args.workers)
+
+        dst = _open(stack, args.output, "w")
+        num_in = num_out = 0
+        if args.command == "stats":
+            total = BoxStats(args.bins)
+            for num_rows, part in results:
+                num_in += num_rows
+                total.merge(part)
+            json.dump(_stats_report(total), dst, indent=2)
+            dst.write("\n")
+        else:
+            writer = csv.writer(dst, lineterminator="\n")
+            writer.writerow(header)
+            for num_rows, rows in results:
+                num_in += num_rows
+                num_out += len(rows)
+                writer.writerows(rows)
+
+    summary = f"{args.command}: {num_in} boxes read"
+    if args.command != "stats":
+        summary += f", {num_out} written"
+    _report(summary, num_in, start)
+    return 0
+
+
+def _add_table_command(
+    commands: Any, name: str, description: str
+) -> argparse.ArgumentParser:
+    """Adds a subcommand reading a box table, with the common arguments."""
+    parser = commands.add_parser(name, help=description, description=description)
+    parser.add_argument("input", help="The input CSV box table, '-' for stdin.")
+    parser.add_argument(
+        "-o", "--output", default="-", help="The output file, '-' for stdout."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Minimal number of rows processed at once.",
+    )
+    return parser
+
+
+def _add_img_size_argument(parser: argparse.ArgumentParser) -> None:
+    """Adds the `--img-size` argument, used when the table has no image size columns."""
+    parser.add_argument(
+        "--img-size",
+        nargs=2,
+        type=int,
+        metavar=("W", "H"),
+        help="Image size, if the table has no width and height columns.",
+    )
+
+
+def _make_job(
+    args: argparse.Namespace, columns: Dict[str, int]
+) -> Callable[[Rows], Tuple[int, Any]]:
+    """
+    Returns the function processing a chunk of rows, as a picklable partial.
+
+    Raises:
+        ValueError: If a column needed by the command is missing.
+    """
+    img_size = getattr(args, "img_size", None)
+    if args.command == "nms":
+        if "score" not in columns:
+            raise ValueError("The nms command needs a `score` column.")
+        return functools.partial(
+            _nms_rows,
+            columns=columns,
+            iou_threshold=args.iou_threshold,
+            score_threshold=args.score_threshold,
+        )
+    if args.command == "clip":
+        if img_size is None and not {"width", "height"} <= columns.keys():
+            raise ValueError("The clip command needs --img-size or image size columns.")
+        return functools.partial(
+            _clip_rows, columns=columns, img_size=img_size, drop_empty=args.drop_empty
+        )
+    if args.command == "dedupe":
+        return functools.partial(
+            _dedupe_rows,
+            columns=columns,
+            tolerance=args.tolerance,
+            iou_threshold=args.iou_threshold,
+        )
+    return functools.partial(
+        _stats_rows, columns=columns, img_size=img_size, bins=args.bins
+    )
+
+
+# region Chunk jobs
+def _nms_rows(
+    rows: Rows,
+    columns: Dict[str, int],
+    iou_threshold: float,
+    score_threshold: Optional[float],
+) -> Tuple[int, Rows]:
+    """Keeps the rows selected by the NMS of each image."""
+    boxes = BboxArray(_parse_boxes(rows, columns))
+    scores = _parse_column(rows, columns["score"])
+    keep = np.zeros(len(rows), dtype=bool)
+    suppressor = StreamingNMS(iou_threshold)
+    for run in _image_runs(rows, columns):
+        keep[run] = suppressor.add(boxes[run], scores[run])
+        suppressor.reset()
+    if score_threshold is not None:
+        keep &= scores > score_threshold
+    return len(rows), [rows[k] for k in np.flatnonzero(keep)]
+
+
+def _clip_rows(
+    rows: Rows,
+    columns: Dict[str, int],
+    img_size: Optional[Tuple[int, int]],
+    drop_empty: bool,
+) -> Tuple[int, Rows]:
+    """Clips the coordinates of the rows to their image."""
+    img_w, img_h = _image_sizes(rows, columns, img_size)
+    clipped = BboxArray(_parse_boxes(rows, columns)).clip_to_img(img_w, img_h)
+    keep = clipped.area > 0 if drop_empty else np.ones(len(rows), dtype=bool)
+    coord_indices = [columns[name] for name in REQUIRED_COLUMNS[1:]]
+    out = []
+    for k in np.flatnonzero(keep).tolist():
+        row = list(rows[k])
+        for index, value in zip(coord_indices, clipped.data[k].tolist()):
+            row[index] = format_number(value)
+        out.append(row)
+    return len(rows), out
+
+
+def _dedupe_rows(
+    rows: Rows, columns: Dict[str, int], tolerance: float, iou_threshold: float
+) -> Tuple[int, Rows]:
+    """Keeps the rows that are not near-duplicates of a previous row of their image."""
+    boxes = BboxArray(_parse_boxes(rows, columns))
+    images = [row[columns["image"]] for row in rows]
+    keep = Deduplicator(tolerance, iou_threshold).add_many(boxes, images)
+    return len(rows), [rows[k] for k in np.flatnonzero(keep)]
+
+
+def _stats_rows(
+    rows: Rows,
+    columns: Dict[str, int],
+    img_size: Optional[Tuple[int, int]],
+    bins: int,
+) -> Tuple[int, BoxStats]:
+    """Computes the statistics of a chunk of rows."""
+    img_w = img_h = None
+    if img_size is not None or {"width", "height"} <= columns.keys():
+        img_w, img_h = _image_sizes(rows, columns, img_size)
+    labels = None
+    if "label" in columns:
+        labels = [row[columns["label"]] for row in rows]
+    stats = BoxStats(bins)
+    stats.update(BboxArray(_parse_boxes(rows, columns)), img_w, img_h, labels)
+    return len(rows), stats
+
+
+# endregion
+
+
+# region Table reading
+def _read_table(
+    src: IO[str], chunk_size: int
+) -> Tuple[List[str], Dict[str, int], Iterator[Rows]]:
+    """
+    Reads and checks the header of a CSV box table, and returns it with the index of each
+    column and an iterator over chunks of at least `chunk_size` rows (except the last one)
+    ending at an image boundary.
+
+    Raises:
+        ValueError: If the table is empty, if a required column is missing, or if
+            `chunk_size` is not positive. The iterator raises if a row does not match the
+            header, or if the rows of an image are not contiguous.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive. Received {chunk_size}")
+    reader = csv.reader(src)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("The box table is empty, it has no header.")
+    columns = _column_indices(header)
+    image_index = columns["image"]
+
+    def chunks() -> Iterator[Rows]:
+        chunk: Rows = []
+        seen: Set[str] = set()
+        previous: Optional[str] = None
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError(
+                    f"Line {reader.line_num} of the box table has {len(row)} columns. "
+                    f"Expected {len(header)}."
+                )
+            image = row[image_index]
+            if image != previous:
+                if image in seen:
+                    raise ValueError(
+                        f"The rows of the image {image!r} are not contiguous "
+                        f"(line {reader.line_num})."
+                    )
+                seen.add(image)
+                previous = image
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            chunk.append(row)
+        if chunk:
+            yield chunk
+
+    return header, columns, chunks()
+
+
+def _column_indices(header: Sequence[str]) -> Dict[str, int]:
+    """
+    Returns the index of each column of a box table.
+
+    Raises:
+        ValueError: If a required column is missing.
+    """
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"The box table is missing the columns {missing}.")
+    return {name: k for k, name in enumerate(header)}
+
+
+def _parse_boxes(rows: Rows, columns: Dict[str, int]) -> np.ndarray:
+    """Returns the (N, 4) coordinates of the rows."""
+    indices = [columns[name] for name in REQUIRED_COLUMNS[1:]]
+    return np.array(
+        [[row[k] for k in indices] for row in rows], dtype=np.float64
+    ).reshape(-1, 4)
+
+
+def _parse_column(rows: Rows, index: int) -> np.ndarray:
+    """Returns the (N,) values of a numeric column of the rows."""
+    return np.array([row[index] for row in rows], dtype=np.float64)
+
+
+def _image_sizes(
+    rows: Rows, columns: Dict[str, int], img_size: Optional[Tuple[int, int]]
+) -> Tuple[Any, Any]:
+    """Returns the image width and height, from `img_size` or from the size columns."""
+    if img_size is not None:
+        return img_size
+    return _parse_column(rows, columns["width"]), _parse_column(rows, columns["height"])
+
+
+def _image_runs(rows: Rows, columns: Dict[str, int]) -> List[slice]:
+    """Returns the slices of the runs of consecutive rows of the same image."""
+    index = columns["image"]
+    starts = [0] + [
+        k for k in range(1, len(rows)) if rows[k][index] != rows[k - 1][index]
+    ]
+    return [slice(a, b) for a, b in zip(starts, starts[1:] + [len(rows)])]
+
+
+# endregion
+
+
+def _map_chunks(
+    job: Callable[[Rows], Tuple[int, Any]], chunks: Iterator[Rows], workers: int
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Applies a job to every chunk, on a pool of processes, yielding the results in order.
+
+    At most `2 * workers` chunks are in flight, so the input is read as fast as it is
+    processed instead of being loaded at once.
+
+    Raises:
+        ValueError: If `workers` is not positive.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be positive. Received {workers}")
+    if workers == 1:
+        yield from map(job, chunks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(job, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _open(stack: ExitStack, path: str, mode: str) -> IO[str]:
+    """Opens a file, or returns stdin or stdout for '-'."""
+    if path == "-":
+        return sys.stdin if mode == "r" else sys.stdout
+    return stack.enter_context(open(path, mode, newline=""))
+
+
+def _stats_report(stats: BoxStats) -> Dict[str, Any]:
+    """Returns the JSON report of the stats command, with null instead of NaN."""
+    columns = {
+        column: {
+            key: None if isinstance(value, float) and math.isnan(value) else value
+            for key, value in values.items()
+        }
+        for column, values in stats.summary().items()
+    }
+    return {
+        "boxes": stats.num_boxes,
+        "classes": stats.class_counts,
+        "columns": columns,
+    }
+
+
+def _report(summary: str, num_boxes: int, start: float) -> None:
+    """Prints a summary of a command and its throughput on stderr."""
+    elapsed = perf_counter() - start
+    rate = num_boxes / elapsed if elapsed > 0 else float("inf")
+    print(f"{summary} in {elapsed:.2f}s ({rate:,.0f} boxes/s)", file=sys.stderr)
@@ -0,0 +1,320 @@
+"""
+formats.py
+
+Readers and writers for the annotation file formats handled by the conversion pipeline:
+COCO (one JSON file for the whole dataset), YOLO (one `.txt` file per image) and
+Pascal VOC (one `.xml` file per image).
+
+Every reader produces `ImageAnnotations` records, whose boxes are stored in a `BboxArray`
+(Pascal VOC coordinates). Writers take a record together with the coordinates already
+converted to the target format, so that coordinate conversion can be done in bulk.
+"""
+
+from __future__ import annotations
+
+import json
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import PurePath
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .bbox_array import BboxArray
+
+FORMATS = ("coco", "yolo", "voc")
+PER_IMAGE_EXTENSIONS = {"yolo": ".txt", "voc": ".xml"}
+
+
+@dataclass
+class ImageAnnotations:
+    """
+    The annotations of a single image.
+
+    Attributes:
+        name (str): The image file name (e.g. `img_001.jpg`).
+        width (int): The image width in pixels.
+        height (int): The image height in pixels.
+        boxes (BboxArray): The bounding boxes, in Pascal VOC format.
+        labels (List[str]): The category name of each box.
+    """
+
+    name: str
+    width: int
+    height: int
+    boxes: BboxArray
+    labels: List[str]
+
+    @property
+    def stem(self) -> str:
+        """The image file name without its extension."""
+        return PurePath(self.name).stem
+
+
+# region Readers
+def parse_voc(text: str) -> ImageAnnotations:
+    """
+    Parses a Pascal VOC XML annotation.
+
+    Args:
+        text (str): The content of the XML file.
+
+    Returns:
+        ImageAnnotations: The annotations of the image.
+
+    Raises:
+        ValueError: If the `size` element or a coordinate of a box is missing, or if a box
+            is not valid.
+    """
+    root = ET.fromstring(text)
+    name = root.findtext("filename", default="")
+    size = root.find("size")
+    if size is None:
+        raise ValueError("The VOC annotation has no `size` element.")
+
+    labels: List[str] = []
+    coords: List[List[float]] = []
+    for obj in root.iter("object"):
+        bndbox = obj.find("bndbox")
+        if bndbox is None:
+            continue
+        box = []
+        for tag in _VOC_COORDS:
+            value = bndbox.findtext(tag)
+            if value is None:
+                raise ValueError(
+                    f"A box of the VOC annotation {name!r} has no <{tag}>."
+                )
+            box.append(float(value))
+        labels.append(obj.findtext("name", default=""))
+        coords.append(box)
+
+    return ImageAnnotations(
+        name=name,
+        width=int(float(size.findtext("width", default="0"))),
+        height=int(float(size.findtext("height", default="0"))),
+        boxes=BboxArray.from_pascal_voc(coords),
+        labels=labels,
+    )
+
+
+def parse_yolo(
+    text: str,
+    name: str,
+    img_w: int,
+    img_h: int,
+    classes: Optional[Sequence[str]] = None,
+) -> ImageAnnotations:
+    """
+    Parses a YOLO annotation (one `class cx cy w h` line per box, normalized coordinates).
+
+    YOLO files do not store the image dimensions, so they have to be provided.
+
+    Args:
+        text (str): The content of the `.txt` file.
+        name (str): The image file name.
+        img_w (int): The image width in pixels.
+        img_h (int): The image height in pixels.
+        classes (Optional[Sequence[str]], optional): The category names, indexed by class id.
+            If None, the class ids are used as labels. Defaults to None.
+
+    Returns:
+        ImageAnnotations: The annotations of the image.
+
+    Raises:
+        ValueError: If a line does not have 5 fields or if a box is not valid.
+    """
+    labels: List[str] = []
+    coords: List[List[float]] = []
+    for line in text.splitlines():
+        fields = line.split()
+        if not fields:
+            continue
+        if len(fields) != 5:
+            raise ValueError(
+                f"A YOLO line of {len(fields)} fields has been passed. Need 5 fields."
+            )
+        class_id = int(fields[0])
+        labels.append(classes[class_id] if classes is not None else str(class_id))
+        coords.append([float(v) for v in fields[1:]])
+
+    return ImageAnnotations(
+        name=name,
+        width=img_w,
+        height=img_h,
+        boxes=BboxArray.from_yolo(coords, img_w, img_h),
+        labels=labels,
+    )
+
+
+def load_coco(text: str) -> List[ImageAnnotations]:
+    """
+    Parses a COCO JSON annotation file.
+
+    Args:
+        text (str): The content of the JSON file.
+
+    Returns:
+        List[ImageAnnotations]: The annotations of every image, in the file order.
+
+    Raises:
+        ValueError: If a box is not valid.
+    """
+    content = json.loads(text)
+    categories = {c["id"]: c["name"] for c in content.get("categories", [])}
+
+    per_image: Dict[int, List[dict]] = {img["id"]: [] for img in content["images"]}
+    for ann in content.get("annotations", []):
+        per_image[ann["image_id"]].append(ann)
+
+    records = []
+    for img in content["images"]:
+        anns = per_image[img["id"]]
+        records.append(
+            ImageAnnotations(
+                name=img["file_name"],
+                width=img["width"],
+                height=img["height"],
+                boxes=BboxArray.from_coco([a["bbox"] for a in anns]),
+                labels=[
+                    categories.get(a["category_id"], str(a["category_id"]))
+                    for a in anns
+                ],
+            )
+        )
+    return records
+
+
+# endregion
+
+
+# region Writers
+def dump_voc(record: ImageAnnotations, tlbr: np.ndarray) -> str:
+    """
+    Serializes the annotations of an image to Pascal VOC XML.
+
+    Args:
+        record (ImageAnnotations): The annotations of the image.
+        tlbr (np.ndarray): The (N, 4) Pascal VOC coordinates of its boxes.
+
+    Returns:
+        str: The content of the XML file.
+    """
+    root = ET.Element("annotation")
+    ET.SubElement(root, "filename").text = record.name
+    size = ET.SubElement(root, "size")
+    ET.SubElement(size, "width").text = str(record.width)
+    ET.SubElement(size, "height").text = str(record.height)
+    ET.SubElement(size, "depth").text = "3"
+
+    for label, coords in zip(record.labels, tlbr.tolist()):
+        obj = ET.SubElement(root, "object")
+        ET.SubElement(obj, "name").text = label
+        bndbox = ET.SubElement(obj, "bndbox")
+        for key, value in zip(_VOC_COORDS, coords):
+            ET.SubElement(bndbox, key).text = format_number(value)
+
+    ET.indent(root)
+    return ET.tostring(root, encoding="unicode") + "\n"
+
+
+def dump_yolo(
+    record: ImageAnnotations,
+    norm_cwh: np.ndarray,
+    classes: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    Serializes the annotations of an image to the YOLO text format.
+
+    Args:
+        record (ImageAnnotations): The annotations of the image.
+        norm_cwh (np.ndarray): The (N, 4) normalized center-width-height coordinates of its
+            boxes.
+        classes (Optional[Sequence[str]], optional): The category names, indexed by class id.
+            If None, the labels must be class ids. Defaults to None.
+
+    Returns:
+        str: The content of the `.txt` file.
+
+    Raises:
+        ValueError: If a label is not in `classes`, or is not a class id when `classes` is
+            None.
+    """
+    lines = []
+    for label, (cx, cy, w, h) in zip(record.labels, norm_cwh.tolist()):
+        class_id = classes.index(label) if classes is not None else int(label)
+        lines.append(f"{class_id} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n")
+    return "".join(lines)
+
+
+def dump_coco(
+    records: Sequence[ImageAnnotations],
+    tlwh: Sequence[np.ndarray],
+    classes: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    Serializes the annotations of a whole dataset to COCO JSON.
+
+    Args:
+        records (Sequence[ImageAnnotations]): The annotations of every image.
+        tlwh (Sequence[np.ndarray]): For each image, the (N, 4) top-left-width-height
+            coordinates of its boxes.
+        classes (Optional[Sequence[str]], optional): The category names, their ids being
+            their position in the sequence. If None, the categories are the sorted set of
+            labels. Defaults to None.
+
+    Returns:
+        str: The content of the JSON file.
+    """
+    if classes is None:
+        classes = sorted({label for r in records for label in r.labels})
+    category_ids = {name: i for i, name in enumerate(classes)}
+
+    images: List[Dict[str, Any]] = []
+    annotations: List[Dict[str, Any]] = []
+    for image_id, (record, coords) in enumerate(zip(records, tlwh)):
+        images.append(
+            {
+                "id": image_id,
+                "file_name": record.name,
+                "width": record.width,
+                "height": record.height,
+            }
+        )
+        for label, bbox in zip(record.labels, coords.tolist()):
+            annotations.append(
+                {
+                    "id": len(annotations),
+                    "image_id": image_id,
+                    "category_id": category_ids[label],
+                    "bbox": bbox,
+                    "area": bbox[2] * bbox[3],
+                    "iscrowd": 0,
+                }
+            )
+
+    return json.dumps(
+        {
+            "images": images,
+            "annotations": annotations,
+            "categories": [{"id": i, "name": n} for n, i in category_ids.items()],
+        }
+    )
+
+
+# endregion
+
+_VOC_COORDS = ("xmin", "ymin", "xmax", "ymax")
+
+
+def format_number(value: float) -> str:
+    """
+    Formats a coordinate for a text file, dropping the decimal part of integral values.
+
+    Args:
+        value (float): The coordinate.
+
+    Returns:
+        str: The shortest text representation of the coordinate, e.g. "12" or "12.5".
+    """
+    return str(int(value)) if value.is_integer() else repr(value)
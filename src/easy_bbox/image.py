@@ -0,0 +1,189 @@
+"""
+image.py
+
+Bulk operations between bounding box collections and images: rasterization of boxes into
+masks and heatmaps, and batched crop extraction.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .ops import Boxes, _as_box_data
+
+RASTER_MODES = ("mask", "count", "heatmap")
+
+
+def rasterize(
+    boxes: Boxes,
+    img_w: int,
+    img_h: int,
+    mode: str = "mask",
+    scores: Optional[ArrayLike] = None,
+) -> np.ndarray:
+    """
+    Paints bounding boxes into an (img_h, img_w) array.
+
+    A pixel belongs to a box if its center lies inside it. For integer boxes, this means
+    that the bottom and right edges are excluded, as with `image[top:bottom, left:right]`.
+
+    The boxes are accumulated in a 2D difference array, then integrated with cumulative
+    sums, so that the cost is O(N + H * W) instead of O(N * area).
+
+    The available modes are:
+
+    - `"mask"`: the (H, W) boolean union of the boxes.
+    - `"count"`: the (H, W) int64 number of boxes covering each pixel.
+    - `"heatmap"`: the (H, W) float64 sum of the scores of the boxes covering each pixel.
+
+    Args:
+        boxes (Boxes): The bounding boxes, in pixels. They are clipped to the image.
+        img_w (int): The image width in pixels.
+        img_h (int): The image height in pixels.
+        mode (str, optional): The rasterization mode. Defaults to "mask".
+        scores (Optional[ArrayLike], optional): The (N,) weight of each box, required by
+            the `"heatmap"` mode. Defaults to None.
+
+    Returns:
+        np.ndarray: The (img_h, img_w) raster.
+
+    Raises:
+        ValueError: If the mode is unknown, or if the scores are missing or do not match
+            the boxes.
+    """
+    if mode not in RASTER_MODES:
+        raise ValueError(f"Unknown mode {mode!r}. Expected one of {RASTER_MODES}.")
+    if mode == "heatmap" and scores is None:
+        raise ValueError("The heatmap mode needs the scores of the boxes.")
+
+    left, top, right, bottom = _pixel_bounds(_as_box_data(boxes), img_w, img_h)
+    size = (img_h + 1) * (img_w + 1)
+    plus = np.concatenate((top * (img_w + 1) + left, bottom * (img_w + 1) + right))
+    minus = np.concatenate((top * (img_w + 1) + right, bottom * (img_w + 1) + left))
+
+    diff: np.ndarray
+    if mode == "heatmap":
+        weights = np.asarray(scores, dtype=np.float64)
+        if weights.shape != left.shape:
+            raise ValueError("The length of boxes and scores must be the same.")
+        weights = np.concatenate((weights, weights))
+        diff = np.bincount(plus, weights, size) - np.bincount(minus, weights, size)
+    else:
+        diff = np.bincount(plus, minlength=size) - np.bincount(minus, minlength=size)
+
+    raster = diff.reshape(img_h + 1, img_w + 1).cumsum(axis=0).cumsum(axis=1)
+    raster = raster[:img_h, :img_w]
+    return raster > 0 if mode == "mask" else raster
+
+
+def crop_many(
+    image: np.ndarray,
+    boxes: Boxes,
+    output_size: Optional[Tuple[int, int]] = None,
+    keep_aspect_ratio: bool = True,
+    pad_value: float = 0,
+    out: Optional[np.ndarray] = None,
+) -> Union[List[np.ndarray], np.ndarray]:
+    """
+    Crops every box from an image at once.
+
+    The boxes are clipped to the image and rounded to pixels with the same rule as
+    `rasterize` (a pixel belongs to a box if its center lies inside it), so integer boxes
+    give `image[top:bottom, left:right]`.
+
+    Without `output_size`, the crops are returned as views of the image, without any copy.
+    With `output_size`, every crop is resized (nearest neighbour) into a single
+    (N, out_h, out_w, ...) batch. The crops are gathered one by one straight into their
+    slot of the batch, so that no other batch-sized array is allocated. If `keep_aspect_ratio` is True, each crop
+    is scaled to fit in the output and placed in its top-left corner, the remaining pixels
+    being filled with `pad_value`.
+
+    Args:
+        image (np.ndarray): The (H, W, ...) image.
+        boxes (Boxes): The N bounding boxes, in pixels.
+        output_size (Optional[Tuple[int, int]], optional): The (width, height) of the
+            resized crops. If None, the crops are returned as views. Defaults to None.
+        keep_aspect_ratio (bool, optional): Whether to keep the aspect ratio of the crops
+            when resizing them, padding the rest. Defaults to True.
+        pad_value (float, optional): The value of the padding pixels. Defaults to 0.
+        out (Optional[np.ndarray], optional): A preallocated (N, out_h, out_w, ...) array
+            to write the batch into. Defaults to None.
+
+    Returns:
+        Union[List[np.ndarray], np.ndarray]: The list of N views if `output_size` is None,
+        else the (N, out_h, out_w, ...) batch.
+
+    Raises:
+        ValueError: If `out` is given without `output_size` or does not have the expected
+            shape.
+    """
+    img_h, img_w = image.shape[:2]
+    left, top, right, bottom = _pixel_bounds(_as_box_data(boxes), img_w, img_h)
+
+    if output_size is None:
+        if out is not None:
+            raise ValueError("`out` can only be used with an `output_size`.")
+        bounds = zip(left.tolist(), top.tolist(), right.tolist(), bottom.tolist())
+        return [image[y0:y1, x0:x1] for x0, y0, x1, y1 in bounds]
+
+    out_w, out_h = output_size
+    shape = (len(left), out_h, out_w, *image.shape[2:])
+    if out is None:
+        out = np.empty(shape, dtype=image.dtype)
+    elif out.shape != shape:
+        raise ValueError(f"`out` has shape {out.shape}. Expected {shape}.")
+
+    crop_w = right - left
+    crop_h = bottom - top
+    if keep_aspect_ratio:
+        scale = np.minimum(out_w / np.maximum(crop_w, 1), out_h / np.maximum(crop_h, 1))
+        new_w = np.where(crop_w > 0, np.clip(np.round(crop_w * scale), 1, out_w), 0)
+        new_h = np.where(crop_h > 0, np.clip(np.round(crop_h * scale), 1, out_h), 0)
+    else:
+        new_w = np.where(crop_w > 0, out_w, 0)
+        new_h = np.where(crop_h > 0, out_h, 0)
+
+    rows = _resize_indices(top, crop_h, new_h, out_h, img_h)
+    cols = _resize_indices(left, crop_w, new_w, out_w, img_w)
+    pad = np.asarray(pad_value, dtype=image.dtype)
+    for i, (h, w) in enumerate(
+        zip(new_h.astype(int).tolist(), new_w.astype(int).tolist())
+    ):
+        out[i, :h, :w] = image[rows[i, :h, None], cols[i, None, :w]]
+        out[i, h:] = pad
+        out[i, :h, w:] = pad
+    return out
+
+
+def _resize_indices(
+    start: np.ndarray, length: np.ndarray, new_length: np.ndarray, size: int, limit: int
+) -> np.ndarray:
+    """
+    Returns the (N, size) source indices of a nearest neighbour resize of N ranges
+    `[start, start + length)` to `new_length` pixels. Only the first `new_length` indices
+    of each row are meaningful.
+    """
+    positions = np.arange(size)
+    ratio = length / np.maximum(new_length, 1)
+    offsets = np.floor((positions + 0.5) * ratio[:, None]).astype(np.int64)
+    indices = start[:, None] + offsets
+    return np.clip(indices, 0, max(limit - 1, 0))
+
+
+def _pixel_bounds(
+    data: np.ndarray, img_w: int, img_h: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the first and past-the-end pixel columns and rows covered by (N, 4) boxes,
+    clipped to the image.
+
+    Pixel `j` is covered if its center `j + 0.5` lies in `[left, right)`, that is if
+    `ceil(left - 0.5) <= j < ceil(right - 0.5)`.
+    """
+    bounds = np.ceil(data - 0.5).astype(np.int64)
+    bounds[:, 0::2] = np.clip(bounds[:, 0::2], 0, img_w)
+    bounds[:, 1::2] = np.clip(bounds[:, 1::2], 0, img_h)
+    return bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3]
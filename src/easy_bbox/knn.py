@@ -0,0 +1,199 @@
+"""
+knn.py
+
+Provides the `BboxKNN` class, an index answering k-nearest box queries from points or
+boxes, with exact distances.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .ops import DEFAULT_CHUNK_SIZE, Boxes, _as_box_data, _as_points
+
+
+class BboxKNN:
+    """
+    Index of a collection of boxes, answering k-nearest box queries.
+
+    The distance from a point to a box is `Bbox.distance_to_point`, and the distance
+    between two boxes is the length of the shortest segment joining them (0 if they
+    overlap or touch).
+
+    The boxes are packed into leaves of `leaf_size` spatially close boxes (Sort-Tile-
+    Recursive packing, as for bulk-loaded R-trees). The distance to the bounding box of a
+    leaf is a lower bound of the distance to any of its boxes, so each query visits the
+    leaves by increasing lower bound and stops as soon as it exceeds its current k-th
+    distance. Queries are batched: at each round, every unfinished query visits its next
+    leaf in a single vectorized step.
+
+    Ties at the k-th distance are broken arbitrarily.
+
+    Example:
+        >>> knn = BboxKNN(boxes)
+        >>> indices, distances = knn.query_points([(10, 20), (0, 0)], k=3)
+        >>> indices.shape
+        (2, 3)
+    """
+
+    def __init__(self, boxes: Boxes, leaf_size: int = 32) -> None:
+        """
+        Builds the index.
+
+        Args:
+            boxes (Boxes): The N bounding boxes to index.
+            leaf_size (int, optional): The number of boxes per leaf. Defaults to 32.
+
+        Raises:
+            ValueError: If the leaf size is not positive.
+        """
+        if leaf_size < 1:
+            raise ValueError(f"leaf_size must be positive. Received {leaf_size}")
+        data = _as_box_data(boxes)
+        self.leaf_size = leaf_size
+        self._len = len(data)
+
+        order = _str_order(data, leaf_size)
+        starts = np.arange(0, len(order), leaf_size)
+        if len(order):
+            packed = data[order]
+            self._leaf_bounds = np.concatenate(
+                (
+                    np.minimum.reduceat(packed[:, :2], starts),
+                    np.maximum.reduceat(packed[:, 2:], starts),
+                ),
+                axis=1,
+            )
+        else:
+            self._leaf_bounds = np.zeros((0, 4))
+
+        padding = len(starts) * leaf_size - len(order)
+        self._leaf_index = np.concatenate((order, np.full(padding, -1))).reshape(
+            -1, leaf_size
+        )
+        padded = np.concatenate((data[order], np.full((padding, 4), np.inf)))
+        self._leaf_boxes = padded.reshape(-1, leaf_size, 4)
+
+    def query_points(
+        self, points: ArrayLike, k: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k nearest boxes of every point.
+
+        Args:
+            points (ArrayLike): The (P, 2) array of (x, y) points.
+            k (int, optional): The number of neighbours. Defaults to 1.
+            chunk_size (int, optional): The maximum number of query-leaf pairs processed at
+                once, bounding the memory used. Defaults to 2**22.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The (P, k) indices of the nearest boxes of each
+            point, by increasing distance, and the (P, k) corresponding distances. If
+            there are less than k boxes, the missing neighbours have index -1 and an
+            infinite distance.
+
+        Raises:
+            ValueError: If the points do not have shape (P, 2), or if `k` or `chunk_size`
+                is not positive.
+        """
+        pts = _as_points(points)
+        return self._query(np.concatenate((pts, pts), axis=1), k, chunk_size)
+
+    def query_boxes(
+        self, boxes: Boxes, k: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k nearest indexed boxes of every query box.
+
+        A query box that is also indexed is its own nearest neighbour, at distance 0.
+
+        Args:
+            boxes (Boxes): The Q query boxes.
+            k (int, optional): The number of neighbours. Defaults to 1.
+            chunk_size (int, optional): The maximum number of query-leaf pairs processed at
+                once, bounding the memory used. Defaults to 2**22.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The (Q, k) indices and distances, see
+            `query_points`.
+
+        Raises:
+            ValueError: If `k` or `chunk_size` is not positive.
+        """
+        return self._query(_as_box_data(boxes), k, chunk_size)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _query(
+        self, queries: np.ndarray, k: int, chunk_size: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Finds the k nearest boxes of (Q, 4) query boxes, by chunks of queries."""
+        if k < 1:
+            raise ValueError(f"k must be positive. Received {k}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive. Received {chunk_size}")
+
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        sq_dist = np.full((len(queries), k), np.inf)
+        step = max(1, chunk_size // max(1, len(self._leaf_bounds)))
+        for q0 in range(0, len(queries), step):
+            rows = slice(q0, q0 + step)
+            indices[rows], sq_dist[rows] = self._query_chunk(queries[rows], k)
+        return indices, np.sqrt(sq_dist)
+
+    def _query_chunk(
+        self, queries: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the (Q, k) indices and squared distances of the nearest boxes."""
+        best_index = np.full((len(queries), k), -1, dtype=np.int64)
+        best_dist = np.full((len(queries), k), np.inf)
+
+        lower_bounds = _box_sq_distances(queries[:, None, :], self._leaf_bounds[None])
+        leaf_order = np.argsort(lower_bounds, axis=1)
+        lower_bounds = np.take_along_axis(lower_bounds, leaf_order, axis=1)
+
+        active = np.arange(len(queries))
+        for rank in range(len(self._leaf_bounds)):
+            active = active[lower_bounds[active, rank] < best_dist[active, -1]]
+            if not len(active):
+                break
+            leaves = leaf_order[active, rank]
+            dist = _box_sq_distances(queries[active, None, :], self._leaf_boxes[leaves])
+            merged_dist = np.concatenate((best_dist[active], dist), axis=1)
+            merged_index = np.concatenate(
+                (best_index[active], self._leaf_index[leaves]), axis=1
+            )
+            keep = np.argsort(merged_dist, axis=1, kind="stable")[:, :k]
+            best_dist[active] = np.take_along_axis(merged_dist, keep, axis=1)
+            best_index[active] = np.take_along_axis(merged_index, keep, axis=1)
+
+        return best_index, best_dist
+
+
+def _box_sq_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Returns the squared distances between broadcastable (..., 4) boxes."""
+    dx = np.maximum(np.maximum(b[..., 0] - a[..., 2], a[..., 0] - b[..., 2]), 0)
+    dy = np.maximum(np.maximum(b[..., 1] - a[..., 3], a[..., 1] - b[..., 3]), 0)
+    return dx * dx + dy * dy
+
+
+def _str_order(data: np.ndarray, leaf_size: int) -> np.ndarray:
+    """
+    Returns the Sort-Tile-Recursive order of (N, 4) boxes: sorted by center x into
+    vertical slices of whole leaves, then by center y inside each slice.
+    """
+    if not len(data):
+        return np.zeros(0, dtype=np.int64)
+    num_leaves = math.ceil(len(data) / leaf_size)
+    num_slices = max(1, math.ceil(math.sqrt(num_leaves)))
+    slice_size = math.ceil(num_leaves / num_slices) * leaf_size
+
+    center = (data[:, :2] + data[:, 2:]) / 2
+    order = np.argsort(center[:, 0], kind="stable")
+    slices = [order[s : s + slice_size] for s in range(0, len(order), slice_size)]
+    return np.concatenate([s[np.argsort(center[s, 1], kind="stable")] for s in slices])
@@ -0,0 +1,240 @@
+"""
+lazy.py
+
+Provides the `LazyBboxArray` class, a collection of boxes that keeps the coordinates in
+the format they were received in, and only converts them when another format is
+requested.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .bbox_array import BboxArray, _as_coords, _invalid_mask
+
+BOX_FORMATS = ("tlbr", "tlwh", "cwh", "norm_tlbr", "norm_tlwh", "norm_cwh")
+
+# Names of the formats in the libraries and datasets using them, as in `Bbox`
+_FORMAT_ALIASES = {
+    "xyxy": "tlbr",
+    "pascal_voc": "tlbr",
+    "coco": "tlwh",
+    "albu": "norm_tlbr",
+    "yolo": "norm_cwh",
+}
+
+
+class LazyBboxArray:
+    """
+    A collection of N boxes tagged with their source format and image size.
+
+    The coordinates are stored as received. Requesting them in the source format (with the
+    same image size for normalized formats) returns the stored array itself: no
+    arithmetic, no copy, and the values are bit-exact. Any other format goes through a
+    `BboxArray`, built on the first such request and cached.
+
+    The coordinates are copied on construction and stored read-only, so that they cannot
+    diverge from the cached `BboxArray`.
+
+    Example:
+        >>> boxes = LazyBboxArray(yolo_coords, "yolo", img_w=640, img_h=480)
+        >>> boxes.to_yolo() is boxes.coords  # free round-trip
+        True
+        >>> tlbr = boxes.to_tlbr()  # converted once, on demand
+    """
+
+    __slots__ = ("_boxes", "_coords", "_fmt", "_img_h", "_img_w")
+
+    def __init__(
+        self,
+        coords: ArrayLike,
+        fmt: str = "tlbr",
+        img_w: Optional[ArrayLike] = None,
+        img_h: Optional[ArrayLike] = None,
+        validate: bool = True,
+    ) -> None:
+        """
+        Initializes the collection from (N, 4) coordinates in any supported format.
+
+        Args:
+            coords (ArrayLike): The (N, 4) coordinates.
+            fmt (str, optional): The format of the coordinates, one of `BOX_FORMATS` or an
+                alias (`"xyxy"`, `"pascal_voc"`, `"coco"`, `"albu"`, `"yolo"`).
+                Defaults to "tlbr".
+            img_w (Optional[ArrayLike], optional): The image width in pixels, either a
+                scalar or one per box. Required for normalized formats. Defaults to None.
+            img_h (Optional[ArrayLike], optional): The image height in pixels, either a
+                scalar or one per box. Required for normalized formats. Defaults to None.
+            validate (bool, optional): Whether to raise if a box is not valid, i.e. has a
+                negative width or height or a NaN or infinite coordinate. The check is done
+                in the source format, without conversion. Defaults to True.
+
+        Raises:
+            ValueError: If the format is unknown, if the image size of a normalized format
+                is missing, if the coordinates do not have shape (N, 4), or if a box is
+                not valid.
+        """
+        self._fmt = _resolve_format(fmt)
+        if (img_w is None) != (img_h is None):
+            raise ValueError("img_w and img_h must be given together.")
+        if self._fmt.startswith("norm_") and img_w is None:
+            raise ValueError(f"The {self._fmt} format needs the image size.")
+
+        data = _as_coords(coords).copy()
+        data.flags.writeable = False
+        if validate:
+            invalid = _invalid_mask(data, sizes=not self._fmt.endswith("tlbr"))
+            if np.any(invalid):
+                raise ValueError(
+                    "The LazyBboxArray contains invalid Bboxes (negative width or height, "
+                    "or NaN or infinite coordinates)."
+                )
+        self._coords = data
+        self._img_w = img_w
+        self._img_h = img_h
+        self._boxes: Optional[BboxArray] = None
+
+    @property
+    def coords(self) -> np.ndarray:
+        """The read-only (N, 4) coordinates, in the source format."""
+        return self._coords
+
+    @property
+    def fmt(self) -> str:
+        """The source format, one of `BOX_FORMATS`."""
+        return self._fmt
+
+    @property
+    def img_w(self) -> Optional[ArrayLike]:
+        """The image width(s) recorded with the coordinates, if any."""
+        return self._img_w
+
+    @property
+    def img_h(self) -> Optional[ArrayLike]:
+        """The image height(s) recorded with the coordinates, if any."""
+        return self._img_h
+
+    @property
+    def boxes(self) -> BboxArray:
+        """The boxes as a `BboxArray`, converted on first access."""
+        if self._boxes is None:
+            from_format = getattr(BboxArray, "from_" + self._fmt)
+            if self._fmt.startswith("norm_"):
+                self._boxes = from_format(
+                    self._coords, self._img_w, self._img_h, validate=False
+                )
+            else:
+                self._boxes = from_format(self._coords, validate=False)
+        return self._boxes
+
+    def to(
+        self,
+        fmt: str,
+        img_w: Optional[ArrayLike] = None,
+        img_h: Optional[ArrayLike] = None,
+    ) -> np.ndarray:
+        """
+        Returns the coordinates in a given format.
+
+        Args:
+            fmt (str): The format, one of `BOX_FORMATS` or an alias.
+            img_w (Optional[ArrayLike], optional): The image width of normalized formats.
+                If None, the recorded image size is used. Defaults to None.
+            img_h (Optional[ArrayLike], optional): The image height of normalized formats.
+                If None, the recorded image size is used. Defaults to None.
+
+        Returns:
+            np.ndarray: The (N, 4) coordinates. In the source format, this is the stored
+            read-only array, otherwise a new array.
+
+        Raises:
+            ValueError: If the format is unknown, or if the image size of a normalized
+                format is unknown.
+        """
+        target = _resolve_format(fmt)
+        if (img_w is None) != (img_h is None):
+            raise ValueError("img_w and img_h must be given together.")
+        if img_w is None:
+            img_w, img_h = self._img_w, self._img_h
+        normalized = target.startswith("norm_")
+        if target == self._fmt and (
+            not normalized or self._same_image_size(img_w, img_h)
+        ):
+            return self._coords
+        if not normalized:
+            return getattr(self.boxes, "to_" + target)()
+        if img_w is None:
+            raise ValueError(f"The {target} format needs the image size.")
+        return getattr(self.boxes, "to_" + target)(img_w, img_h)
+
+    def to_tlbr(self) -> np.ndarray:
+        """Returns the (N, 4) (left, top, right, bottom) coordinates, see `to`."""
+        return self.to("tlbr")
+
+    def to_tlwh(self) -> np.ndarray:
+        """Returns the (N, 4) (left, top, width, height) coordinates, see `to`."""
+        return self.to("tlwh")
+
+    def to_cwh(self) -> np.ndarray:
+        """Returns the (N, 4) (center_x, center_y, width, height) coordinates, see `to`."""
+        return self.to("cwh")
+
+    def to_norm_tlbr(
+        self, img_w: Optional[ArrayLike] = None, img_h: Optional[ArrayLike] = None
+    ) -> np.ndarray:
+        """Returns the (N, 4) normalized tlbr coordinates, see `to`."""
+        return self.to("norm_tlbr", img_w, img_h)
+
+    def to_norm_tlwh(
+        self, img_w: Optional[ArrayLike] = None, img_h: Optional[ArrayLike] = None
+    ) -> np.ndarray:
+        """Returns the (N, 4) normalized tlwh coordinates, see `to`."""
+        return self.to("norm_tlwh", img_w, img_h)
+
+    def to_norm_cwh(
+        self, img_w: Optional[ArrayLike] = None, img_h: Optional[ArrayLike] = None
+    ) -> np.ndarray:
+        """Returns the (N, 4) normalized cwh coordinates, see `to`."""
+        return self.to("norm_cwh", img_w, img_h)
+
+    to_xyxy = to_tlbr
+    to_pascal_voc = to_tlbr
+    to_coco = to_tlwh
+    to_albu = to_norm_tlbr
+    to_yolo = to_norm_cwh
+
+    def __len__(self) -> int:
+        return len(self._coords)
+
+    def __repr__(self) -> str:
+        converted = self._boxes is not None
+        return f"LazyBboxArray(n={len(self)}, fmt={self._fmt!r}, converted={converted})"
+
+    def _same_image_size(
+        self, img_w: Optional[ArrayLike], img_h: Optional[ArrayLike]
+    ) -> bool:
+        """Checks whether an image size is the recorded one."""
+        if img_w is None or img_h is None or self._img_w is None or self._img_h is None:
+            return img_w is None and self._img_w is None
+        return bool(
+            np.array_equal(img_w, self._img_w) and np.array_equal(img_h, self._img_h)
+        )
+
+
+def _resolve_format(fmt: str) -> str:
+    """
+    Returns the name in `BOX_FORMATS` of a format or of one of its aliases.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    resolved = _FORMAT_ALIASES.get(fmt, fmt)
+    if resolved not in BOX_FORMATS:
+        raise ValueError(
+            f"Unknown format {fmt!r}. Expected one of {BOX_FORMATS} "
+            f"or {tuple(_FORMAT_ALIASES)}."
+        )
+    return resolved
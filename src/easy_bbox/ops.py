@@ -0,0 +1,305 @@
+"""
+ops.py
+
+Vectorized kernels operating on whole collections of bounding boxes at once. Every function
+accepts either a `BboxArray` or a sequence of `Bbox`, and works on NumPy arrays without
+creating intermediate `Bbox` objects.
+
+Kernels run in the precision of their inputs: float32 when every `BboxArray` is stored as
+float32, float64 otherwise. In float32, IoUs have an absolute error of about 1e-7 (a few
+units in the last place), so an IoU compared with a threshold may be classified
+differently than in float64 when it lies within that distance of the threshold. Use
+float64 boxes when such ties must be decided exactly.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .bbox import Bbox
+from .bbox_array import BboxArray
+
+Boxes = Union[BboxArray, Sequence[Bbox]]
+
+DEFAULT_CHUNK_SIZE = 1 << 22
+
+
+def points_in_boxes(points: ArrayLike, boxes: Boxes) -> np.ndarray:
+    """
+    Checks which points are inside which boxes, like `Bbox.contains_point`.
+
+    Args:
+        points (ArrayLike): The (P, 2) array of (x, y) points.
+        boxes (Boxes): The N bounding boxes.
+
+    Returns:
+        np.ndarray: The (P, N) boolean mask, True where point p is inside box n.
+
+    Raises:
+        ValueError: If the points do not have shape (P, 2).
+    """
+    pts = _as_points(points)
+    data = _as_box_data(boxes)
+    x = pts[:, 0:1]
+    y = pts[:, 1:2]
+    return (data[:, 0] <= x) & (x <= data[:, 2]) & (data[:, 1] <= y) & (y <= data[:, 3])
+
+
+def points_to_boxes_distance(points: ArrayLike, boxes: Boxes) -> np.ndarray:
+    """
+    Calculates the distance from every point to every box, like `Bbox.distance_to_point`.
+
+    The full (P, N) matrix is materialized, use `nearest_box` when only the closest box of
+    each point is needed.
+
+    Args:
+        points (ArrayLike): The (P, 2) array of (x, y) points.
+        boxes (Boxes): The N bounding boxes.
+
+    Returns:
+        np.ndarray: The (P, N) distance matrix.
+
+    Raises:
+        ValueError: If the points do not have shape (P, 2).
+    """
+    return np.sqrt(_squared_distances(_as_points(points), _as_box_data(boxes)))
+
+
+def nearest_box(
+    points: ArrayLike, boxes: Boxes, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the closest box of every point.
+
+    The (P, N) distance matrix is computed by tiles of at most `chunk_size` elements, so
+    the memory used stays bounded whatever the number of points and boxes. Points inside a
+    box are at distance 0 of it. Ties are broken in favor of the lowest box index.
+
+    Args:
+        points (ArrayLike): The (P, 2) array of (x, y) points.
+        boxes (Boxes): The N bounding boxes, N > 0.
+        chunk_size (int, optional): The maximum number of point-box pairs per tile.
+            Defaults to 2**22.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (P,) index of the closest box of each point,
+        and the (P,) corresponding distances.
+
+    Raises:
+        ValueError: If there is no box, if the points do not have shape (P, 2), or if
+            `chunk_size` is not positive.
+    """
+    pts = _as_points(points)
+    data = _as_box_data(boxes)
+    if len(data) == 0:
+        raise ValueError("Cannot find the nearest box among zero boxes.")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive. Received {chunk_size}")
+
+    box_step = min(len(data), chunk_size)
+    point_step = max(1, chunk_size // box_step)
+    best_index = np.zeros(len(pts), dtype=np.int64)
+    best_dist = np.full(len(pts), np.inf)
+
+    for p0 in range(0, len(pts), point_step):
+        rows = slice(p0, p0 + point_step)
+        for b0 in range(0, len(data), box_step):
+            sq_dist = _squared_distances(pts[rows], data[b0 : b0 + box_step])
+            index = sq_dist.argmin(axis=1)
+            dist = np.take_along_axis(sq_dist, index[:, None], axis=1)[:, 0]
+            better = dist < best_dist[rows]
+            best_dist[rows] = np.where(better, dist, best_dist[rows])
+            best_index[rows] = np.where(better, index + b0, best_index[rows])
+
+    return best_index, np.sqrt(best_dist)
+
+
+# region IoU metrics
+def box_iou(boxes1: Boxes, boxes2: Boxes, aligned: bool = False) -> np.ndarray:
+    """
+    Calculates the Intersection over Union (IoU) of boxes, like `Bbox.iou`.
+
+    Args:
+        boxes1 (Boxes): The N first bounding boxes.
+        boxes2 (Boxes): The M second bounding boxes.
+        aligned (bool, optional): If True, compares `boxes1[i]` with `boxes2[i]` only
+            (N must equal M). Otherwise compares every pair. Defaults to False.
+
+    Returns:
+        np.ndarray: The (N,) IoUs if `aligned`, else the (N, M) IoU matrix.
+
+    Raises:
+        ValueError: If `aligned` is True and the lengths of the boxes do not match.
+    """
+    a, b = _broadcast_pairs(boxes1, boxes2, aligned)
+    return _iou(a, b)[0]
+
+
+def box_giou(boxes1: Boxes, boxes2: Boxes, aligned: bool = False) -> np.ndarray:
+    """
+    Calculates the Generalized IoU (GIoU) of boxes.
+
+    `GIoU = IoU - (C - U) / C`, where U is the area of the union of the two boxes and C the
+    area of their minimal englobing box (see `Bbox.union`). It ranges in [-1, 1].
+
+    Args:
+        boxes1 (Boxes): The N first bounding boxes.
+        boxes2 (Boxes): The M second bounding boxes.
+        aligned (bool, optional): If True, compares `boxes1[i]` with `boxes2[i]` only
+            (N must equal M). Otherwise compares every pair. Defaults to False.
+
+    Returns:
+        np.ndarray: The (N,) GIoUs if `aligned`, else the (N, M) GIoU matrix.
+
+    Raises:
+        ValueError: If `aligned` is True and the lengths of the boxes do not match.
+    """
+    a, b = _broadcast_pairs(boxes1, boxes2, aligned)
+    iou, union = _iou(a, b)
+    enclosing = _enclosing_wh(a, b)
+    area = enclosing[..., 0] * enclosing[..., 1]
+    return iou - _safe_divide(area - union, area)
+
+
+def box_diou(boxes1: Boxes, boxes2: Boxes, aligned: bool = False) -> np.ndarray:
+    """
+    Calculates the Distance IoU (DIoU) of boxes.
+
+    `DIoU = IoU - d^2 / c^2`, where d is the distance between the centers of the two boxes
+    and c the diagonal of their minimal englobing box. It ranges in [-1, 1].
+
+    Args:
+        boxes1 (Boxes): The N first bounding boxes.
+        boxes2 (Boxes): The M second bounding boxes.
+        aligned (bool, optional): If True, compares `boxes1[i]` with `boxes2[i]` only
+            (N must equal M). Otherwise compares every pair. Defaults to False.
+
+    Returns:
+        np.ndarray: The (N,) DIoUs if `aligned`, else the (N, M) DIoU matrix.
+
+    Raises:
+        ValueError: If `aligned` is True and the lengths of the boxes do not match.
+    """
+    a, b = _broadcast_pairs(boxes1, boxes2, aligned)
+    return _iou(a, b)[0] - _center_penalty(a, b)
+
+
+def box_ciou(boxes1: Boxes, boxes2: Boxes, aligned: bool = False) -> np.ndarray:
+    """
+    Calculates the Complete IoU (CIoU) of boxes.
+
+    `CIoU = DIoU - alpha * v`, where `v = 4 / pi^2 * (atan(w2 / h2) - atan(w1 / h1))^2`
+    measures the consistency of the aspect ratios and `alpha = v / (1 - IoU + v)`.
+
+    Args:
+        boxes1 (Boxes): The N first bounding boxes.
+        boxes2 (Boxes): The M second bounding boxes.
+        aligned (bool, optional): If True, compares `boxes1[i]` with `boxes2[i]` only
+            (N must equal M). Otherwise compares every pair. Defaults to False.
+
+    Returns:
+        np.ndarray: The (N,) CIoUs if `aligned`, else the (N, M) CIoU matrix.
+
+    Raises:
+        ValueError: If `aligned` is True and the lengths of the boxes do not match.
+    """
+    a, b = _broadcast_pairs(boxes1, boxes2, aligned)
+    iou = _iou(a, b)[0]
+    angle_a = np.arctan2(a[..., 2] - a[..., 0], a[..., 3] - a[..., 1])
+    angle_b = np.arctan2(b[..., 2] - b[..., 0], b[..., 3] - b[..., 1])
+    v = (4 / np.pi**2) * (angle_b - angle_a) ** 2
+    alpha = _safe_divide(v, 1 - iou + v)
+    return iou - _center_penalty(a, b) - alpha * v
+
+
+def _broadcast_pairs(
+    boxes1: Boxes, boxes2: Boxes, aligned: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the coordinates of two box collections, shaped to be broadcast together.
+
+    Raises:
+        ValueError: If `aligned` is True and the lengths of the boxes do not match.
+    """
+    a = _as_box_data(boxes1)
+    b = _as_box_data(boxes2)
+    if aligned:
+        if len(a) != len(b):
+            raise ValueError("Aligned boxes must have the same length.")
+        return a, b
+    return a[:, None, :], b[None, :, :]
+
+
+def _iou(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the IoU and the union area of broadcastable (..., 4) boxes."""
+    tl = np.maximum(a[..., :2], b[..., :2])
+    br = np.minimum(a[..., 2:], b[..., 2:])
+    inter_w, inter_h = np.moveaxis(np.maximum(br - tl, 0), -1, 0)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return _safe_divide(inter, union), union
+
+
+def _enclosing_wh(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Returns the (..., 2) width and height of the minimal box englobing `a` and `b`."""
+    return np.maximum(a[..., 2:], b[..., 2:]) - np.minimum(a[..., :2], b[..., :2])
+
+
+def _center_penalty(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Returns the DIoU penalty: squared center distance over squared englobing diagonal."""
+    center_diff = (a[..., :2] + a[..., 2:]) / 2 - (b[..., :2] + b[..., 2:]) / 2
+    enclosing = _enclosing_wh(a, b)
+    return _safe_divide((center_diff**2).sum(axis=-1), (enclosing**2).sum(axis=-1))
+
+
+def _safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """Divides element-wise, returning 0 where the denominator is 0."""
+    num, den = np.broadcast_arrays(num, den)
+    out = np.zeros(num.shape, dtype=np.result_type(num, den, np.float32))
+    return np.divide(num, den, out=out, where=den != 0)
+
+
+# endregion
+
+
+def _squared_distances(points: np.ndarray, data: np.ndarray) -> np.ndarray:
+    """Returns the (P, N) squared distances between (P, 2) points and (N, 4) boxes."""
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    dx = np.maximum(np.maximum(data[:, 0] - x, x - data[:, 2]), 0)
+    dy = np.maximum(np.maximum(data[:, 1] - y, y - data[:, 3]), 0)
+    return dx * dx + dy * dy
+
+
+def _as_box_data(boxes: Boxes) -> np.ndarray:
+    """
+    Returns the (N, 4) float coordinates of a `BboxArray` or a sequence of `Bbox`, as
+    float32 for float32 boxes and as float64 otherwise.
+    """
+    if not isinstance(boxes, BboxArray):
+        boxes = BboxArray.from_bboxes(boxes)
+    if boxes.dtype == np.float32:
+        return boxes.data
+    return boxes.data.astype(np.float64, copy=False)
+
+
+def _as_points(points: ArrayLike) -> np.ndarray:
+    """
+    Converts an array-like to a float64 array of shape (P, 2).
+
+    Raises:
+        ValueError: If the points cannot be seen as a (P, 2) array.
+    """
+    pts = np.asarray(points, dtype=np.float64)
+    if pts.ndim == 1 and pts.size == 0:
+        return pts.reshape(0, 2)
+    if pts.ndim != 2 or pts.shape[1] != 2:
+        raise ValueError(
+            f"An array of shape {pts.shape} has been passed. Need an array of shape (P, 2)."
+        )
+    return pts
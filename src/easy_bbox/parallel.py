@@ -0,0 +1,258 @@
+"""
+parallel.py
+
+Chunked, thread-parallel evaluation of pairwise kernels between two large collections of
+bounding boxes.
+
+The (N, M) problem is cut into tiles of at most `tile_size` pairs, evaluated with NumPy
+operations which release the GIL, so that tiles run in parallel on a thread pool. The
+reductions (`pairwise_topk`, `pairwise_threshold`) keep only their result, and never hold
+more than one tile per thread in memory.
+
+The available kernels are:
+
+- `"iou"`: the Intersection over Union, like `box_iou`.
+- `"intersection"`: the area of the intersection.
+- `"containment"`: the fraction of the area of `boxes2[j]` covered by `boxes1[i]`, 0 for
+  zero-area boxes.
+- `"distance"`: the length of the shortest segment joining the two boxes, 0 if they
+  overlap or touch.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .knn import _box_sq_distances
+from .ops import Boxes, _as_box_data, _iou, _safe_divide
+
+DEFAULT_TILE_SIZE = 1 << 20
+
+
+def _intersection(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Returns the intersection areas of broadcastable (..., 4) boxes."""
+    inter_w = np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    inter_h = np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    return np.maximum(inter_w, 0) * np.maximum(inter_h, 0)
+
+
+def _containment(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Returns the fraction of the area of `b` covered by `a`."""
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return _safe_divide(_intersection(a, b), area_b)
+
+
+# Pairwise kernels on broadcastable (..., 4) boxes
+_KERNELS: Dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "iou": lambda a, b: _iou(a, b)[0],
+    "intersection": _intersection,
+    "containment": _containment,
+    "distance": lambda a, b: np.sqrt(_box_sq_distances(a, b)),
+}
+PAIRWISE_KERNELS = tuple(_KERNELS)
+
+
+def pairwise(
+    boxes1: Boxes,
+    boxes2: Boxes,
+    kernel: str = "iou",
+    tile_size: int = DEFAULT_TILE_SIZE,
+    num_threads: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Evaluates a kernel on every pair of boxes, by tiles on a thread pool.
+
+    Args:
+        boxes1 (Boxes): The N first bounding boxes.
+        boxes2 (Boxes): The M second bounding boxes.
+        kernel (str, optional): The kernel, one of `PAIRWISE_KERNELS`. Defaults to "iou".
+        tile_size (int, optional): The maximum number of pairs per tile. Defaults to 2**20.
+        num_threads (Optional[int], optional): The number of threads. If None, the number
+            of CPUs is used. Defaults to None.
+
+    Returns:
+        np.ndarray: The (N, M) matrix of the kernel values, in float32 if both box
+        collections are stored as float32.
+
+    Raises:
+        ValueError: If the kernel is unknown, or if `tile_size` or `num_threads` is not
+            positive.
+    """
+    a, b, func = _prepare(boxes1, boxes2, kernel, tile_size, num_threads)
+    out = np.empty((len(a), len(b)), dtype=np.result_type(a, b))
+
+    def run(rows: slice) -> None:
+        for cols in _col_tiles(rows, len(b), tile_size):
+            out[rows, cols] = func(a[rows, None, :], b[None, cols, :])
+
+    _run_row_tiles(run, len(a), len(b), tile_size, num_threads)
+    return out
+
+
+def pairwise_topk(
+    boxes1: Boxes,
+    boxes2: Boxes,
+    kernel: str = "iou",
+    k: int = 1,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    num_threads: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds, for each box of `boxes1`, the k best boxes of `boxes2` for a kernel, without
+    materializing the (N, M) matrix.
+
+    The best boxes are the k largest values, or the k smallest for `"distance"`. Ties at
+    the k-th value are broken arbitrarily.
+
+    Args:
+        boxes1 (Boxes): The N first bounding boxes.
+        boxes2 (Boxes): The M second bounding boxes.
+        kernel (str, optional): The kernel, one of `PAIRWISE_KERNELS`. Defaults to "iou".
+        k (int, optional): The number of boxes to keep per row. Defaults to 1.
+        tile_size (int, optional): The maximum number of pairs per tile. Defaults to 2**20.
+        num_threads (Optional[int], optional): The number of threads. If None, the number
+            of CPUs is used. Defaults to None.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (N, k) indices in `boxes2`, from best to worst,
+        and the (N, k) corresponding values. If M < k, the missing boxes have index -1 and
+        the worst possible value (-inf, or inf for `"distance"`).
+
+    Raises:
+        ValueError: If the kernel is unknown, or if `k`, `tile_size` or `num_threads` is
+            not positive.
+    """
+    if k < 1:
+        raise ValueError(f"k must be positive. Received {k}")
+    a, b, func = _prepare(boxes1, boxes2, kernel, tile_size, num_threads)
+    # Values are negated for distances, so that the best values are always the largest
+    sign = -1.0 if kernel == "distance" else 1.0
+    best_index = np.full((len(a), k), -1, dtype=np.int64)
+    best_value = np.full((len(a), k), -np.inf, dtype=np.result_type(a, b))
+
+    def run(rows: slice) -> None:
+        index = best_index[rows]
+        value = best_value[rows]
+        for cols in _col_tiles(rows, len(b), tile_size):
+            tile = sign * func(a[rows, None, :], b[None, cols, :])
+            tile_index = np.broadcast_to(np.arange(cols.start, cols.stop), tile.shape)
+            if tile.shape[1] > k:
+                part = np.argpartition(-tile, k - 1, axis=1)[:, :k]
+                tile = np.take_along_axis(tile, part, axis=1)
+                tile_index = np.take_along_axis(tile_index, part, axis=1)
+            merged_value = np.concatenate((value, tile), axis=1)
+            merged_index = np.concatenate((index, tile_index), axis=1)
+            keep = np.argsort(-merged_value, axis=1, kind="stable")[:, :k]
+            value = np.take_along_axis(merged_value, keep, axis=1)
+            index = np.take_along_axis(merged_index, keep, axis=1)
+        best_index[rows] = index
+        best_value[rows] = value
+
+    _run_row_tiles(run, len(a), len(b), tile_size, num_threads)
+    return best_index, sign * best_value
+
+
+def pairwise_threshold(
+    boxes1: Boxes,
+    boxes2: Boxes,
+    threshold: float,
+    kernel: str = "iou",
+    tile_size: int = DEFAULT_TILE_SIZE,
+    num_threads: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Finds the pairs of boxes whose kernel value passes a threshold, without materializing
+    the (N, M) matrix.
+
+    A pair passes if its value is at least `threshold`, or at most `threshold` for
+    `"distance"`.
+
+    Args:
+        boxes1 (Boxes): The N first bounding boxes.
+        boxes2 (Boxes): The M second bounding boxes.
+        threshold (float): The threshold.
+        kernel (str, optional): The kernel, one of `PAIRWISE_KERNELS`. Defaults to "iou".
+        tile_size (int, optional): The maximum number of pairs per tile. Defaults to 2**20.
+        num_threads (Optional[int], optional): The number of threads. If None, the number
+            of CPUs is used. Defaults to None.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The indices in `boxes1` and in `boxes2`
+        of the passing pairs, sorted by row then column, and their values.
+
+    Raises:
+        ValueError: If the kernel is unknown, or if `tile_size` or `num_threads` is not
+            positive.
+    """
+    a, b, func = _prepare(boxes1, boxes2, kernel, tile_size, num_threads)
+    found: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+
+    def run(rows: slice) -> None:
+        for cols in _col_tiles(rows, len(b), tile_size):
+            tile = func(a[rows, None, :], b[None, cols, :])
+            mask = tile <= threshold if kernel == "distance" else tile >= threshold
+            i, j = np.nonzero(mask)
+            found.append((i + rows.start, j + cols.start, tile[i, j]))
+
+    _run_row_tiles(run, len(a), len(b), tile_size, num_threads)
+    if not found:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty.copy(), np.zeros(0, dtype=np.result_type(a, b))
+    rows, cols, values = (np.concatenate(parts) for parts in zip(*found))
+    order = np.lexsort((cols, rows))
+    return rows[order], cols[order], values[order]
+
+
+def _prepare(
+    boxes1: Boxes,
+    boxes2: Boxes,
+    kernel: str,
+    tile_size: int,
+    num_threads: Optional[int],
+) -> Tuple[np.ndarray, np.ndarray, Callable[[np.ndarray, np.ndarray], np.ndarray]]:
+    """
+    Checks the arguments, and returns the coordinates of the boxes and the kernel.
+
+    Raises:
+        ValueError: If the kernel is unknown, or if `tile_size` or `num_threads` is not
+            positive.
+    """
+    if kernel not in _KERNELS:
+        raise ValueError(
+            f"Unknown kernel {kernel!r}. Expected one of {PAIRWISE_KERNELS}."
+        )
+    if tile_size < 1:
+        raise ValueError(f"tile_size must be positive. Received {tile_size}")
+    if num_threads is not None and num_threads < 1:
+        raise ValueError(f"num_threads must be positive. Received {num_threads}")
+    return _as_box_data(boxes1), _as_box_data(boxes2), _KERNELS[kernel]
+
+
+def _col_tiles(rows: slice, num_cols: int, tile_size: int) -> List[slice]:
+    """Returns the column slices of the tiles of a block of rows."""
+    step = max(1, tile_size // max(1, rows.stop - rows.start))
+    return [slice(c0, min(c0 + step, num_cols)) for c0 in range(0, num_cols, step)]
+
+
+def _run_row_tiles(
+    run: Callable[[slice], None],
+    num_rows: int,
+    num_cols: int,
+    tile_size: int,
+    num_threads: Optional[int],
+) -> None:
+    """Runs `run` on blocks of rows of at most `tile_size` pairs, on a thread pool."""
+    step = max(1, tile_size // max(1, num_cols))
+    blocks = [slice(r0, min(r0 + step, num_rows)) for r0 in range(0, num_rows, step)]
+    workers = min(num_threads or os.cpu_count() or 1, len(blocks))
+    if workers <= 1:
+        for rows in blocks:
+            run(rows)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(run, rows) for rows in blocks]:
+            future.result()
@@ -0,0 +1,420 @@
+"""
+pipeline.py
+
+Provides an asyncio-based pipeline converting whole annotation datasets between the COCO,
+YOLO and Pascal VOC formats.
+
+The pipeline has three stages connected by bounded queues (so that a slow stage applies
+backpressure on the previous ones):
+
+1. Readers load and parse the source files concurrently, in worker threads.
+2. A converter groups the parsed images in batches and converts all their coordinates in
+   a single `BboxArray` operation.
+3. Writers serialize the converted images to disk concurrently, in worker threads.
+
+For per-image destination formats (YOLO and VOC), every written image is recorded in a
+progress file so that an interrupted conversion can be resumed where it stopped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    IO,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from .bbox_array import BboxArray
+from .formats import (
+    FORMATS,
+    PER_IMAGE_EXTENSIONS,
+    ImageAnnotations,
+    dump_coco,
+    dump_voc,
+    dump_yolo,
+    load_coco,
+    parse_voc,
+    parse_yolo,
+)
+
+PROGRESS_FILE_NAME = ".easy_bbox_progress"
+
+
+@dataclass
+class ConversionReport:
+    """
+    Summary of a dataset conversion.
+
+    Attributes:
+        images (int): The number of images converted during this run.
+        boxes (int): The number of boxes converted during this run.
+        skipped (int): The number of images skipped because they were already converted
+            by a previous run.
+    """
+
+    images: int = 0
+    boxes: int = 0
+    skipped: int = 0
+
+
+class _ProgressJournal:
+    """Append-only record of the source items already converted, safe across threads."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+
+    def load(self) -> Set[str]:
+        """Returns the keys recorded by previous runs."""
+        if not self.path.exists():
+            return set()
+        return set(self.path.read_text().splitlines())
+
+    def record(self, key: str) -> None:
+        """Records that the item `key` has been fully converted."""
+        with self._lock:
+            if self._file is None:
+                self._file = self.path.open("a")
+            self._file.write(key + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        """Closes the underlying file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+async def convert_dataset_async(
+    src: Union[str, Path],
+    dst: Union[str, Path],
+    src_format: str,
+    dst_format: str,
+    *,
+    classes: Optional[Sequence[str]] = None,
+    img_size: Optional[Tuple[int, int]] = None,
+    image_sizes: Optional[Mapping[str, Tuple[int, int]]] = None,
+    concurrency: int = 8,
+    queue_size: int = 64,
+    batch_size: int = 256,
+    resume: bool = True,
+) -> ConversionReport:
+    """
+    Converts an annotation dataset from one format to another.
+
+    COCO datasets are a single JSON file, while YOLO and VOC datasets are directories holding
+    one annotation file per image.
+
+    Args:
+        src (Union[str, Path]): The source JSON file (COCO) or directory (YOLO, VOC).
+        dst (Union[str, Path]): The destination JSON file (COCO) or directory (YOLO, VOC).
+        src_format (str): The source format, one of `"coco"`, `"yolo"` and `"voc"`.
+        dst_format (str): The destination format, one of `"coco"`, `"yolo"` and `"voc"`.
+        classes (Optional[Sequence[str]], optional): The category names indexed by class id,
+            used to read and write YOLO labels. Defaults to None.
+        img_size (Optional[Tuple[int, int]], optional): The (width, height) used for YOLO
+            sources when an image is missing from `image_sizes`. Defaults to None.
+        image_sizes (Optional[Mapping[str, Tuple[int, int]]], optional): The (width, height)
+            of each image, keyed by YOLO file stem. Defaults to None.
+        concurrency (int, optional): The number of concurrent readers and writers.
+            Defaults to 8.
+        queue_size (int, optional): The capacity of the queues between stages.
+            Defaults to 64.
+        batch_size (int, optional): The maximum number of images converted at once.
+            Defaults to 256.
+        resume (bool, optional): Whether to skip the images recorded in the progress file of
+            a previous run. Only used for YOLO and VOC destinations. Defaults to True.
+
+    Returns:
+        ConversionReport: The summary of the conversion.
+
+    Raises:
+        ValueError: If a format is unknown, if `concurrency`, `queue_size` or `batch_size`
+            is not positive, if the size of a YOLO image is unknown, or if two images have
+            the same file stem (e.g. `train/0001.jpg` and `val/0001.jpg`) and would be
+            written to the same YOLO or VOC file.
+    """
+    for fmt in (src_format, dst_format):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}. Expected one of {FORMATS}.")
+    if min(concurrency, queue_size, batch_size) < 1:
+        raise ValueError("concurrency, queue_size and batch_size must be positive.")
+
+    src, dst = Path(src), Path(dst)
+    report = ConversionReport()
+    journal: Optional[_ProgressJournal] = None
+    done: Set[str] = set()
+    if dst_format in PER_IMAGE_EXTENSIONS:
+        dst.mkdir(parents=True, exist_ok=True)
+        journal = _ProgressJournal(dst / PROGRESS_FILE_NAME)
+        if resume:
+            done = journal.load()
+        else:
+            journal.path.unlink(missing_ok=True)
+    else:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+
+    def parse(path: Path) -> ImageAnnotations:
+        text = path.read_text()
+        if src_format == "voc":
+            record = parse_voc(text)
+            record.name = record.name or path.stem
+            return record
+        size = (image_sizes or {}).get(path.stem, img_size)
+        if size is None:
+            raise ValueError(f"The size of the image {path.stem!r} is unknown.")
+        return parse_yolo(text, path.stem, size[0], size[1], classes=classes)
+
+    parsed: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    rendered: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    async def read_coco() -> None:
+        text = await asyncio.to_thread(src.read_text)
+        for order, record in enumerate(await asyncio.to_thread(load_coco, text)):
+            await parsed.put((order, record.name, record))
+        await parsed.put(None)
+
+    async def read_files() -> None:
+        paths: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        async def produce() -> None:
+            pattern = "*" + PER_IMAGE_EXTENSIONS[src_format]
+            for item in enumerate(sorted(src.glob(pattern))):
+                await paths.put(item)
+            for _ in range(concurrency):
+                await paths.put(None)
+
+        async def read() -> None:
+            while (item := await paths.get()) is not None:
+                order, path = item
+                if path.name in done:
+                    report.skipped += 1
+                    continue
+                record = await asyncio.to_thread(parse, path)
+                await parsed.put((order, path.name, record))
+
+        await asyncio.gather(produce(), *(read() for _ in range(concurrency)))
+        await parsed.put(None)
+
+    async def convert() -> None:
+        # Readers run concurrently, so COCO images are sorted back in the source order
+        coco_items: List[Tuple[int, ImageAnnotations, np.ndarray]] = []
+        # Per-image outputs are named after the file stem, so it must be unique
+        outputs: Dict[Path, str] = {}
+        finished = False
+        while not finished:
+            batch = []
+            item = await parsed.get()
+            while item is not None:
+                _, key, record = item
+                if key in done:
+                    report.skipped += 1
+                else:
+                    batch.append(item)
+                if len(batch) >= batch_size or parsed.empty():
+                    break
+                item = parsed.get_nowait()
+            finished = item is None
+            if not batch:
+                continue
+
+            records = [record for _, _, record in batch]
+            coords = await asyncio.to_thread(_convert_batch, records, dst_format)
+            if dst_format == "coco":
+                coco_items.extend(
+                    (order, record, c) for (order, _, record), c in zip(batch, coords)
+                )
+                continue
+            texts = await asyncio.to_thread(
+                _render_batch, records, coords, dst_format, classes
+            )
+            for (_, key, record), text in zip(batch, texts):
+                path = dst / (record.stem + PER_IMAGE_EXTENSIONS[dst_format])
+                if path in outputs:
+                    raise ValueError(
+                        f"The images {outputs[path]!r} and {record.name!r} would both "
+                        f"be written to {path.name!r}."
+                    )
+                outputs[path] = record.name
+                await rendered.put((key, path, text, len(record.boxes)))
+
+        if dst_format == "coco":
+            coco_items.sort(key=lambda item: item[0])
+            coco_records = [record for _, record, _ in coco_items]
+            coco_coords = [c for _, _, c in coco_items]
+            text = await asyncio.to_thread(
+                dump_coco, coco_records, coco_coords, classes
+            )
+            await asyncio.to_thread(dst.write_text, text)
+            report.images += len(coco_records)
+            report.boxes += sum(len(r.boxes) for r in coco_records)
+        for _ in range(concurrency):
+            await rendered.put(None)
+
+    def write(key: str, path: Path, text: str) -> None:
+        path.write_text(text)
+        if journal is not None:
+            journal.record(key)
+
+    async def write_files() -> None:
+        while (item := await rendered.get()) is not None:
+            key, path, text, n_boxes = item
+            await asyncio.to_thread(write, key, path, text)
+            report.images += 1
+            report.boxes += n_boxes
+
+    reader = read_coco() if src_format == "coco" else read_files()
+    tasks = [
+        asyncio.ensure_future(coro)
+        for coro in (reader, convert(), *(write_files() for _ in range(concurrency)))
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if journal is not None:
+            journal.close()
+
+    return report
+
+
+def convert_dataset(
+    src: Union[str, Path],
+    dst: Union[str, Path],
+    src_format: str,
+    dst_format: str,
+    **kwargs,
+) -> ConversionReport:
+    """
+    Synchronous wrapper around `convert_dataset_async`, see its documentation.
+
+    Returns:
+        ConversionReport: The summary of the conversion.
+    """
+    return asyncio.run(
+        convert_dataset_async(src, dst, src_format, dst_format, **kwargs)
+    )
+
+
+def _convert_batch(
+    records: Sequence[ImageAnnotations], dst_format: str
+) -> List[np.ndarray]:
+    """
+    Converts the boxes of several images to the coordinates of the target format at once.
+
+    Args:
+        records (Sequence[ImageAnnotations]): The images to convert.
+        dst_format (str): The target format.
+
+    Returns:
+        List[np.ndarray]: For each image, the (N, 4) converted coordinates.
+    """
+    counts = [len(r.boxes) for r in records]
+    boxes = BboxArray(np.concatenate([r.boxes.data for r in records]))
+    if dst_format == "yolo":
+        img_w = np.repeat([r.width for r in records], counts)
+        img_h = np.repeat([r.height for r in records], counts)
+        coords = boxes.to_yolo(img_w, img_h)
+    elif dst_format == "coco":
+        coords = boxes.to_coco()
+    else:
+        coords = boxes.to_pascal_voc()
+    return np.split(coords, np.cumsum(counts)[:-1])
+
+
+def _render_batch(
+    records: Sequence[ImageAnnotations],
+    coords: Sequence[np.ndarray],
+    dst_format: str,
+    classes: Optional[Sequence[str]],
+) -> List[str]:
+    """Serializes converted images to a per-image format."""
+    if dst_format == "yolo":
+        return [dump_yolo(r, c, classes=classes) for r, c in zip(records, coords)]
+    return [dump_voc(r, c) for r, c in zip(records, coords)]
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """Entry point of the `easy-bbox-convert` command."""
+    parser = argparse.ArgumentParser(
+        prog="easy-bbox-convert",
+        description="Convert an annotation dataset between the COCO, YOLO and VOC formats.",
+    )
+    add_arguments(parser)
+    args = parser.parse_args(None if argv is None else list(argv))
+    report = run(args)
+    print(
+        f"Converted {report.images} images ({report.boxes} boxes), "
+        f"skipped {report.skipped} already converted."
+    )
+    return 0
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments of the conversion command to a parser."""
+    parser.add_argument("src", help="Source JSON file (coco) or directory (yolo, voc).")
+    parser.add_argument("dst", help="Destination JSON file (coco) or directory.")
+    parser.add_argument("--from", dest="src_format", choices=FORMATS, required=True)
+    parser.add_argument("--to", dest="dst_format", choices=FORMATS, required=True)
+    parser.add_argument(
+        "--classes", help="File with one category name per line, in class id order."
+    )
+    parser.add_argument(
+        "--img-size",
+        nargs=2,
+        type=int,
+        metavar=("W", "H"),
+        help="Image size used to read YOLO labels.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of concurrent readers and writers.",
+    )
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Convert every image, ignoring the progress of previous runs.",
+    )
+
+
+def run(args: argparse.Namespace) -> ConversionReport:
+    """Runs the conversion described by the arguments parsed with `add_arguments`."""
+    classes = None
+    if args.classes is not None:
+        classes = [c for c in Path(args.classes).read_text().splitlines() if c]
+
+    return convert_dataset(
+        args.src,
+        args.dst,
+        args.src_format,
+        args.dst_format,
+        classes=classes,
+        img_size=tuple(args.img_size) if args.img_size else None,
+        concurrency=args.concurrency,
+        queue_size=args.queue_size,
+        batch_size=args.batch_size,
+        resume=not args.no_resume,
+    )
@@ -0,0 +1,173 @@
+"""
+profiling.py
+
+Opt-in instrumentation of the hot paths of the library: `Bbox` construction, `Bbox.iou`,
+`Bbox.intersection` and `nms`. When enabled, it counts the calls and accumulates their
+wall time (nested calls included, e.g. `iou` calls `intersection` which builds a `Bbox`),
+as well as the number of boxes entering and leaving `nms`.
+
+When disabled, the instrumentation costs nothing: the `Bbox` methods are only wrapped while
+profiling is enabled, and `nms` only checks whether a collector is active.
+
+Example:
+    >>> from easy_bbox import profiling
+    >>> with profiling.profile() as stats:
+    ...     bbox.iou(other)
+    >>> stats.snapshot()["Bbox.iou"]["calls"]
+    1
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .bbox import Bbox
+
+# Bbox attributes wrapped while profiling, and the name they are reported under
+_INSTRUMENTED_METHODS = {
+    "__init__": "Bbox.__init__",
+    "iou": "Bbox.iou",
+    "intersection": "Bbox.intersection",
+    "__and__": "Bbox.intersection",
+}
+
+
+class ProfilingStats:
+    """
+    Thread-safe collector of call counters and timings.
+
+    Every instrumented function is reported under its name, with its number of `calls` and
+    its cumulated `total_time` in seconds. `nms` also reports `boxes_in` and `boxes_out`.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty collector."""
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, elapsed: float, **counts: float) -> None:
+        """
+        Records one call of an instrumented function.
+
+        Args:
+            name (str): The name of the function.
+            elapsed (float): The wall time of the call, in seconds.
+            **counts (float): Additional quantities to accumulate (e.g. `boxes_in=10`).
+        """
+        with self._lock:
+            counters = self._counters.setdefault(name, {"calls": 0, "total_time": 0.0})
+            counters["calls"] += 1
+            counters["total_time"] += elapsed
+            for key, value in counts.items():
+                counters[key] = counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns a copy of the collected statistics, suitable for a metrics exporter.
+
+        Returns:
+            Dict[str, Dict[str, float]]: The counters of each instrumented function, e.g.
+            `{"nms": {"calls": 2, "total_time": 0.01, "boxes_in": 300, "boxes_out": 12}}`.
+        """
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._counters.items()}
+
+    def reset(self) -> None:
+        """Clears all the collected statistics."""
+        with self._lock:
+            self._counters.clear()
+
+
+_stats: Optional[ProfilingStats] = None
+_originals: List[Tuple[str, bool, Any]] = []
+
+
+def active_stats() -> Optional[ProfilingStats]:
+    """Returns the active collector, or None if profiling is disabled."""
+    return _stats
+
+
+def is_enabled() -> bool:
+    """Returns whether profiling is enabled."""
+    return _stats is not None
+
+
+def enable() -> ProfilingStats:
+    """
+    Enables profiling. Does nothing if it is already enabled.
+
+    Returns:
+        ProfilingStats: The active collector.
+    """
+    global _stats
+    if _stats is not None:
+        return _stats
+
+    stats = ProfilingStats()
+    for attr, name in _INSTRUMENTED_METHODS.items():
+        original = getattr(Bbox, attr)
+        _originals.append((attr, attr in Bbox.__dict__, original))
+        setattr(Bbox, attr, _instrument(original, name, stats))
+    _stats = stats
+    return stats
+
+
+def disable() -> None:
+    """Disables profiling and restores the original `Bbox` methods."""
+    global _stats
+    while _originals:
+        attr, owned, original = _originals.pop()
+        if owned:
+            setattr(Bbox, attr, original)
+        else:
+            delattr(Bbox, attr)
+    _stats = None
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """Returns the statistics of the active collector, or an empty dict if disabled."""
+    return _stats.snapshot() if _stats is not None else {}
+
+
+def reset() -> None:
+    """Clears the statistics of the active collector, if any."""
+    if _stats is not None:
+        _stats.reset()
+
+
+@contextmanager
+def profile() -> Iterator[ProfilingStats]:
+    """
+    Context manager enabling profiling for the duration of the block.
+
+    If profiling was already enabled, the active collector is reused and profiling stays
+    enabled after the block.
+
+    Yields:
+        ProfilingStats: The active collector.
+    """
+    was_enabled = is_enabled()
+    stats = enable()
+    try:
+        yield stats
+    finally:
+        if not was_enabled:
+            disable()
+
+
+def _instrument(func: Callable, name: str, stats: ProfilingStats) -> Callable:
+    """Wraps a function to record its calls and wall time in `stats`."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.record(name, perf_counter() - start)
+
+    return wrapper
@@ -0,0 +1,232 @@
+"""
+query.py
+
+Provides the `BboxQuery` class, which answers attribute range queries (area, aspect ratio,
+size, position...) over a collection of bounding boxes with binary searches on sorted
+columns instead of full scans.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .bbox import Bbox
+from .bbox_array import BboxArray
+from .ops import Boxes
+
+Range = Tuple[Optional[float], Optional[float]]
+
+# Queryable columns, and how to compute them from the boxes
+_COLUMNS: Dict[str, Callable[[BboxArray], np.ndarray]] = {
+    "left": lambda boxes: boxes.left,
+    "top": lambda boxes: boxes.top,
+    "right": lambda boxes: boxes.right,
+    "bottom": lambda boxes: boxes.bottom,
+    "width": lambda boxes: boxes.width,
+    "height": lambda boxes: boxes.height,
+    "area": lambda boxes: boxes.area,
+    "aspect_ratio": lambda boxes: boxes.aspect_ratio,
+    "center_x": lambda boxes: boxes.center[:, 0],
+    "center_y": lambda boxes: boxes.center[:, 1],
+}
+COLUMNS = tuple(_COLUMNS)
+
+# A predicate on a column: (column, low, high, low_strict, high_strict)
+_Predicate = Tuple[str, Optional[float], Optional[float], bool, bool]
+
+
+class BboxQuery:
+    """
+    Index answering range queries on the derived attributes of a collection of boxes.
+
+    Each queried column (see `COLUMNS`) is computed once and sorted, the first time it is
+    used. A range query is then two binary searches. A combined query starts from the
+    most selective range, found with binary searches only, and checks the other ranges
+    on its candidates alone. Queries return arrays of indices into the collection.
+
+    Values that are not finite never match, even a range without bounds. This is the case
+    of the infinite or NaN aspect ratio of zero-height boxes.
+
+    Example:
+        >>> query = BboxQuery(boxes)
+        >>> query.where(area=(100, None), aspect_ratio=(0.5, 2))
+        array([0, 3, 7])
+    """
+
+    def __init__(self, boxes: Boxes) -> None:
+        """
+        Initializes the index. Columns are computed lazily.
+
+        Args:
+            boxes (Boxes): The bounding boxes to query.
+        """
+        if not isinstance(boxes, BboxArray):
+            boxes = BboxArray.from_bboxes(boxes)
+        self.boxes = boxes
+        self._columns: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Returns the values of a column, in the order of the boxes.
+
+        Raises:
+            ValueError: If the column is unknown.
+        """
+        return self._column(name)[0]
+
+    def range(
+        self, column: str, low: Optional[float] = None, high: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Finds the boxes whose column lies in `[low, high]`.
+
+        Args:
+            column (str): The name of the column, one of `COLUMNS`.
+            low (Optional[float], optional): The inclusive lower bound, None for no bound.
+                Defaults to None.
+            high (Optional[float], optional): The inclusive upper bound, None for no bound.
+                Defaults to None.
+
+        Returns:
+            np.ndarray: The increasing indices of the matching boxes.
+
+        Raises:
+            ValueError: If the column is unknown.
+        """
+        return self._select([(column, low, high, False, False)])
+
+    def where(self, **ranges: Range) -> np.ndarray:
+        """
+        Finds the boxes matching every given range.
+
+        Args:
+            **ranges (Range): For each column, the inclusive `(low, high)` range of its
+                values, None meaning no bound.
+
+        Returns:
+            np.ndarray: The increasing indices of the matching boxes.
+
+        Raises:
+            ValueError: If a column is unknown.
+
+        Example:
+            >>> query.where(width=(10, 50), center_y=(None, 100))
+        """
+        return self._select(
+            [
+                (column, low, high, False, False)
+                for column, (low, high) in ranges.items()
+            ]
+        )
+
+    def mask(self, **ranges: Range) -> np.ndarray:
+        """
+        Same as `where`, but returns the (N,) boolean mask of the matching boxes.
+        """
+        mask = np.zeros(len(self.boxes), dtype=bool)
+        mask[self.where(**ranges)] = True
+        return mask
+
+    def within(self, region: Bbox) -> np.ndarray:
+        """
+        Finds the boxes fully inside a region, edges included.
+
+        Args:
+            region (Bbox): The region.
+
+        Returns:
+            np.ndarray: The increasing indices of the matching boxes.
+        """
+        return self.where(
+            left=(region.left, None),
+            top=(region.top, None),
+            right=(None, region.right),
+            bottom=(None, region.bottom),
+        )
+
+    def overlapping(self, region: Bbox) -> np.ndarray:
+        """
+        Finds the boxes whose intersection with a region has a positive area.
+
+        Args:
+            region (Bbox): The region.
+
+        Returns:
+            np.ndarray: The increasing indices of the matching boxes.
+        """
+        if region.area == 0:
+            return np.zeros(0, dtype=np.int64)
+        return self._select(
+            [
+                ("left", None, region.right, False, True),
+                ("right", region.left, None, True, False),
+                ("top", None, region.bottom, False, True),
+                ("bottom", region.top, None, True, False),
+                ("width", 0, None, True, False),
+                ("height", 0, None, True, False),
+            ]
+        )
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def _column(self, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the values of a column, the order sorting them, and the sorted values.
+
+        Raises:
+            ValueError: If the column is unknown.
+        """
+        if name not in self._columns:
+            if name not in _COLUMNS:
+                raise ValueError(f"Unknown column {name!r}. Expected one of {COLUMNS}.")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = _COLUMNS[name](self.boxes)
+            order = np.argsort(values, kind="stable")
+            self._columns[name] = (values, order, values[order])
+        return self._columns[name]
+
+    def _bounds(self, predicate: _Predicate) -> Tuple[int, int]:
+        """Returns the slice of the sorted column matching a predicate."""
+        name, low, high, low_strict, high_strict = predicate
+        sorted_values = self._column(name)[2]
+        start = 0
+        stop = len(sorted_values)
+        if low is not None:
+            start = int(
+                np.searchsorted(sorted_values, low, "right" if low_strict else "left")
+            )
+        if high is not None:
+            stop = int(
+                np.searchsorted(sorted_values, high, "left" if high_strict else "right")
+            )
+        if sorted_values.dtype.kind == "f":
+            # -inf values are sorted first, inf and NaN values last, and never match
+            start = max(start, int(np.searchsorted(sorted_values, -np.inf, "right")))
+            stop = min(stop, int(np.searchsorted(sorted_values, np.inf, "left")))
+        return start, max(start, stop)
+
+    def _select(self, predicates: List[_Predicate]) -> np.ndarray:
+        """Returns the increasing indices of the boxes matching all the predicates."""
+        if not predicates:
+            return np.arange(len(self.boxes))
+
+        bounds = [self._bounds(predicate) for predicate in predicates]
+        best = min(range(len(predicates)), key=lambda i: bounds[i][1] - bounds[i][0])
+        start, stop = bounds[best]
+        candidates = self._column(predicates[best][0])[1][start:stop]
+
+        keep = np.ones(len(candidates), dtype=bool)
+        for i, (name, low, high, low_strict, high_strict) in enumerate(predicates):
+            if i == best:
+                continue
+            values = self._column(name)[0][candidates]
+            if values.dtype.kind == "f":
+                keep &= np.isfinite(values)
+            if low is not None:
+                keep &= values > low if low_strict else values >= low
+            if high is not None:
+                keep &= values < high if high_strict else values <= high
+        return np.sort(candidates[keep])
@@ -0,0 +1,144 @@
+"""
+serialization.py
+
+Compact serialization of lists of bounding boxes, as packed binary or flat JSON arrays of
+coordinates, instead of one Pydantic dump per box.
+
+The binary layout is a 16 bytes header (the `EBBX` magic, a format version, a dtype code
+and the little-endian uint64 number of boxes) followed by the little-endian (N, 4)
+(left, top, right, bottom) coordinates. The JSON layout is the flat array
+`[left_0, top_0, right_0, bottom_0, left_1, ...]`.
+
+Example:
+    >>> payload = dumps(bboxes)
+    >>> loads(payload) == bboxes
+    True
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import List, Sequence, Union
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from .bbox import Bbox, _trusted_bbox
+from .bbox_array import BboxArray
+
+SERIALIZATION_FORMATS = ("binary", "json")
+
+_MAGIC = b"EBBX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBxxQ")
+_DTYPES = (np.dtype("<f8"), np.dtype("<f4"), np.dtype("<i4"), np.dtype("<i2"))
+
+
+def dumps(
+    bboxes: Union[Sequence[Bbox], BboxArray],
+    fmt: str = "binary",
+    dtype: DTypeLike = np.float64,
+) -> Union[bytes, str]:
+    """
+    Serializes bounding boxes to packed binary or to a flat JSON array.
+
+    Args:
+        bboxes (Union[Sequence[Bbox], BboxArray]): The bounding boxes.
+        fmt (str, optional): The format, "binary" or "json". Defaults to "binary".
+        dtype (DTypeLike, optional): The dtype of the binary coordinates, one of float64,
+            float32, int32 and int16. Smaller dtypes give smaller payloads, float32 being
+            lossy. Ignored for JSON. Defaults to float64.
+
+    Returns:
+        Union[bytes, str]: The binary payload, or the JSON text.
+
+    Raises:
+        ValueError: If the format or the dtype is unknown, or if an integer dtype is
+            requested for coordinates that are not integers or do not fit in it.
+    """
+    if fmt not in SERIALIZATION_FORMATS:
+        raise ValueError(
+            f"Unknown format {fmt!r}. Expected one of {SERIALIZATION_FORMATS}."
+        )
+    if not isinstance(bboxes, BboxArray):
+        bboxes = BboxArray.from_bboxes(bboxes)
+    if fmt == "json":
+        return json.dumps(bboxes.data.ravel().tolist())
+
+    target = np.dtype(dtype).newbyteorder("<")
+    if target not in _DTYPES:
+        raise ValueError(
+            f"Unsupported dtype {np.dtype(dtype)}. "
+            f"Expected one of {', '.join(str(d) for d in _DTYPES)}."
+        )
+    data = bboxes.data
+    if target.kind == "i":
+        data = bboxes.astype(target.newbyteorder("=")).data
+    header = _HEADER.pack(_MAGIC, _VERSION, _DTYPES.index(target), len(data))
+    return header + data.astype(target, copy=False).tobytes()
+
+
+def loads_array(payload: Union[bytes, str], validate: bool = True) -> BboxArray:
+    """
+    Deserializes bounding boxes produced by `dumps` into a `BboxArray`, without creating
+    any `Bbox`.
+
+    Binary coordinates keep their dtype. Without validation, binary payloads are read
+    without copy.
+
+    Args:
+        payload (Union[bytes, str]): The binary payload or the JSON text.
+        validate (bool, optional): Whether to check that the boxes are valid. Defaults to
+            True.
+
+    Returns:
+        BboxArray: The bounding boxes.
+
+    Raises:
+        ValueError: If the payload is malformed, or if `validate` is True and a box is not
+            valid.
+    """
+    if isinstance(payload, str):
+        flat = np.asarray(json.loads(payload), dtype=np.float64)
+        if flat.ndim != 1 or flat.size % 4:
+            raise ValueError("The JSON payload is not a flat array of 4N coordinates.")
+        return BboxArray(flat.reshape(-1, 4), validate=validate)
+
+    if len(payload) < _HEADER.size:
+        raise ValueError("The payload is too short to be a bounding boxes payload.")
+    magic, version, code, count = _HEADER.unpack_from(payload)
+    if magic != _MAGIC or version != _VERSION or code >= len(_DTYPES):
+        raise ValueError("The payload is not a bounding boxes payload.")
+    dtype = _DTYPES[code]
+    if len(payload) != _HEADER.size + count * 4 * dtype.itemsize:
+        raise ValueError("The payload length does not match its number of boxes.")
+
+    data = np.frombuffer(payload, dtype=dtype, offset=_HEADER.size).reshape(-1, 4)
+    storage = dtype.newbyteorder("=")
+    if validate:
+        return BboxArray(data, storage)
+    return BboxArray._wrap(data.astype(storage, copy=False))
+
+
+def loads(payload: Union[bytes, str], trusted: bool = False) -> List[Bbox]:
+    """
+    Deserializes bounding boxes produced by `dumps` into a list of `Bbox`.
+
+    The boxes are validated all at once with NumPy. Each `Bbox` is then built without
+    running Pydantic validation.
+
+    Args:
+        payload (Union[bytes, str]): The binary payload or the JSON text.
+        trusted (bool, optional): Whether to skip the validation entirely, for payloads
+            from a trusted source. Defaults to False.
+
+    Returns:
+        List[Bbox]: The bounding boxes.
+
+    Raises:
+        ValueError: If the payload is malformed, or if `trusted` is False and a box is not
+            valid.
+    """
+    data = loads_array(payload, validate=not trusted).data
+    return [_trusted_bbox(*coords) for coords in data.astype(np.float64).tolist()]
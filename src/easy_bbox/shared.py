@@ -0,0 +1,332 @@
+"""
+shared.py
+
+Provides the `SharedBoxStore` class, a read-only `BoxStore` living in a
+`multiprocessing.shared_memory` segment, so that data loader workers share a single copy
+of the annotations instead of unpickling their own.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from types import TracebackType
+from typing import Any, Hashable, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+from typing_extensions import Self
+
+from .bbox import Bbox
+from .bbox_array import BboxArray
+from .store import BoxStore
+
+_MAGIC = b"EBBS"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBBxxQQ")
+# New dtypes are appended, so that the codes of existing segments do not change
+_DTYPES = (
+    np.dtype(np.float64),
+    np.dtype(np.int32),
+    np.dtype(np.int16),
+    np.dtype(np.float32),
+)
+# Serializes the attachments that temporarily disable the resource tracker registration
+_ATTACH_LOCK = threading.Lock()
+
+
+class SharedBoxStore:
+    """
+    A read-only `BoxStore` stored in a named shared memory segment.
+
+    The process calling `create` owns the segment: it must call `unlink` (or use the store
+    as a context manager) once no process needs it anymore. Other processes `attach` to it
+    by name, and get NumPy views of the segment without any copy.
+
+    Pickling a `SharedBoxStore` only pickles the name of its segment, so that sending it
+    to a worker costs the same whatever the size of the dataset. Images are indexed by
+    their position in the original store.
+
+    Arrays obtained from the store are views of the segment: they must be dropped before
+    calling `close`.
+
+    Example:
+        >>> with SharedBoxStore.create(store) as shared:
+        ...     pool.map(load_image, [(shared, k) for k in range(len(shared))])
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        """
+        Wraps a shared memory segment. Use `create` or `attach` instead.
+
+        Raises:
+            ValueError: If the segment does not contain a `SharedBoxStore`.
+        """
+        # The views are set first so that they are released before the segment when the
+        # store is garbage collected, otherwise closing the segment would fail
+        buf = shm.buf
+        assert buf is not None
+        self._coords, self._labels, self._scores, self._offsets = _views(buf)
+        self._shm = shm
+        self._owner = owner
+        self._closed = False
+
+    @classmethod
+    def create(
+        cls,
+        boxes: Union[BoxStore, BboxArray, Sequence[Bbox]],
+        name: Optional[str] = None,
+    ) -> SharedBoxStore:
+        """
+        Copies boxes into a new shared memory segment.
+
+        Args:
+            boxes (Union[BoxStore, BboxArray, Sequence[Bbox]]): The boxes to share. A
+                collection of boxes that is not a `BoxStore` is shared as a single image.
+            name (Optional[str], optional): The name of the segment. If None, a unique name
+                is generated. Defaults to None.
+
+        Returns:
+            SharedBoxStore: The store, owning the segment.
+
+        Raises:
+            ValueError: If the dtype of the boxes cannot be shared.
+        """
+        if not isinstance(boxes, BoxStore):
+            store = BoxStore(
+                boxes.dtype if isinstance(boxes, BboxArray) else np.float64
+            )
+            store.append(0, boxes)
+            boxes = store
+        if boxes.dtype not in _DTYPES:
+            raise ValueError(f"Cannot share boxes of dtype {boxes.dtype}.")
+
+        num_boxes = boxes.num_boxes
+        num_images = len(boxes)
+        shm = shared_memory.SharedMemory(
+            name=name, create=True, size=_size(boxes.dtype, num_boxes, num_images)
+        )
+        buf = shm.buf
+        assert buf is not None
+        _HEADER.pack_into(
+            buf,
+            0,
+            _MAGIC,
+            _VERSION,
+            _DTYPES.index(boxes.dtype),
+            num_boxes,
+            num_images,
+        )
+        coords, labels, scores, offsets = _views(buf, writeable=True)
+        coords[:] = boxes.flat_boxes.data
+        labels[:] = boxes.flat_labels
+        scores[:] = boxes.flat_scores
+        offsets[:] = boxes.offsets
+        del coords, labels, scores, offsets, buf
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> SharedBoxStore:
+        """
+        Attaches to the shared memory segment of an existing store.
+
+        Args:
+            name (str): The name of the segment.
+
+        Returns:
+            SharedBoxStore: The store, not owning the segment.
+
+        Raises:
+            FileNotFoundError: If there is no segment with this name.
+            ValueError: If the segment does not contain a `SharedBoxStore`.
+        """
+        return cls(_attach_untracked(name), owner=False)
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory segment."""
+        return self._shm.name
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The storage dtype of the coordinates."""
+        return self._coords.dtype
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """The (K + 1,) offsets of the boxes of each image in the flat arrays."""
+        return self._offsets
+
+    @property
+    def counts(self) -> np.ndarray:
+        """The (K,) number of boxes of each image."""
+        return np.diff(self._offsets)
+
+    @property
+    def num_boxes(self) -> int:
+        """The total number of boxes."""
+        return len(self._coords)
+
+    @property
+    def flat_boxes(self) -> BboxArray:
+        """All the boxes, image after image."""
+        return BboxArray._wrap(self._coords)
+
+    @property
+    def flat_labels(self) -> np.ndarray:
+        """The labels of all the boxes, image after image."""
+        return self._labels
+
+    @property
+    def flat_scores(self) -> np.ndarray:
+        """The scores of all the boxes, image after image."""
+        return self._scores
+
+    def boxes(self, k: int) -> BboxArray:
+        """Returns the boxes of the k-th image, as a view of the segment."""
+        return BboxArray._wrap(self._coords[self._rows(k)])
+
+    def labels(self, k: int) -> np.ndarray:
+        """Returns the labels of the boxes of the k-th image, as a view of the segment."""
+        return self._labels[self._rows(k)]
+
+    def scores(self, k: int) -> np.ndarray:
+        """Returns the scores of the boxes of the k-th image, as a view of the segment."""
+        return self._scores[self._rows(k)]
+
+    def to_store(self, image_ids: Optional[Sequence[Hashable]] = None) -> BoxStore:
+        """
+        Copies the boxes into a regular `BoxStore`.
+
+        Args:
+            image_ids (Optional[Sequence[Hashable]], optional): The ids of the images. If
+                None, the images are identified by their position. Defaults to None.
+
+        Returns:
+            BoxStore: The copy of the store.
+        """
+        store = BoxStore(self.dtype)
+        ids = range(len(self)) if image_ids is None else image_ids
+        store.extend(
+            list(ids), self.flat_boxes, self.counts, self._labels, self._scores
+        )
+        return store
+
+    def close(self) -> None:
+        """Detaches this process from the segment. Closing again has no effect."""
+        if self._closed:
+            return
+        self._closed = True
+        del self._coords, self._labels, self._scores, self._offsets
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Destroys the segment, once every process has closed it. Owner only."""
+        self._shm.unlink()
+
+    def __getitem__(self, k: int) -> BboxArray:
+        return self.boxes(k)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str]]:
+        return SharedBoxStore.attach, (self.name,)
+
+    def __repr__(self) -> str:
+        return (
+            f"SharedBoxStore(name={self.name!r}, images={len(self)}, "
+            f"boxes={self.num_boxes}, dtype={self.dtype})"
+        )
+
+    def _rows(self, k: int) -> slice:
+        """Returns the rows of the boxes of the k-th image in the flat arrays."""
+        if not -len(self) <= k < len(self):
+            raise IndexError(f"Image index {k} out of range for {len(self)} images.")
+        k %= len(self)
+        return slice(int(self._offsets[k]), int(self._offsets[k + 1]))
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Opens an existing segment without registering it with the resource tracker.
+
+    The tracker of a process unlinks the segments registered with it when the process
+    exits, which must not happen to a process that only attached. Before Python 3.13,
+    opening a segment always registers it. Unregistering it afterwards would also drop
+    the registration of the owner when the tracker is shared with it (as with the workers
+    it starts), so the registration is skipped instead, as `track=False` does.
+
+    Raises:
+        FileNotFoundError: If there is no segment with this name.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    with _ATTACH_LOCK:
+        register = resource_tracker.register
+        setattr(resource_tracker, "register", _skip_register)
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            setattr(resource_tracker, "register", register)
+
+
+def _skip_register(name: str, rtype: str) -> None:
+    """Replaces `resource_tracker.register` while attaching to a segment."""
+
+
+def _size(dtype: np.dtype, num_boxes: int, num_images: int) -> int:
+    """Returns the size in bytes of the segment of a store."""
+    coords = _align(num_boxes * 4 * dtype.itemsize)
+    return _HEADER.size + coords + num_boxes * 16 + (num_images + 1) * 8
+
+
+def _align(size: int) -> int:
+    """Rounds a size up to a multiple of 8 bytes."""
+    return (size + 7) // 8 * 8
+
+
+def _views(
+    buf: memoryview, writeable: bool = False
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the coordinates, labels, scores and offsets arrays of a segment.
+
+    Raises:
+        ValueError: If the segment does not contain a `SharedBoxStore`.
+    """
+    if len(buf) < _HEADER.size:
+        raise ValueError("The shared memory segment does not contain a SharedBoxStore.")
+    magic, version, code, num_boxes, num_images = _HEADER.unpack_from(buf)
+    if magic != _MAGIC or version != _VERSION or code >= len(_DTYPES):
+        raise ValueError("The shared memory segment does not contain a SharedBoxStore.")
+    dtype = _DTYPES[code]
+
+    offset = _HEADER.size
+    coords = np.frombuffer(buf, dtype, num_boxes * 4, offset).reshape(-1, 4)
+    offset += _align(num_boxes * 4 * dtype.itemsize)
+    labels = np.frombuffer(buf, np.int64, num_boxes, offset)
+    offset += num_boxes * 8
+    scores = np.frombuffer(buf, np.float64, num_boxes, offset)
+    offset += num_boxes * 8
+    offsets = np.frombuffer(buf, np.int64, num_images + 1, offset)
+
+    arrays = (coords, labels, scores, offsets)
+    if not writeable:
+        for array in arrays:
+            array.flags.writeable = False
+    return arrays
@@ -0,0 +1,337 @@
+"""
+stats.py
+
+Provides the `BoxStats` class, a streaming accumulator of dataset statistics over chunks of
+bounding boxes, in constant memory.
+
+The statistics are computed on the columns of `STAT_COLUMNS`: the width, height, area and
+aspect ratio of the boxes, and the (x, y) coordinates of their centers normalized by the
+image size. For each column, `BoxStats` keeps the count, mean, variance, minimum and
+maximum of the values, and a histogram with a fixed number of bins, from which quantiles
+are approximated. Sizes, areas and aspect ratios use logarithmic bins, normalized centers
+linear bins over [0, 1].
+
+Accumulators built by different processes can be merged with `merge`, and give the same
+result as a single accumulator fed with all the boxes (up to floating point rounding).
+
+Example:
+    >>> stats = BoxStats()
+    >>> for boxes, labels in chunks:
+    ...     stats.update(boxes, img_w=640, img_h=480, labels=labels)
+    >>> stats.quantile("area", [0.5, 0.95])
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable, Optional, Tuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .ops import Boxes, _as_box_data, _safe_divide
+
+STAT_COLUMNS = ("width", "height", "area", "aspect_ratio", "center_x", "center_y")
+
+
+class BoxStats:
+    """
+    Streaming, mergeable statistics of bounding boxes.
+
+    Values that are not finite (e.g. the aspect ratio of a zero-height box) are left out
+    of their column. Values outside the range of the histogram of their column are not
+    counted in `histogram`, but are taken into account by `quantile`, which then
+    interpolates up to the observed minimum or maximum.
+
+    Example:
+        >>> stats = BoxStats()
+        >>> stats.update(BboxArray([[0, 0, 10, 20], [5, 5, 45, 25]]))
+        >>> stats.mean("width")
+        25.0
+    """
+
+    def __init__(
+        self,
+        bins: int = 128,
+        size_range: Tuple[float, float] = (1.0, 4096.0),
+        aspect_ratio_range: Tuple[float, float] = (1 / 16, 16.0),
+    ) -> None:
+        """
+        Initializes an empty accumulator.
+
+        Args:
+            bins (int, optional): The number of histogram bins of each column.
+                Defaults to 128.
+            size_range (Tuple[float, float], optional): The range of the width and height
+                histograms, in pixels. The area histogram covers its square.
+                Defaults to (1.0, 4096.0).
+            aspect_ratio_range (Tuple[float, float], optional): The range of the aspect
+                ratio histogram. Defaults to (1 / 16, 16.0).
+
+        Raises:
+            ValueError: If `bins` is not positive, or if a range is not positive and
+                increasing.
+        """
+        if bins < 1:
+            raise ValueError(f"bins must be positive. Received {bins}")
+        for low, high in (size_range, aspect_ratio_range):
+            if not 0 < low < high:
+                raise ValueError(
+                    f"The ranges must be positive and increasing. Received {(low, high)}"
+                )
+        size = np.geomspace(*size_range, bins + 1)
+        unit = np.linspace(0.0, 1.0, bins + 1)
+        self._edges = np.stack(
+            (
+                size,
+                size,
+                size**2,
+                np.geomspace(*aspect_ratio_range, bins + 1),
+                unit,
+                unit,
+            )
+        )
+        self._num_boxes = 0
+        self._counts = np.zeros(len(STAT_COLUMNS), dtype=np.int64)
+        self._means = np.zeros(len(STAT_COLUMNS))
+        self._m2 = np.zeros(len(STAT_COLUMNS))
+        self._mins = np.full(len(STAT_COLUMNS), np.inf)
+        self._maxs = np.full(len(STAT_COLUMNS), -np.inf)
+        # Bins 0 and -1 count the values below and above the range of the histogram
+        self._hists = np.zeros((len(STAT_COLUMNS), bins + 2), dtype=np.int64)
+        self._class_counts: Dict[Hashable, int] = {}
+
+    def update(
+        self,
+        boxes: Boxes,
+        img_w: Optional[ArrayLike] = None,
+        img_h: Optional[ArrayLike] = None,
+        labels: Optional[ArrayLike] = None,
+    ) -> None:
+        """
+        Accumulates a chunk of boxes.
+
+        Args:
+            boxes (Boxes): The N bounding boxes.
+            img_w (Optional[ArrayLike], optional): The image width, either a scalar or one
+                per box. If None, the centers are not accumulated. Defaults to None.
+            img_h (Optional[ArrayLike], optional): The image height, either a scalar or one
+                per box. Defaults to None.
+            labels (Optional[ArrayLike], optional): The (N,) labels of the boxes, counted
+                per class. Defaults to None.
+
+        Raises:
+            ValueError: If only one of `img_w` and `img_h` is given, or if the number of
+                labels does not match the number of boxes.
+        """
+        if (img_w is None) != (img_h is None):
+            raise ValueError("img_w and img_h must be given together.")
+        data = _as_box_data(boxes).astype(np.float64, copy=False)
+        if labels is not None:
+            label_data = np.asarray(labels).reshape(-1)
+            if len(label_data) != len(data):
+                raise ValueError("The length of boxes and labels must be the same.")
+            values, counts = np.unique(label_data, return_counts=True)
+            for label, count in zip(values.tolist(), counts.tolist()):
+                self._class_counts[label] = self._class_counts.get(label, 0) + count
+
+        self._num_boxes += len(data)
+        width = data[:, 2] - data[:, 0]
+        height = data[:, 3] - data[:, 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columns = [width, height, width * height, width / height]
+            if img_w is not None:
+                columns.append((data[:, 0] + data[:, 2]) / 2 / np.asarray(img_w))
+                columns.append((data[:, 1] + data[:, 3]) / 2 / np.asarray(img_h))
+        for k, values in enumerate(columns):
+            self._update_column(k, values[np.isfinite(values)])
+
+    def merge(self, other: BoxStats) -> BoxStats:
+        """
+        Adds the statistics of another accumulator to this one, in place.
+
+        Args:
+            other (BoxStats): The accumulator to merge, e.g. built by another process.
+
+        Returns:
+            BoxStats: This accumulator.
+
+        Raises:
+            ValueError: If the accumulators do not have the same histogram bins.
+        """
+        if not np.array_equal(self._edges, other._edges):
+            raise ValueError("Cannot merge statistics with different histogram bins.")
+        self._num_boxes += other._num_boxes
+        self._counts, self._means, self._m2 = _combine(
+            (self._counts, self._means, self._m2),
+            (other._counts, other._means, other._m2),
+        )
+        np.minimum(self._mins, other._mins, out=self._mins)
+        np.maximum(self._maxs, other._maxs, out=self._maxs)
+        self._hists += other._hists
+        for label, count in other._class_counts.items():
+            self._class_counts[label] = self._class_counts.get(label, 0) + count
+        return self
+
+    @property
+    def num_boxes(self) -> int:
+        """The number of boxes accumulated."""
+        return self._num_boxes
+
+    @property
+    def class_counts(self) -> Dict[Hashable, int]:
+        """The number of boxes of each label."""
+        return dict(self._class_counts)
+
+    def count(self, column: str) -> int:
+        """Returns the number of values accumulated in a column."""
+        return int(self._counts[_column_index(column)])
+
+    def mean(self, column: str) -> float:
+        """Returns the mean of a column, NaN if it is empty."""
+        k = _column_index(column)
+        return float(self._means[k]) if self._counts[k] else float("nan")
+
+    def var(self, column: str) -> float:
+        """Returns the (population) variance of a column, NaN if it is empty."""
+        k = _column_index(column)
+        return float(self._m2[k] / self._counts[k]) if self._counts[k] else float("nan")
+
+    def std(self, column: str) -> float:
+        """Returns the (population) standard deviation of a column, NaN if it is empty."""
+        return float(np.sqrt(self.var(column)))
+
+    def min(self, column: str) -> float:
+        """Returns the minimum of a column, NaN if it is empty."""
+        k = _column_index(column)
+        return float(self._mins[k]) if self._counts[k] else float("nan")
+
+    def max(self, column: str) -> float:
+        """Returns the maximum of a column, NaN if it is empty."""
+        k = _column_index(column)
+        return float(self._maxs[k]) if self._counts[k] else float("nan")
+
+    def histogram(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the histogram of a column.
+
+        Args:
+            column (str): The column, one of `STAT_COLUMNS`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The (bins,) counts and the (bins + 1,) bin
+            edges, as returned by `np.histogram`.
+
+        Raises:
+            ValueError: If the column is unknown.
+        """
+        k = _column_index(column)
+        return self._hists[k, 1:-1].copy(), self._edges[k].copy()
+
+    def quantile(self, column: str, q: ArrayLike) -> Union[float, np.ndarray]:
+        """
+        Approximates quantiles of a column from its histogram.
+
+        Values are interpolated linearly inside their bin, so the error is at most the
+        width of the bin. Below and above the range of the histogram, the interpolation
+        goes to the observed minimum and maximum.
+
+        Args:
+            column (str): The column, one of `STAT_COLUMNS`.
+            q (ArrayLike): The quantile(s), between 0 and 1.
+
+        Returns:
+            Union[float, np.ndarray]: The quantile(s), NaN if the column is empty.
+
+        Raises:
+            ValueError: If the column is unknown, or if a quantile is not in [0, 1].
+        """
+        k = _column_index(column)
+        levels = np.asarray(q, dtype=np.float64)
+        if np.any((levels < 0) | (levels > 1)):
+            raise ValueError("The quantiles must be between 0 and 1.")
+        if not self._counts[k]:
+            result = np.full(levels.shape, np.nan)
+        else:
+            edges = self._edges[k]
+            low, high = self._mins[k], self._maxs[k]
+            all_edges = np.concatenate(
+                ([min(low, edges[0])], edges, [max(high, edges[-1])])
+            )
+            cumulative = np.concatenate(([0], np.cumsum(self._hists[k])))
+            result = np.interp(levels * self._counts[k], cumulative, all_edges)
+            result = np.clip(result, low, high)
+        return float(result) if result.ndim == 0 else result
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the main statistics of every column.
+
+        Returns:
+            Dict[str, Dict[str, float]]: For each column, its `count`, `mean`, `std`,
+            `min`, `max` and its `p5`, `p25`, `p50`, `p75` and `p95` quantiles.
+        """
+        levels = (0.05, 0.25, 0.5, 0.75, 0.95)
+        summary = {}
+        for column in STAT_COLUMNS:
+            quantiles = np.atleast_1d(self.quantile(column, levels))
+            summary[column] = {
+                "count": self.count(column),
+                "mean": self.mean(column),
+                "std": self.std(column),
+                "min": self.min(column),
+                "max": self.max(column),
+                **{f"p{round(q * 100)}": float(v) for q, v in zip(levels, quantiles)},
+            }
+        return summary
+
+    def __repr__(self) -> str:
+        return f"BoxStats(boxes={self._num_boxes}, classes={len(self._class_counts)})"
+
+    def _update_column(self, k: int, values: np.ndarray) -> None:
+        """Accumulates the finite values of the k-th column."""
+        if not len(values):
+            return
+        mean = values.mean()
+        m2 = np.square(values - mean).sum()
+        (count,), (self._means[k],), (self._m2[k],) = _combine(
+            (self._counts[k : k + 1], self._means[k : k + 1], self._m2[k : k + 1]),
+            (np.array([len(values)]), np.array([mean]), np.array([m2])),
+        )
+        self._counts[k] = count
+        self._mins[k] = min(self._mins[k], values.min())
+        self._maxs[k] = max(self._maxs[k], values.max())
+
+        edges = self._edges[k]
+        bins = np.searchsorted(edges, values, side="right")
+        # The last bin includes its right edge, as in np.histogram
+        bins[values == edges[-1]] = len(edges) - 1
+        self._hists[k] += np.bincount(bins, minlength=len(edges) + 1)
+
+
+def _column_index(column: str) -> int:
+    """
+    Returns the index of a column in `STAT_COLUMNS`.
+
+    Raises:
+        ValueError: If the column is unknown.
+    """
+    if column not in STAT_COLUMNS:
+        raise ValueError(f"Unknown column {column!r}. Expected one of {STAT_COLUMNS}.")
+    return STAT_COLUMNS.index(column)
+
+
+def _combine(
+    a: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    b: Tuple[np.ndarray, np.ndarray, np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Combines the (count, mean, sum of squared deviations) of two sets of values, with the
+    parallel algorithm of Chan et al.
+    """
+    count_a, mean_a, m2_a = a
+    count_b, mean_b, m2_b = b
+    count = count_a + count_b
+    delta = mean_b - mean_a
+    mean = mean_a + _safe_divide(delta * count_b, count)
+    m2 = m2_a + m2_b + _safe_divide(delta**2 * count_a * count_b, count)
+    return count, mean, m2
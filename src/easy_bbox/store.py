@@ -0,0 +1,327 @@
+"""
+store.py
+
+Provides the `BoxStore` class, a dataset-scale container of the bounding boxes of many
+images, in a CSR (compressed sparse row) layout.
+"""
+
+from __future__ import annotations
+
+from typing import (
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+    cast,
+)
+
+import numpy as np
+from numpy.typing import ArrayLike, DTypeLike
+
+from .bbox import Bbox
+from .bbox_array import BboxArray, _resolve_dtype
+
+BoxesLike = Union[BboxArray, Sequence[Bbox], ArrayLike]
+
+
+class BoxStore:
+    """
+    The bounding boxes, labels and scores of many images, grouped by image id.
+
+    All the boxes are stored in flat arrays, image after image, and the boxes of the k-th
+    image are the rows `offsets[k]:offsets[k + 1]`. Getting the boxes of an image is thus a
+    dict lookup and a slice, returning views without any copy, and a box costs 40 bytes
+    (float64 coordinates, int64 label and float64 score) instead of a Python object.
+
+    The store is append-only. Its buffers grow geometrically, so that appending is
+    amortized O(number of new boxes), and arrays returned before an append stay valid.
+
+    Labels default to -1 and scores to NaN when they are not given.
+
+    Example:
+        >>> store = BoxStore()
+        >>> store.append("img_0", [Bbox(left=0, top=0, right=10, bottom=10)], labels=[3])
+        >>> store["img_0"].to_bboxes()
+        [Bbox(left=0.0, top=0.0, right=10.0, bottom=10.0)]
+        >>> store.labels("img_0")
+        array([3])
+    """
+
+    def __init__(self, dtype: Optional[DTypeLike] = None) -> None:
+        """
+        Initializes an empty store.
+
+        Args:
+            dtype (Optional[DTypeLike], optional): The storage dtype of the coordinates, see
+                `BboxArray`. Defaults to None (float64).
+
+        Raises:
+            ValueError: If the dtype is not supported.
+        """
+        self._dtype = _resolve_dtype(dtype)
+        self._coords = np.empty((0, 4), dtype=self._dtype)
+        self._labels = np.empty(0, dtype=np.int64)
+        self._scores = np.empty(0, dtype=np.float64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._image_ids: List[Hashable] = []
+        self._index: Dict[Hashable, int] = {}
+
+    @classmethod
+    def from_dict(
+        cls,
+        bboxes: Mapping[Hashable, Sequence[Bbox]],
+        dtype: Optional[DTypeLike] = None,
+    ) -> BoxStore:
+        """
+        Initializes the store from per-image lists of `Bbox`.
+
+        Args:
+            bboxes (Mapping[Hashable, Sequence[Bbox]]): The bounding boxes of each image.
+            dtype (Optional[DTypeLike], optional): The storage dtype of the coordinates.
+                Defaults to None (float64).
+
+        Returns:
+            BoxStore: The BoxStore instance.
+        """
+        store = cls(dtype)
+        flat = [bbox for image_bboxes in bboxes.values() for bbox in image_bboxes]
+        counts = [len(image_bboxes) for image_bboxes in bboxes.values()]
+        store.extend(list(bboxes), flat, counts)
+        return store
+
+    def append(
+        self,
+        image_id: Hashable,
+        boxes: BoxesLike,
+        labels: Optional[ArrayLike] = None,
+        scores: Optional[ArrayLike] = None,
+    ) -> None:
+        """
+        Appends the boxes of one image.
+
+        Args:
+            image_id (Hashable): The id of the image.
+            boxes (BoxesLike): The bounding boxes of the image.
+            labels (Optional[ArrayLike], optional): The integer label of each box.
+                Defaults to None.
+            scores (Optional[ArrayLike], optional): The score of each box. Defaults to None.
+
+        Raises:
+            ValueError: If the image id is already in the store, if the lengths of the
+                boxes, labels and scores do not match, or if a label is not an integer.
+        """
+        coords = BboxArray._wrap(self._as_coords(boxes))
+        self.extend([image_id], coords, [len(coords)], labels, scores)
+
+    def extend(
+        self,
+        image_ids: Sequence[Hashable],
+        boxes: BoxesLike,
+        counts: ArrayLike,
+        labels: Optional[ArrayLike] = None,
+        scores: Optional[ArrayLike] = None,
+    ) -> None:
+        """
+        Appends the boxes of several images at once, from flat arrays.
+
+        Args:
+            image_ids (Sequence[Hashable]): The K ids of the images.
+            boxes (BoxesLike): The N bounding boxes of all the images, image after image.
+            counts (ArrayLike): The (K,) number of boxes of each image, summing to N.
+            labels (Optional[ArrayLike], optional): The (N,) integer label of each box.
+                Defaults to None.
+            scores (Optional[ArrayLike], optional): The (N,) score of each box.
+                Defaults to None.
+
+        Raises:
+            ValueError: If an image id is duplicated or already in the store, if the
+                lengths of the ids, counts, boxes, labels and scores do not match, or if a
+                label is not an integer.
+        """
+        coords = self._as_coords(boxes)
+        count_array = np.asarray(counts, dtype=np.int64).reshape(-1)
+        if len(count_array) != len(image_ids):
+            raise ValueError("The length of image_ids and counts must be the same.")
+        if np.any(count_array < 0) or count_array.sum() != len(coords):
+            raise ValueError(
+                "The counts must be non-negative and sum to the boxes length."
+            )
+        label_array = _column(labels, len(coords), np.int64, -1, "labels")
+        score_array = _column(scores, len(coords), np.float64, np.nan, "scores")
+
+        new_index = {}
+        for position, image_id in enumerate(image_ids, start=len(self._image_ids)):
+            if image_id in self._index or image_id in new_index:
+                raise ValueError(f"The image {image_id!r} is already in the store.")
+            new_index[image_id] = position
+
+        start = self.num_boxes
+        end = start + len(coords)
+        self._reserve(end, len(self._image_ids) + len(image_ids))
+        self._coords[start:end] = coords
+        self._labels[start:end] = label_array
+        self._scores[start:end] = score_array
+        first = len(self._image_ids) + 1
+        self._offsets[first : first + len(image_ids)] = start + np.cumsum(count_array)
+        self._image_ids.extend(image_ids)
+        self._index.update(new_index)
+
+    def boxes(self, image_id: Hashable) -> BboxArray:
+        """
+        Returns the boxes of an image, as a view of the store.
+
+        Raises:
+            KeyError: If the image is not in the store.
+        """
+        return BboxArray._wrap(self._coords[self._rows(image_id)])
+
+    def labels(self, image_id: Hashable) -> np.ndarray:
+        """
+        Returns the labels of the boxes of an image, as a view of the store.
+
+        Raises:
+            KeyError: If the image is not in the store.
+        """
+        return self._labels[self._rows(image_id)]
+
+    def scores(self, image_id: Hashable) -> np.ndarray:
+        """
+        Returns the scores of the boxes of an image, as a view of the store.
+
+        Raises:
+            KeyError: If the image is not in the store.
+        """
+        return self._scores[self._rows(image_id)]
+
+    def to_dict(self) -> Dict[Hashable, List[Bbox]]:
+        """
+        Converts the store to per-image lists of `Bbox`.
+
+        Returns:
+            Dict[Hashable, List[Bbox]]: The bounding boxes of each image.
+        """
+        bboxes = self.flat_boxes.to_bboxes()
+        offsets = self.offsets.tolist()
+        return {
+            image_id: bboxes[offsets[k] : offsets[k + 1]]
+            for k, image_id in enumerate(self._image_ids)
+        }
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The storage dtype of the coordinates."""
+        return self._dtype
+
+    @property
+    def image_ids(self) -> List[Hashable]:
+        """The ids of the images, in insertion order."""
+        return list(self._image_ids)
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """The (K + 1,) offsets of the boxes of each image in the flat arrays."""
+        return self._offsets[: len(self._image_ids) + 1]
+
+    @property
+    def counts(self) -> np.ndarray:
+        """The (K,) number of boxes of each image."""
+        return np.diff(self.offsets)
+
+    @property
+    def num_boxes(self) -> int:
+        """The total number of boxes."""
+        return int(self._offsets[len(self._image_ids)])
+
+    @property
+    def flat_boxes(self) -> BboxArray:
+        """All the boxes, image after image."""
+        return BboxArray._wrap(self._coords[: self.num_boxes])
+
+    @property
+    def flat_labels(self) -> np.ndarray:
+        """The labels of all the boxes, image after image."""
+        return self._labels[: self.num_boxes]
+
+    @property
+    def flat_scores(self) -> np.ndarray:
+        """The scores of all the boxes, image after image."""
+        return self._scores[: self.num_boxes]
+
+    def __getitem__(self, image_id: Hashable) -> BboxArray:
+        return self.boxes(image_id)
+
+    def __contains__(self, image_id: object) -> bool:
+        return image_id in self._index
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._image_ids)
+
+    def __len__(self) -> int:
+        return len(self._image_ids)
+
+    def __repr__(self) -> str:
+        return (
+            f"BoxStore(images={len(self)}, boxes={self.num_boxes}, dtype={self._dtype})"
+        )
+
+    def _rows(self, image_id: Hashable) -> slice:
+        """Returns the rows of the boxes of an image in the flat arrays."""
+        k = self._index[image_id]
+        return slice(int(self._offsets[k]), int(self._offsets[k + 1]))
+
+    def _as_coords(self, boxes: BoxesLike) -> np.ndarray:
+        """Converts boxes to validated (N, 4) coordinates of the storage dtype."""
+        if isinstance(boxes, BboxArray):
+            if boxes.dtype == self._dtype:
+                return boxes.data
+            return boxes.astype(self._dtype).data
+        if isinstance(boxes, Sequence) and (not boxes or isinstance(boxes[0], Bbox)):
+            return BboxArray.from_bboxes(cast(Sequence[Bbox], boxes), self._dtype).data
+        return BboxArray(cast(ArrayLike, boxes), self._dtype).data
+
+    def _reserve(self, num_boxes: int, num_images: int) -> None:
+        """Grows the buffers geometrically to hold the given numbers of boxes and images."""
+        if num_boxes > len(self._coords):
+            capacity = max(num_boxes, 2 * len(self._coords))
+            self._coords = _grow(self._coords, capacity)
+            self._labels = _grow(self._labels, capacity)
+            self._scores = _grow(self._scores, capacity)
+        if num_images + 1 > len(self._offsets):
+            self._offsets = _grow(
+                self._offsets, max(num_images + 1, 2 * len(self._offsets))
+            )
+
+
+def _column(
+    values: Optional[ArrayLike], length: int, dtype: DTypeLike, fill: float, name: str
+) -> np.ndarray:
+    """
+    Converts an optional per-box column, filling it with `fill` when missing.
+
+    Raises:
+        ValueError: If the column does not have one value per box, or if float values are
+            given for an integer column and are not all integral.
+    """
+    if values is None:
+        return np.full(length, fill, dtype=dtype)
+    column = np.asarray(values).reshape(-1)
+    if len(column) != length:
+        raise ValueError(f"The length of boxes and {name} must be the same.")
+    if (
+        np.issubdtype(dtype, np.integer)
+        and column.dtype.kind == "f"
+        and not np.all(column == np.round(column))
+    ):
+        raise ValueError(f"The {name} must be integers.")
+    return column.astype(dtype, copy=False)
+
+
+def _grow(buffer: np.ndarray, capacity: int) -> np.ndarray:
+    """Returns a copy of a buffer with a larger first dimension."""
+    grown = np.empty((capacity,) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[: len(buffer)] = buffer
+    return grown
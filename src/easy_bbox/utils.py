@@ -6,7 +6,25 @@ Contains utility functions for bounding box operations.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List, Tuple
+import heapq
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from . import profiling
+from .bbox_array import BboxArray
 
 if TYPE_CHECKING:
     from easy_bbox.bbox import Bbox
@@ -16,6 +34,9 @@ def nms(
     bboxes: List[Bbox],
     scores: List[float],
     iou_threshold: float = 0.5,
+    score_threshold: Optional[float] = None,
+    pre_nms_top_k: Optional[int] = None,
+    max_output: Optional[int] = None,
 ) -> List[Tuple[Bbox, float]]:
     """Perform Non-Maximum Suppression on a list of bounding boxes.
 
@@ -23,21 +44,46 @@ def nms(
         bboxes (List[Bbox]): List of bounding boxes.
         scores (List[float]): List of confidence scores for each bounding box.
         iou_threshold (float, optional): IoU threshold for suppression. Defaults to 0.5.
+        score_threshold (Optional[float], optional): If given, boxes whose score is not
+            above it are discarded before suppression. Defaults to None.
+        pre_nms_top_k (Optional[int], optional): If given, only the k best remaining boxes
+            are considered, selected with a heap instead of a full sort. Defaults to None.
+        max_output (Optional[int], optional): If given, suppression stops as soon as this
+            number of boxes is selected. Defaults to None.
 
     Returns:
         List[Tuple[Bbox, float]]: List of selected bounding boxes and their scores.
 
     Raises:
-        ValueError: If the length of bboxes and scores do not match.
+        ValueError: If the length of bboxes and scores do not match, or if
+            `pre_nms_top_k` or `max_output` is negative.
     """
     if len(bboxes) != len(scores):
         raise ValueError("The length of bboxes and scores must be the same.")
+    if pre_nms_top_k is not None and pre_nms_top_k < 0:
+        raise ValueError(f"pre_nms_top_k cannot be negative. Received {pre_nms_top_k}")
+    if max_output is not None and max_output < 0:
+        raise ValueError(f"max_output cannot be negative. Received {max_output}")
+
+    stats = profiling.active_stats()
+    start = perf_counter() if stats is not None else 0.0
+
+    candidates: Sequence[int] = range(len(scores))
+    if score_threshold is not None:
+        candidates = [i for i in candidates if scores[i] > score_threshold]
 
     # Sort the bounding boxes by their confidence scores in descending order
-    sorted_indices = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    if pre_nms_top_k is not None and pre_nms_top_k < len(candidates):
+        sorted_indices = heapq.nlargest(
+            pre_nms_top_k, candidates, key=lambda i: scores[i]
+        )
+    else:
+        sorted_indices = sorted(candidates, key=lambda i: scores[i], reverse=True)
     selected_indices: List[int] = []
 
     while sorted_indices:
+        if max_output is not None and len(selected_indices) >= max_output:
+            break
         current_index = sorted_indices[0]
         selected_indices.append(current_index)
 
@@ -54,5 +100,344 @@ def nms(
 
         sorted_indices = remaining_indices
 
+    if stats is not None:
+        stats.record(
+            "nms",
+            perf_counter() - start,
+            boxes_in=len(bboxes),
+            boxes_out=len(selected_indices),
+        )
+
     # Return the selected bounding boxes and their scores
     return [(bboxes[i], scores[i]) for i in selected_indices]
+
+
+class StreamingNMS:
+    """
+    Incremental Non-Maximum Suppression, for detections arriving in chunks (several model
+    heads, sliding windows, video frames...).
+
+    A box is kept if no kept box with a higher or equal score has an IoU above
+    `iou_threshold` with it. A newly kept box suppresses the kept boxes with a lower score
+    that it overlaps. Boxes suppressed earlier are not reconsidered when their suppressor
+    is itself suppressed, so the result matches `nms` on all the boxes when each chunk has
+    lower scores than the previous ones, and may otherwise keep fewer boxes.
+
+    Kept boxes are registered in every cell of a uniform grid that they cover, so that a
+    new box is only compared with the kept boxes of the cells it covers. `cell_size` should
+    be close to the typical box size.
+
+    Example:
+        >>> stream = StreamingNMS(iou_threshold=0.5)
+        >>> stream.add([Bbox(left=0, top=0, right=10, bottom=10)], [0.9])
+        array([ True])
+        >>> stream.add([Bbox(left=1, top=1, right=10, bottom=10)], [0.8])
+        array([False])
+        >>> stream.emit()
+        [(Bbox(left=0, top=0, right=10, bottom=10), 0.9)]
+    """
+
+    def __init__(self, iou_threshold: float = 0.5, cell_size: float = 64.0) -> None:
+        """
+        Initializes an empty suppressor.
+
+        Args:
+            iou_threshold (float, optional): IoU threshold for suppression. Defaults to 0.5.
+            cell_size (float, optional): The size of the cells of the spatial index, in the
+                unit of the boxes. Defaults to 64.0.
+
+        Raises:
+            ValueError: If the IoU threshold is negative or the cell size is not positive.
+        """
+        if iou_threshold < 0:
+            raise ValueError(
+                f"The IoU threshold cannot be negative. Received {iou_threshold}"
+            )
+        if cell_size <= 0:
+            raise ValueError(f"The cell size must be positive. Received {cell_size}")
+        self.iou_threshold = iou_threshold
+        self.cell_size = cell_size
+        self._kept: Dict[int, Tuple[Tuple[float, ...], float, Bbox]] = {}
+        self._cells: Dict[int, List[Tuple[int, int]]] = {}
+        self._buckets: Dict[Tuple[int, int], Set[int]] = {}
+        self._next_id = 0
+
+    def add(
+        self, bboxes: Union[Sequence[Bbox], BboxArray], scores: ArrayLike
+    ) -> np.ndarray:
+        """
+        Adds a chunk of scored boxes, suppressing and being suppressed by the kept boxes.
+
+        Within the chunk, the boxes are processed by decreasing score, like `nms`.
+
+        Args:
+            bboxes (Union[Sequence[Bbox], BboxArray]): The new bounding boxes.
+            scores (ArrayLike): The (N,) confidence score of each new box.
+
+        Returns:
+            np.ndarray: The (N,) boolean mask of the new boxes kept at insertion. They can
+            still be suppressed by later chunks.
+
+        Raises:
+            ValueError: If the length of bboxes and scores do not match.
+        """
+        score_array = np.asarray(scores, dtype=np.float64).reshape(-1)
+        if len(bboxes) != len(score_array):
+            raise ValueError("The length of bboxes and scores must be the same.")
+
+        boxes = (
+            bboxes if isinstance(bboxes, BboxArray) else BboxArray.from_bboxes(bboxes)
+        )
+        data = boxes.data.astype(np.float64, copy=False)
+        cells = np.floor(data / self.cell_size).astype(np.int64).tolist()
+        coords = data.tolist()
+        score_list = score_array.tolist()
+
+        kept = np.zeros(len(score_list), dtype=bool)
+        for index in np.argsort(-score_array, kind="stable").tolist():
+            covered = [
+                (cx, cy)
+                for cx in range(cells[index][0], cells[index][2] + 1)
+                for cy in range(cells[index][1], cells[index][3] + 1)
+            ]
+            kept[index] = self._insert(
+                tuple(coords[index]), score_list[index], covered, bboxes, index
+            )
+        return kept
+
+    def kept(self) -> List[Tuple[Bbox, float]]:
+        """
+        Returns the kept boxes and their scores, by decreasing score.
+
+        Returns:
+            List[Tuple[Bbox, float]]: The kept bounding boxes and their scores.
+        """
+        order = sorted(self._kept, key=lambda i: (-self._kept[i][1], i))
+        return [(self._kept[i][2], self._kept[i][1]) for i in order]
+
+    def emit(self) -> List[Tuple[Bbox, float]]:
+        """
+        Returns the kept boxes and their scores, by decreasing score, then resets the
+        suppressor for the next frame.
+
+        Returns:
+            List[Tuple[Bbox, float]]: The kept bounding boxes and their scores.
+        """
+        result = self.kept()
+        self.reset()
+        return result
+
+    def reset(self) -> None:
+        """Forgets all the kept boxes."""
+        self._kept.clear()
+        self._cells.clear()
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        """The number of kept boxes."""
+        return len(self._kept)
+
+    def _insert(
+        self,
+        coords: Tuple[float, ...],
+        score: float,
+        covered: List[Tuple[int, int]],
+        bboxes: Union[Sequence[Bbox], BboxArray],
+        index: int,
+    ) -> bool:
+        """Inserts a box covering the given cells, if no kept box suppresses it."""
+        neighbours: Set[int] = set()
+        for cell in covered:
+            neighbours.update(self._buckets.get(cell, ()))
+
+        overlapping = []
+        for other in neighbours:
+            other_coords, other_score, _ = self._kept[other]
+            if _tuple_iou(coords, other_coords) > self.iou_threshold:
+                if other_score >= score:
+                    return False
+                overlapping.append(other)
+
+        for other in overlapping:
+            del self._kept[other]
+            for cell in self._cells.pop(other):
+                self._buckets[cell].discard(other)
+
+        box_id = self._next_id
+        self._next_id += 1
+        self._kept[box_id] = (coords, score, bboxes[index])
+        self._cells[box_id] = covered
+        for cell in covered:
+            self._buckets.setdefault(cell, set()).add(box_id)
+        return True
+
+
+class Deduplicator:
+    """
+    Streaming filter of exact and near-duplicate bounding boxes.
+
+    Two boxes are near-duplicates when all their coordinates differ by at most `tolerance`
+    and their IoU is at least `iou_threshold`. The first box seen is kept, the following
+    duplicates are rejected.
+
+    Kept boxes are hashed by their quantized top-left corner, with cells of size
+    `tolerance`, so that a new box only has to be compared with the boxes of the 9
+    neighbouring cells. This makes deduplication close to O(N) instead of O(N^2).
+
+    Example:
+        >>> dedup = Deduplicator(tolerance=2)
+        >>> dedup.add(Bbox(left=0, top=0, right=10, bottom=10))
+        True
+        >>> dedup.add(Bbox(left=1, top=0, right=10, bottom=11))
+        False
+    """
+
+    def __init__(self, tolerance: float = 1.0, iou_threshold: float = 0.9) -> None:
+        """
+        Initializes an empty filter.
+
+        Args:
+            tolerance (float, optional): The maximal difference between the coordinates of
+                two duplicates. Defaults to 1.0.
+            iou_threshold (float, optional): The minimal IoU between two duplicates.
+                Defaults to 0.9.
+
+        Raises:
+            ValueError: If the tolerance is negative, or if the IoU threshold is not in
+                [0, 1].
+        """
+        if tolerance < 0:
+            raise ValueError(f"The tolerance cannot be negative. Received {tolerance}")
+        if not 0 <= iou_threshold <= 1:
+            raise ValueError(
+                f"The IoU threshold must be in [0, 1]. Received {iou_threshold}"
+            )
+        self.tolerance = tolerance
+        self.iou_threshold = iou_threshold
+        self._cell_size = tolerance if tolerance > 0 else 1.0
+        self._buckets: Dict[Tuple[Hashable, int, int], List[Tuple[float, ...]]] = {}
+        self._count = 0
+
+    def add(self, bbox: Bbox, group: Hashable = None) -> bool:
+        """
+        Adds a box to the filter if it is not a duplicate of an already kept box.
+
+        Args:
+            bbox (Bbox): The bounding box.
+            group (Hashable, optional): Only boxes of the same group (e.g. image id or
+                label) are compared. Defaults to None.
+
+        Returns:
+            bool: True if the box is kept, False if it is a duplicate.
+        """
+        coords = tuple(bbox.to_tlbr())
+        cx = int(coords[0] // self._cell_size)
+        cy = int(coords[1] // self._cell_size)
+        return self._add(coords, group, cx, cy)
+
+    def add_many(
+        self,
+        bboxes: Union[Sequence[Bbox], BboxArray],
+        groups: Optional[Sequence[Hashable]] = None,
+    ) -> np.ndarray:
+        """
+        Adds several boxes to the filter, in order.
+
+        Args:
+            bboxes (Union[Sequence[Bbox], BboxArray]): The bounding boxes.
+            groups (Optional[Sequence[Hashable]], optional): The group of each box.
+                Defaults to None.
+
+        Returns:
+            np.ndarray: The (N,) boolean mask of the kept boxes.
+
+        Raises:
+            ValueError: If the length of bboxes and groups do not match.
+        """
+        if not isinstance(bboxes, BboxArray):
+            bboxes = BboxArray.from_bboxes(bboxes)
+        if groups is not None and len(groups) != len(bboxes):
+            raise ValueError("The length of bboxes and groups must be the same.")
+
+        data = bboxes.data.astype(np.float64, copy=False)
+        cells = np.floor(data[:, :2] / self._cell_size).astype(np.int64).tolist()
+        group_list = groups if groups is not None else [None] * len(data)
+        kept = [
+            self._add(tuple(coords), group, cx, cy)
+            for coords, group, (cx, cy) in zip(data.tolist(), group_list, cells)
+        ]
+        return np.array(kept, dtype=bool)
+
+    def reset(self) -> None:
+        """Forgets all the kept boxes."""
+        self._buckets.clear()
+        self._count = 0
+
+    def __len__(self) -> int:
+        """The number of kept boxes."""
+        return self._count
+
+    def _add(
+        self, coords: Tuple[float, ...], group: Hashable, cx: int, cy: int
+    ) -> bool:
+        """Adds a box whose top-left corner falls in the cell (cx, cy)."""
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other in self._buckets.get((group, cx + dx, cy + dy), ()):
+                    if self._is_duplicate(coords, other):
+                        return False
+
+        self._buckets.setdefault((group, cx, cy), []).append(coords)
+        self._count += 1
+        return True
+
+    def _is_duplicate(self, a: Tuple[float, ...], b: Tuple[float, ...]) -> bool:
+        """Checks the coordinates tolerance, then the IoU, of two (l, t, r, b) tuples."""
+        if a == b:
+            return True
+        tol = self.tolerance
+        if any(abs(u - v) > tol for u, v in zip(a, b)):
+            return False
+        return _tuple_iou(a, b) >= self.iou_threshold
+
+
+def dedupe(
+    bboxes: Union[Sequence[Bbox], BboxArray],
+    tolerance: float = 1.0,
+    iou_threshold: float = 0.9,
+    groups: Optional[Sequence[Hashable]] = None,
+) -> List[int]:
+    """Remove exact and near-duplicate bounding boxes, keeping the first occurrence.
+
+    See `Deduplicator` for the definition of near-duplicates. Use a `Deduplicator` directly
+    to deduplicate a stream of boxes.
+
+    Args:
+        bboxes (Union[Sequence[Bbox], BboxArray]): The bounding boxes.
+        tolerance (float, optional): The maximal difference between the coordinates of two
+            duplicates. Defaults to 1.0.
+        iou_threshold (float, optional): The minimal IoU between two duplicates.
+            Defaults to 0.9.
+        groups (Optional[Sequence[Hashable]], optional): The group of each box (e.g. image
+            id), only boxes of the same group are compared. Defaults to None.
+
+    Returns:
+        List[int]: The indices of the kept bounding boxes, in increasing order.
+
+    Raises:
+        ValueError: If the tolerance is negative, if the IoU threshold is not in [0, 1], or
+            if the length of bboxes and groups do not match.
+    """
+    kept = Deduplicator(tolerance, iou_threshold).add_many(bboxes, groups)
+    return np.flatnonzero(kept).tolist()
+
+
+def _tuple_iou(a: Tuple[float, ...], b: Tuple[float, ...]) -> float:
+    """Same as `Bbox.iou`, on (left, top, right, bottom) tuples."""
+    inter_w = min(a[2], b[2]) - max(a[0], b[0])
+    inter_h = min(a[3], b[3]) - max(a[1], b[1])
+    inter = inter_w * inter_h if inter_w >= 0 and inter_h >= 0 else 0
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    if union == 0:
+        return 0
+    return inter / union
@@ -0,0 +1,160 @@
+"""Test file for bbox/anchors.py"""
+
+import unittest
+
+import numpy as np
+
+from easy_bbox import Bbox, BboxArray, decode, encode, generate_anchors, match_anchors
+from easy_bbox.anchors import MATCH_IGNORE, MATCH_NEGATIVE
+
+
+class TestGenerateAnchors(unittest.TestCase):
+    """Unit tests for the generate_anchors function."""
+
+    def test_against_from_cwh(self):
+        """Test the anchors against building each one with Bbox.from_cwh."""
+        anchors = generate_anchors(
+            [(3, 2), (2, 1)], [8, 16], [[16, 32], [64]], [0.5, 2]
+        )
+        expected = []
+        for (width, height), stride, scales in [
+            ((3, 2), 8, [16, 32]),
+            ((2, 1), 16, [64]),
+        ]:
+            for y in range(height):
+                for x in range(width):
+                    for scale in scales:
+                        for ratio in (0.5, 2):
+                            w = scale * ratio**0.5
+                            h = scale / ratio**0.5
+                            cx, cy = (x + 0.5) * stride, (y + 0.5) * stride
+                            expected.append(Bbox.from_cwh((cx, cy, w, h)))
+        self.assertEqual(len(anchors), 3 * 2 * 4 + 2 * 1 * 2)
+        np.testing.assert_allclose(anchors.data, BboxArray.from_bboxes(expected).data)
+
+    def test_shared_scales(self):
+        """Test that a single sequence of scales is used at every level."""
+        anchors = generate_anchors([(4, 4), (2, 2)], [8, 16], [32], [1.0], offset=0)
+        self.assertEqual(len(anchors), 20)
+        np.testing.assert_allclose(anchors.area, 32**2)
+        np.testing.assert_allclose(anchors[0].center, (0, 0))
+
+    def test_errors(self):
+        """Test that inconsistent arguments raise a ValueError."""
+        with self.assertRaises(ValueError):
+            generate_anchors([(4, 4)], [8, 16], [32])
+
+        with self.assertRaises(ValueError):
+            generate_anchors([(4, 4), (2, 2)], [8, 16], [[32]])
+
+        with self.assertRaises(ValueError):
+            generate_anchors([(4, 4)], [8], [32], [0])
+
+        with self.assertRaises(ValueError):
+            generate_anchors([(4, 4)], [8], [-32])
+
+
+class TestMatchAnchors(unittest.TestCase):
+    """Unit tests for the match_anchors function."""
+
+    def setUp(self):
+        self.anchors = BboxArray(
+            [
+                [0, 0, 10, 10],  # IoU 1 with gt 0
+                [2, 0, 12, 10],  # IoU 0.67 with gt 0
+                [5, 0, 15, 10],  # IoU 0.33 with gt 0
+                [3, 0, 13, 10],  # IoU 0.54 with gt 0
+                [100, 100, 110, 110],  # No overlap
+                [50, 50, 60, 56],  # Best anchor of gt 1, IoU 0.3
+            ]
+        )
+        self.gt = BboxArray([[0, 0, 10, 10], [50, 50, 70, 60]])
+
+    def test_thresholds(self):
+        """Test the positive, negative and ignored anchors."""
+        matches, best_iou = match_anchors(
+            self.anchors, self.gt, 0.6, 0.4, allow_low_quality_matches=False
+        )
+        self.assertEqual(
+            matches.tolist(),
+            [0, 0, MATCH_NEGATIVE, MATCH_IGNORE, MATCH_NEGATIVE, MATCH_NEGATIVE],
+        )
+        self.assertAlmostEqual(best_iou[5], 0.3)
+
+    def test_low_quality_matches(self):
+        """Test that every ground truth box gets its best anchor."""
+        matches, _ = match_anchors(self.anchors, self.gt, 0.6, 0.4)
+        self.assertEqual(
+            matches.tolist(), [0, 0, MATCH_NEGATIVE, MATCH_IGNORE, MATCH_NEGATIVE, 1]
+        )
+
+    def test_edge_cases(self):
+        """Test matching without ground truth and invalid thresholds."""
+        matches, best_iou = match_anchors(self.anchors, [])
+        self.assertTrue((matches == MATCH_NEGATIVE).all())
+        self.assertTrue((best_iou == 0).all())
+
+        with self.assertRaises(ValueError):
+            match_anchors(self.anchors, self.gt, 0.3, 0.5)
+
+
+class TestBoxCoding(unittest.TestCase):
+    """Unit tests for the encode and decode functions."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        tl = rng.uniform(0, 100, size=(40, 2))
+        self.anchors = BboxArray(
+            np.concatenate((tl, tl + rng.uniform(5, 40, (40, 2))), 1)
+        )
+        tl = tl + rng.uniform(-5, 5, size=(40, 2))
+        self.boxes = BboxArray(
+            np.concatenate((tl, tl + rng.uniform(1, 60, (40, 2))), 1)
+        )
+
+    def test_encode(self):
+        """Test the deltas against the per-box definition."""
+        deltas = encode(self.boxes, self.anchors, weights=(10, 10, 5, 5))
+        box = self.boxes[3].to_cwh()
+        anchor = self.anchors[3].to_cwh()
+        np.testing.assert_allclose(
+            deltas[3],
+            [
+                10 * (box[0] - anchor[0]) / anchor[2],
+                10 * (box[1] - anchor[1]) / anchor[3],
+                5 * np.log(box[2] / anchor[2]),
+                5 * np.log(box[3] / anchor[3]),
+            ],
+        )
+
+    def test_round_trip(self):
+        """Test that decoding the encoded boxes gives them back, in place."""
+        weights = (10, 10, 5, 5)
+        deltas = encode(self.boxes, self.anchors, weights)
+        decoded = decode(deltas, self.anchors, weights, out=deltas)
+        self.assertIs(decoded.data, deltas)
+        np.testing.assert_allclose(decoded.data, self.boxes.data)
+
+    def test_clamp(self):
+        """Test that large size deltas are clamped."""
+        deltas = np.array([[0.0, 0.0, 100.0, 0.0]])
+        anchor = BboxArray([[0, 0, 16, 16]])
+        self.assertAlmostEqual(decode(deltas, anchor)[0].width, 1000)
+        self.assertAlmostEqual(
+            decode(deltas / 2, anchor, clamp=None)[0].width, 16 * np.exp(50)
+        )
+
+    def test_errors(self):
+        """Test that mismatching arguments raise a ValueError."""
+        with self.assertRaises(ValueError):
+            encode(self.boxes, self.anchors[:3])
+
+        with self.assertRaises(ValueError):
+            decode(np.zeros((40, 3)), self.anchors)
+
+        with self.assertRaises(ValueError):
+            decode(np.zeros((40, 4)), self.anchors, out=np.zeros((40, 4), np.float32))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+"""Test file for bbox/bbox_array.py"""
+
+import unittest
+
+import numpy as np
+
+from easy_bbox import Bbox, BboxArray
+
+
+class TestBboxArray(unittest.TestCase):
+    """Unit tests for the BboxArray class."""
+
+    def setUp(self):
+        self.bboxes = [
+            Bbox(left=10, top=20, right=30, bottom=40),
+            Bbox(left=0, top=0, right=5, bottom=10),
+        ]
+        self.boxes = BboxArray.from_bboxes(self.bboxes)
+
+    def test_initialization(self):
+        """Test BboxArray initialization and validation."""
+        self.assertEqual(len(self.boxes), 2)
+        self.assertEqual(len(BboxArray([])), 0)
+
+        with self.assertRaises(ValueError):
+            BboxArray([(0, 0, 10)])
+
+        with self.assertRaises(ValueError):
+            BboxArray([0, 0, 10, 10])
+
+        with self.assertRaises(ValueError):
+            BboxArray([(10, 0, 0, 10)])
+
+        with self.assertRaises(ValueError):
+            BboxArray.from_tlwh([(0, 0, 10, -10)])
+
+    def test_properties(self):
+        """Test that the properties match the ones of Bbox."""
+        for name in ("left", "top", "right", "bottom", "width", "height", "area"):
+            np.testing.assert_array_equal(
+                getattr(self.boxes, name), [getattr(b, name) for b in self.bboxes]
+            )
+        np.testing.assert_array_equal(
+            self.boxes.center, [b.center for b in self.bboxes]
+        )
+        np.testing.assert_array_equal(
+            self.boxes.aspect_ratio, [b.aspect_ratio for b in self.bboxes]
+        )
+
+    def test_from_methods(self):
+        """Test that the from methods match the ones of Bbox."""
+        self.assertEqual(
+            BboxArray.from_tlwh([b.to_tlwh() for b in self.bboxes]), self.boxes
+        )
+        self.assertEqual(
+            BboxArray.from_cwh([b.to_cwh() for b in self.bboxes]), self.boxes
+        )
+        self.assertEqual(
+            BboxArray.from_yolo([b.to_yolo(100, 50) for b in self.bboxes], 100, 50),
+            self.boxes,
+        )
+        self.assertEqual(
+            BboxArray.from_albu([b.to_albu(100, 50) for b in self.bboxes], 100, 50),
+            self.boxes,
+        )
+
+    def test_from_masks(self):
+        """Test the tight boxes of a stack of masks, including an empty one."""
+        rng = np.random.default_rng(0)
+        masks = rng.random((5, 12, 16)) > 0.97
+        masks[3] = False
+        boxes = BboxArray.from_masks(masks)
+        self.assertEqual(boxes.dtype, np.int32)
+        for mask, box in zip(masks, boxes):
+            ys, xs = np.nonzero(mask)
+            if not len(xs):
+                self.assertEqual(box, Bbox(left=0, top=0, right=0, bottom=0))
+                continue
+            self.assertEqual(
+                box.to_tlbr(), (xs.min(), ys.min(), xs.max() + 1, ys.max() + 1)
+            )
+
+        for shape in ((2, 0, 16), (2, 12, 0), (0, 12, 16)):
+            boxes = BboxArray.from_masks(np.zeros(shape, dtype=bool))
+            self.assertEqual(boxes.dtype, np.int32)
+            np.testing.assert_array_equal(boxes.data, np.zeros((shape[0], 4)))
+
+        with self.assertRaises(ValueError):
+            BboxArray.from_masks(masks[0])
+
+    def test_from_polygons(self):
+        """Test the boxes of ragged polygons, in both layouts."""
+        boxes = BboxArray.from_polygons(
+            [[1, 2, 7, 0, 4, 9], [], [(3, 3), (2, 5), (8, 4), (6, 1)]]
+        )
+        np.testing.assert_array_equal(
+            boxes.data, [[1, 0, 7, 9], [0, 0, 0, 0], [2, 1, 8, 5]]
+        )
+        self.assertEqual(len(BboxArray.from_polygons([])), 0)
+
+        with self.assertRaises(ValueError):
+            BboxArray.from_polygons([[0, 1, 2]])
+
+    def test_to_methods(self):
+        """Test that the to methods match the ones of Bbox."""
+        np.testing.assert_array_equal(
+            self.boxes.to_tlbr(), [b.to_tlbr() for b in self.bboxes]
+        )
+        np.testing.assert_array_equal(
+            self.boxes.to_tlwh(), [b.to_tlwh() for b in self.bboxes]
+        )
+        np.testing.assert_array_equal(
+            self.boxes.to_cwh(), [b.to_cwh() for b in self.bboxes]
+        )
+        np.testing.assert_array_equal(
+            self.boxes.to_yolo(100, 50), [b.to_yolo(100, 50) for b in self.bboxes]
+        )
+        np.testing.assert_array_equal(
+            self.boxes.to_norm_tlwh(100, 50), [(0.1, 0.4, 0.2, 0.4), (0, 0, 0.05, 0.2)]
+        )
+        self.assertEqual(self.boxes.to_bboxes(), self.bboxes)
+
+    def test_per_box_image_size(self):
+        """Test normalization with one image size per box."""
+        np.testing.assert_array_equal(
+            self.boxes.to_albu([100, 10], [100, 20]),
+            [self.bboxes[0].to_albu(100, 100), self.bboxes[1].to_albu(10, 20)],
+        )
+
+    def test_clip_to_img(self):
+        """Test the clip_to_img method."""
+        boxes = BboxArray([(-10, -20, 100, 120), (50, 50, 60, 60)])
+        self.assertEqual(
+            boxes.clip_to_img(32, 64), BboxArray([(0, 0, 32, 64), (32, 50, 32, 60)])
+        )
+
+    def test_integer_boxes(self):
+        """Test integer storage and its exact operations."""
+        boxes = BboxArray([(-5, 2, 40, 30), (1, 1, 3, 4)], dtype=np.int16)
+        self.assertEqual(boxes.dtype, np.int16)
+        self.assertEqual(boxes.data.nbytes, 16)
+        self.assertEqual(boxes, BboxArray([(-5, 2, 40, 30), (1, 1, 3, 4)]))
+
+        clipped = boxes.clip_to_img(32, 20)
+        self.assertEqual(clipped.dtype, np.int16)
+        np.testing.assert_array_equal(clipped.data, [(0, 2, 32, 20), (1, 1, 3, 4)])
+
+        image = np.arange(20 * 32).reshape(20, 32)
+        crops = [image[s] for s in clipped.to_slices()]
+        self.assertEqual(crops[0].shape, (18, 32))
+        np.testing.assert_array_equal(crops[1], image[1:4, 1:3])
+
+        # Derived quantities are widened so that they cannot overflow
+        big = BboxArray([(0, 0, 30000, 30000)], dtype=np.int16)
+        self.assertEqual(big.area[0], 900_000_000)
+        np.testing.assert_array_equal(big.to_cwh(), [(15000, 15000, 30000, 30000)])
+
+        with self.assertRaises(ValueError):
+            BboxArray([(0.5, 0, 1, 1)], dtype=np.int32)
+
+        with self.assertRaises(ValueError):
+            BboxArray([(0, 0, 40000, 1)], dtype=np.int16)
+
+        with self.assertRaises(ValueError):
+            BboxArray([(0, 0, 1, 1)], dtype=np.uint8)
+
+        with self.assertRaises(ValueError):
+            self.boxes.to_slices()
+
+    def test_float32_boxes(self):
+        """Test float32 storage and its validity check before rounding."""
+        boxes = self.boxes.astype(np.float32)
+        self.assertEqual(boxes.dtype, np.float32)
+        self.assertEqual(boxes.data.nbytes, 32)
+        self.assertEqual(boxes.area.dtype, np.float32)
+        self.assertEqual(boxes, self.boxes)
+        self.assertEqual(boxes[0], self.bboxes[0])
+
+        # Nearly equal coordinates may round to an empty, but valid, box
+        thin = BboxArray([(1, 0, 1 + 1e-9, 1)], dtype=np.float32)
+        self.assertEqual(thin.width[0], 0)
+        self.assertFalse(thin.invalid_mask().any())
+
+        with self.assertRaises(ValueError):
+            BboxArray([(1 + 1e-9, 0, 1, 1)], dtype=np.float32)
+
+    def test_to_pixels_and_astype(self):
+        """Test conversions between float and integer storage."""
+        boxes = BboxArray([(0.5, 1.2, 3.5, 4.0)])
+        pixels = boxes.to_pixels()
+        self.assertEqual(pixels.dtype, np.int32)
+        np.testing.assert_array_equal(pixels.data, [(0, 1, 4, 4)])
+        self.assertEqual(pixels.astype(np.float64).dtype, np.float64)
+        self.assertEqual(
+            BboxArray.from_coco([(1, 2, 3, 4)], dtype=np.int32)[0].right, 4
+        )
+
+        with self.assertRaises(ValueError):
+            boxes.astype(np.int32)
+
+        with self.assertRaises(ValueError):
+            boxes.to_pixels(np.float64)
+
+    def test_deferred_validation(self):
+        """Test the invalid mask and the repair policies."""
+        raw = BboxArray([(0, 0, 10, 10), (10, 0, 0, 5), (0, 8, 4, 2)], validate=False)
+        np.testing.assert_array_equal(raw.invalid_mask(), [False, True, True])
+
+        boxes, invalid = raw.repair("drop")
+        np.testing.assert_array_equal(invalid, [False, True, True])
+        self.assertEqual(boxes, BboxArray([(0, 0, 10, 10)]))
+
+        boxes, _ = raw.repair("swap")
+        self.assertEqual(
+            boxes, BboxArray([(0, 0, 10, 10), (0, 0, 10, 5), (0, 2, 4, 8)])
+        )
+
+        boxes, _ = raw.repair("clip")
+        self.assertEqual(
+            boxes, BboxArray([(0, 0, 10, 10), (10, 0, 10, 5), (0, 8, 4, 8)])
+        )
+        self.assertFalse(boxes.invalid_mask().any())
+
+        raw = BboxArray.from_coco([(5, 5, -2, 3)], dtype=np.int32, validate=False)
+        self.assertEqual(raw.repair("swap")[0].dtype, np.int32)
+
+        with self.assertRaises(ValueError):
+            raw.repair("fix")
+
+    def test_non_finite_boxes(self):
+        """Test that NaN and infinite rows are invalid, and removed by every policy."""
+        rows = [(0, 0, 10, 10), (np.nan, 0, 1, 1), (0, 0, np.inf, 1), (0, 8, 4, 2)]
+        with self.assertRaises(ValueError):
+            BboxArray(rows[:2])
+        raw = BboxArray(rows, validate=False)
+        np.testing.assert_array_equal(raw.invalid_mask(), [False, True, True, True])
+        expected = {
+            "drop": [(0, 0, 10, 10)],
+            "swap": [(0, 0, 10, 10), (0, 2, 4, 8)],
+            "clip": [(0, 0, 10, 10), (0, 8, 4, 8)],
+        }
+        for policy, coords in expected.items():
+            boxes, invalid = raw.repair(policy)
+            np.testing.assert_array_equal(invalid, [False, True, True, True])
+            self.assertEqual(boxes, BboxArray(coords))
+            self.assertFalse(boxes.invalid_mask().any())
+
+    def test_indexing(self):
+        """Test indexing and iteration."""
+        self.assertEqual(self.boxes[1], self.bboxes[1])
+        self.assertEqual(self.boxes[np.int64(0)], self.bboxes[0])
+        self.assertEqual(list(self.boxes), self.bboxes)
+        self.assertEqual(self.boxes[1:], BboxArray.from_bboxes(self.bboxes[1:]))
+        self.assertEqual(
+            self.boxes[np.array([False, True])], BboxArray.from_bboxes(self.bboxes[1:])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,9 @@
 
 import unittest
 
-from easy_bbox import Bbox, nms
+import numpy as np
+
+from easy_bbox import Bbox, BboxArray, Deduplicator, StreamingNMS, dedupe, nms
 
 
 class TestNMS(unittest.TestCase):
@@ -60,6 +62,159 @@ class TestNMS(unittest.TestCase):
         with self.assertRaises(ValueError):
             nms(bboxes, scores)
 
+        with self.assertRaises(ValueError):
+            nms(bboxes, [0.9], pre_nms_top_k=-1)
+
+        with self.assertRaises(ValueError):
+            nms(bboxes, [0.9], max_output=-1)
+
+    def test_nms_limits(self):
+        """Test the score threshold, pre-NMS top-k and max output limits."""
+        rng = np.random.default_rng(0)
+        tl = rng.uniform(0, 100, size=(200, 2))
+        bboxes = BboxArray(np.concatenate((tl, tl + 20), axis=1)).to_bboxes()
+        scores = rng.uniform(0, 1, 200).round(2).tolist()
+        full = nms(bboxes, scores)
+
+        self.assertEqual(nms(bboxes, scores, max_output=5), full[:5])
+        self.assertEqual(
+            nms(bboxes, scores, score_threshold=0.5),
+            [(bbox, score) for bbox, score in full if score > 0.5],
+        )
+
+        order = sorted(range(200), key=lambda i: scores[i], reverse=True)[:30]
+        top_k = nms(bboxes, scores, pre_nms_top_k=30)
+        self.assertEqual(
+            top_k, nms([bboxes[i] for i in order], [scores[i] for i in order])
+        )
+        self.assertEqual(nms(bboxes, scores, pre_nms_top_k=0), [])
+
+
+class TestStreamingNMS(unittest.TestCase):
+    """Unit tests for the StreamingNMS class."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        tl = rng.uniform(0, 200, size=(300, 2))
+        self.boxes = BboxArray(
+            np.concatenate((tl, tl + rng.uniform(5, 60, (300, 2))), 1)
+        )
+        self.scores = rng.uniform(0, 1, 300)
+
+    def test_matches_nms(self):
+        """Test that chunks of decreasing scores give the same result as nms."""
+        expected = nms(self.boxes.to_bboxes(), self.scores.tolist(), 0.3)
+        order = np.argsort(-self.scores)
+        stream = StreamingNMS(iou_threshold=0.3, cell_size=32)
+        for chunk in np.array_split(order, 7):
+            stream.add(self.boxes[chunk], self.scores[chunk])
+        self.assertEqual(stream.kept(), expected)
+
+        stream = StreamingNMS(iou_threshold=0.3)
+        stream.add(self.boxes.to_bboxes(), self.scores)
+        self.assertEqual(stream.emit(), expected)
+        self.assertEqual(len(stream), 0)
+
+    def test_suppression_across_chunks(self):
+        """Test that a later, better box suppresses a kept one."""
+        stream = StreamingNMS(iou_threshold=0.5)
+        low = Bbox(left=0, top=0, right=10, bottom=10)
+        high = Bbox(left=1, top=0, right=11, bottom=10)
+        far = Bbox(left=100, top=100, right=110, bottom=110)
+        self.assertEqual(stream.add([low, far], [0.5, 0.1]).tolist(), [True, True])
+        self.assertEqual(stream.add([high], [0.9]).tolist(), [True])
+        self.assertEqual(stream.add([low], [0.9]).tolist(), [False])
+        self.assertEqual(stream.emit(), [(high, 0.9), (far, 0.1)])
+
+    def test_errors(self):
+        """Test that invalid arguments raise a ValueError."""
+        with self.assertRaises(ValueError):
+            StreamingNMS(iou_threshold=-0.1)
+
+        with self.assertRaises(ValueError):
+            StreamingNMS(cell_size=0)
+
+        with self.assertRaises(ValueError):
+            StreamingNMS().add(self.boxes, [0.5])
+
+
+class TestDedupe(unittest.TestCase):
+    """Unit tests for the dedupe function and the Deduplicator class."""
+
+    def setUp(self):
+        self.bboxes = [
+            Bbox(left=0, top=0, right=10, bottom=10),
+            Bbox(left=20, top=20, right=30, bottom=30),
+            Bbox(left=0.2, top=-0.2, right=10, bottom=10.2),
+            Bbox(left=0, top=0, right=10, bottom=10),
+            Bbox(left=0, top=0, right=1, bottom=1),
+        ]
+
+    def test_dedupe(self):
+        """Test that exact and near duplicates are removed."""
+        self.assertEqual(dedupe(self.bboxes), [0, 1, 4])
+        self.assertEqual(dedupe(BboxArray.from_bboxes(self.bboxes)), [0, 1, 4])
+        self.assertEqual(dedupe(self.bboxes, tolerance=0), [0, 1, 2, 4])
+        self.assertEqual(dedupe(self.bboxes, iou_threshold=1), [0, 1, 2, 4])
+        self.assertEqual(dedupe([]), [])
+
+        # Exact duplicates with a zero area are still duplicates
+        point = Bbox(left=3, top=3, right=3, bottom=3)
+        self.assertEqual(dedupe([point, point]), [0])
+
+    def test_dedupe_groups(self):
+        """Test that boxes of different groups are never duplicates."""
+        self.assertEqual(
+            dedupe(self.bboxes, groups=["a", "a", "b", "b", "a"]), [0, 1, 2, 4]
+        )
+        with self.assertRaises(ValueError):
+            dedupe(self.bboxes, groups=["a"])
+
+    def test_dedupe_matches_brute_force(self):
+        """Test the spatial hashing against an all-pairs comparison."""
+        rng = np.random.default_rng(0)
+        tl = rng.uniform(0, 50, size=(300, 2))
+        boxes = BboxArray(
+            np.concatenate((tl, tl + rng.uniform(1, 5, (300, 2))), axis=1)
+        )
+        expected = []
+        for i, bbox in enumerate(boxes):
+            if not any(
+                np.abs(boxes.data[i] - boxes.data[j]).max() <= 1.5
+                and bbox.iou(boxes[j]) >= 0.5
+                for j in expected
+            ):
+                expected.append(i)
+        self.assertEqual(dedupe(boxes, tolerance=1.5, iou_threshold=0.5), expected)
+
+    def test_deduplicator_stream(self):
+        """Test the streaming interface."""
+        dedup = Deduplicator(tolerance=1)
+        self.assertTrue(dedup.add(self.bboxes[0]))
+        self.assertFalse(dedup.add(self.bboxes[2]))
+        np.testing.assert_array_equal(
+            dedup.add_many(self.bboxes[1:]), [True, False, False, True]
+        )
+        self.assertEqual(len(dedup), 3)
+
+        dedup.reset()
+        self.assertEqual(len(dedup), 0)
+        self.assertTrue(dedup.add(self.bboxes[0]))
+
+        with self.assertRaises(ValueError):
+            Deduplicator(tolerance=-1)
+        with self.assertRaises(ValueError):
+            Deduplicator(iou_threshold=1.5)
+
+    def test_deduplicator_exact_zero_area(self):
+        """Test that exact duplicates with zero area are removed across add and add_many."""
+        point = Bbox(left=5, top=5, right=5, bottom=5)
+        dedup = Deduplicator(tolerance=1)
+        self.assertTrue(dedup.add(point))
+        np.testing.assert_array_equal(dedup.add_many([point]), [False])
+        self.assertFalse(dedup.add(point))
+        self.assertEqual(len(dedup), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,76 @@
+"""Test file for bbox/bbox_view.py"""
+
+import unittest
+
+import numpy as np
+
+from easy_bbox import Bbox, BboxArray, BboxView
+
+
+class TestBboxView(unittest.TestCase):
+    """Unit tests for the BboxView class."""
+
+    def setUp(self):
+        self.bboxes = [
+            Bbox(left=10, top=20, right=30, bottom=40),
+            Bbox(left=0, top=0, right=5, bottom=10),
+            Bbox(left=2.5, top=1, right=12, bottom=7.5),
+        ]
+        self.boxes = BboxArray.from_bboxes(self.bboxes)
+
+    def test_read_api(self):
+        """Test that every read method matches the one of Bbox."""
+        other = Bbox(left=4, top=5, right=20, bottom=25)
+        for bbox, view in zip(self.bboxes, self.boxes.views()):
+            self.assertIsInstance(view, BboxView)
+            for name in ("left", "top", "right", "bottom", "width", "height"):
+                self.assertEqual(getattr(view, name), getattr(bbox, name), name)
+            for name in ("area", "center", "aspect_ratio"):
+                self.assertEqual(getattr(view, name), getattr(bbox, name), name)
+            for name in ("to_tlbr", "to_list", "to_tlwh", "to_cwh", "to_polygon"):
+                self.assertEqual(getattr(view, name)(), getattr(bbox, name)(), name)
+            for name in ("to_albu", "to_yolo"):
+                self.assertEqual(
+                    getattr(view, name)(64, 48), getattr(bbox, name)(64, 48), name
+                )
+            for name in ("iou", "overlaps", "union", "intersection"):
+                self.assertEqual(getattr(view, name)(other), getattr(bbox, name)(other))
+            self.assertEqual(view.iou(self.boxes.view(0)), bbox.iou(self.bboxes[0]))
+            self.assertEqual(view.contains_point(5, 8), bbox.contains_point(5, 8))
+            self.assertEqual(
+                view.distance_to_point(-3, 50), bbox.distance_to_point(-3, 50)
+            )
+            self.assertEqual(view.to_bbox(), bbox)
+            self.assertEqual(view, bbox)
+            self.assertEqual(bbox, view)
+
+        # to_norm_tlwh follows BboxArray, which divides the width and height
+        np.testing.assert_allclose(
+            [view.to_norm_tlwh(64, 48) for view in self.boxes.views()],
+            self.boxes.to_norm_tlwh(64, 48),
+        )
+
+    def test_indexing(self):
+        """Test view indexing, integer storage and that views follow the array."""
+        self.assertEqual(self.boxes.view(-1), self.bboxes[-1])
+        self.assertNotEqual(self.boxes.view(0), self.boxes.view(1))
+        with self.assertRaises(IndexError):
+            self.boxes.view(3)
+
+        pixels = BboxArray([(0, 0, 30000, 30000)], dtype=np.int16)
+        self.assertEqual(pixels.view(0).area, 900_000_000)
+        self.assertIsInstance(pixels.view(0).left, int)
+
+        data = np.array([(0.0, 0.0, 1.0, 1.0)])
+        view = BboxArray._wrap(data).view(0)
+        data[0, 2] = 3.0
+        self.assertEqual(view.width, 3.0)
+
+        invalid = BboxArray([(2, 0, 1, 1)], validate=False).view(0)
+        self.assertEqual(invalid.width, -1)
+        with self.assertRaises(ValueError):
+            invalid.to_bbox()
+
+
+if __name__ == "__main__":
+    unittest.main()
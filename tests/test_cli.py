@@ -0,0 +1,137 @@
+"""Test file for bbox/cli.py"""
+
+import contextlib
+import csv
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from easy_bbox import Bbox, BboxArray, BoxStats, nms
+from easy_bbox.cli import main
+
+HEADER = ["image", "left", "top", "right", "bottom", "score", "label", "note"]
+
+
+class TestCli(unittest.TestCase):
+    """Unit tests for the easy-bbox command."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        rng = np.random.default_rng(0)
+        tl = rng.integers(-10, 90, size=(300, 2))
+        coords = np.concatenate((tl, tl + rng.integers(1, 30, (300, 2))), axis=1)
+        self.images = np.repeat([f"img{k}" for k in range(10)], 30)
+        self.boxes = BboxArray(coords)
+        self.scores = rng.uniform(0, 1, 300).round(3)
+        self.rows = [
+            [image, *map(str, box), str(score), f"c{k % 3}", "x"]
+            for k, (image, box, score) in enumerate(
+                zip(self.images, coords.tolist(), self.scores)
+            )
+        ]
+        self.input = self.root / "boxes.csv"
+        with self.input.open("w", newline="") as f:
+            csv.writer(f).writerows([HEADER, *self.rows])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *args):
+        """Runs the command, and returns the rows of its output and its stderr."""
+        output = self.root / "out.csv"
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            code = main([args[0], str(self.input), "-o", str(output), *args[1:]])
+        self.assertEqual(code, 0)
+        self.assertIn("boxes/s", stderr.getvalue())
+        if args[0] == "stats":
+            return json.loads(output.read_text())
+        with output.open(newline="") as f:
+            return list(csv.reader(f))
+
+    def test_nms(self):
+        """Test that the kept rows match nms on each image, with any worker count."""
+        expected = []
+        for k in range(10):
+            rows = slice(30 * k, 30 * k + 30)
+            kept = nms(self.boxes[rows].to_bboxes(), self.scores[rows].tolist(), 0.4)
+            kept_coords = {b.to_tlbr() for b, _ in kept}
+            expected += [
+                row
+                for row, box in zip(self.rows[rows], self.boxes[rows])
+                if box.to_tlbr() in kept_coords
+            ]
+        for workers in ("1", "2"):
+            out = self.run_cli(
+                "nms",
+                "--iou-threshold",
+                "0.4",
+                "--workers",
+                workers,
+                "--chunk-size",
+                "50",
+            )
+            self.assertEqual(out[0], HEADER)
+            self.assertEqual(out[1:], expected)
+
+    def test_clip_and_dedupe(self):
+        """Test clipping, with empty boxes dropped, and deduplication."""
+        out = self.run_cli("clip", "--img-size", "64", "48", "--drop-empty")
+        clipped = self.boxes.clip_to_img(64, 48)
+        self.assertEqual(len(out) - 1, int(np.count_nonzero(clipped.area > 0)))
+        for row in out[1:]:
+            box = Bbox.from_tlbr([float(v) for v in row[1:5]])
+            self.assertLessEqual(box.right, 64)
+            self.assertLessEqual(box.bottom, 48)
+            self.assertEqual(row[-1], "x")
+
+        with self.input.open("a", newline="") as f:
+            csv.writer(f).writerows(self.rows[-3:])
+        self.assertEqual(self.run_cli("dedupe", "--tolerance", "0")[1:], self.rows)
+
+    def test_stats(self):
+        """Test that the statistics match a BoxStats fed directly."""
+        report = self.run_cli("stats", "--workers", "2", "--chunk-size", "64")
+        expected = BoxStats()
+        expected.update(self.boxes)
+        self.assertEqual(report["boxes"], 300)
+        self.assertEqual(report["classes"], {"c0": 100, "c1": 100, "c2": 100})
+        self.assertAlmostEqual(report["columns"]["area"]["mean"], expected.mean("area"))
+        self.assertIsNone(report["columns"]["center_x"]["mean"])
+
+    def assert_usage_error(self, *args, message):
+        """Checks that the command exits with a usage error containing a message."""
+        stderr = io.StringIO()
+        output = str(self.root / "out.csv")
+        with contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit) as cm:
+            main([args[0], str(self.input), "-o", output, *args[1:]])
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn(message, stderr.getvalue())
+
+    def test_errors(self):
+        """Test that invalid inputs are reported as usage errors."""
+        self.assert_usage_error("clip", message="--img-size")
+        self.assert_usage_error("nms", "--workers", "0", message="workers")
+
+        with self.input.open("w", newline="") as f:
+            csv.writer(f).writerows([HEADER, *self.rows, self.rows[0]])
+        self.assert_usage_error(
+            "nms", "--workers", "2", "--chunk-size", "64", message="'img0'"
+        )
+
+        self.input.write_text("image,left,top,right,bottom\na,0,0,1\n")
+        self.assert_usage_error("dedupe", message="Line 2")
+        self.input.write_text("image,left,top,right,bottom\na,0,0,x,1\n")
+        self.assert_usage_error("dedupe", "--workers", "2", message="could not convert")
+
+        self.input.write_text("left,top,right,bottom\n")
+        self.assert_usage_error("dedupe", message="['image']")
+
+
+if __name__ == "__main__":
+    unittest.main()
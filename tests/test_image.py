@@ -0,0 +1,124 @@
+"""Test file for bbox/image.py"""
+
+import tracemalloc
+import unittest
+
+import numpy as np
+
+from easy_bbox import Bbox, BboxArray, crop_many, rasterize
+
+
+class TestRasterize(unittest.TestCase):
+    """Unit tests for the rasterize function."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        tl = rng.integers(-5, 40, size=(50, 2))
+        self.boxes = BboxArray(
+            np.concatenate((tl, tl + rng.integers(0, 15, (50, 2))), axis=1),
+            dtype=np.int32,
+        )
+        self.scores = rng.uniform(0, 1, 50)
+
+    def naive(self, weights):
+        """Paints each box one slice at a time."""
+        raster = np.zeros((32, 48))
+        for (sy, sx), w in zip(self.boxes.clip_to_img(48, 32).to_slices(), weights):
+            raster[sy, sx] += w
+        return raster
+
+    def test_modes(self):
+        """Test the three modes against painting each box."""
+        count = rasterize(self.boxes, 48, 32, mode="count")
+        self.assertEqual(count.shape, (32, 48))
+        self.assertEqual(count.dtype, np.int64)
+        np.testing.assert_array_equal(count, self.naive(np.ones(50)))
+
+        mask = rasterize(self.boxes, 48, 32)
+        self.assertEqual(mask.dtype, bool)
+        np.testing.assert_array_equal(mask, count > 0)
+
+        heatmap = rasterize(self.boxes, 48, 32, mode="heatmap", scores=self.scores)
+        np.testing.assert_allclose(heatmap, self.naive(self.scores), atol=1e-12)
+
+    def test_float_boxes(self):
+        """Test that pixels are covered when their center is inside a box."""
+        bboxes = [Bbox(left=0.4, top=0.6, right=2.5, bottom=1.6)]
+        np.testing.assert_array_equal(
+            rasterize(bboxes, 4, 2),
+            [[False, False, False, False], [True, True, False, False]],
+        )
+        self.assertFalse(rasterize([], 4, 2).any())
+
+    def test_errors(self):
+        """Test that invalid arguments raise a ValueError."""
+        with self.assertRaises(ValueError):
+            rasterize(self.boxes, 48, 32, mode="sum")
+
+        with self.assertRaises(ValueError):
+            rasterize(self.boxes, 48, 32, mode="heatmap")
+
+        with self.assertRaises(ValueError):
+            rasterize(self.boxes, 48, 32, mode="heatmap", scores=[1.0])
+
+
+class TestCropMany(unittest.TestCase):
+    """Unit tests for the crop_many function."""
+
+    def setUp(self):
+        self.image = np.arange(6 * 8 * 3).reshape(6, 8, 3)
+        self.boxes = BboxArray(
+            [[1, 2, 5, 4], [-3, -1, 2, 10], [10, 0, 12, 3]], np.int32
+        )
+
+    def test_views(self):
+        """Test that the crops are clipped views of the image."""
+        crops = crop_many(self.image, self.boxes)
+        np.testing.assert_array_equal(crops[0], self.image[2:4, 1:5])
+        np.testing.assert_array_equal(crops[1], self.image[0:6, 0:2])
+        self.assertEqual(crops[2].shape, (3, 0, 3))
+        self.assertTrue(all(np.shares_memory(crop, self.image) for crop in crops[:2]))
+
+    def test_resize(self):
+        """Test the resized batch, with and without keeping the aspect ratio."""
+        batch = crop_many(self.image, self.boxes, output_size=(4, 4), pad_value=-1)
+        self.assertEqual(batch.shape, (3, 4, 4, 3))
+        np.testing.assert_array_equal(batch[0, :2], self.image[2:4, 1:5])
+        np.testing.assert_array_equal(batch[0, 2:], -1)
+        np.testing.assert_array_equal(batch[1, :, :1], self.image[[0, 2, 3, 5], 1:2])
+        np.testing.assert_array_equal(batch[1, :, 1:], -1)
+        np.testing.assert_array_equal(batch[2], -1)
+
+        out = np.zeros((3, 4, 8, 3), dtype=self.image.dtype)
+        result = crop_many(
+            self.image, self.boxes, (8, 4), keep_aspect_ratio=False, out=out
+        )
+        self.assertIs(result, out)
+        np.testing.assert_array_equal(
+            out[0], self.image[[2, 2, 3, 3]][:, [1, 1, 2, 2, 3, 3, 4, 4]]
+        )
+
+    def test_out_has_no_batch_temporary(self):
+        """Test that writing into `out` does not allocate another batch-sized array."""
+        image = np.zeros((256, 256, 3), dtype=np.float32)
+        boxes = BboxArray([[i, i, i + 100, i + 150] for i in range(64)], np.int32)
+        out = np.empty((64, 64, 64, 3), dtype=np.float32)
+        tracemalloc.start()
+        try:
+            crop_many(image, boxes, (64, 64), out=out)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, out.nbytes // 4)
+
+    def test_errors(self):
+        """Test that invalid outputs raise a ValueError."""
+        with self.assertRaises(ValueError):
+            crop_many(self.image, self.boxes, out=np.zeros((3, 4, 4, 3)))
+
+        with self.assertRaises(ValueError):
+            crop_many(self.image, self.boxes, (4, 4), out=np.zeros((3, 4, 4)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Test file for bbox/knn.py"""
+
+import unittest
+
+import numpy as np
+
+from easy_bbox import BboxArray, BboxKNN, points_to_boxes_distance
+
+
+class TestBboxKNN(unittest.TestCase):
+    """Unit tests for the BboxKNN class."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        tl = rng.uniform(0, 1000, size=(2000, 2))
+        self.boxes = BboxArray(
+            np.concatenate((tl, tl + rng.uniform(0, 20, (2000, 2))), 1)
+        )
+        self.points = rng.uniform(-100, 1100, size=(300, 2))
+        self.knn = BboxKNN(self.boxes, leaf_size=16)
+
+    def test_query_points(self):
+        """Test the k nearest boxes of points against a brute force search."""
+        brute = points_to_boxes_distance(self.points, self.boxes)
+        indices, distances = self.knn.query_points(self.points, k=5, chunk_size=1000)
+        self.assertEqual(indices.shape, (300, 5))
+        np.testing.assert_allclose(distances, np.sort(brute, axis=1)[:, :5])
+        np.testing.assert_allclose(
+            np.take_along_axis(brute, indices, axis=1), distances
+        )
+
+    def test_query_boxes(self):
+        """Test the k nearest boxes of boxes against a brute force search."""
+        queries = self.boxes[:100]
+        a = queries.data[:, None, :]
+        b = self.boxes.data[None, :, :]
+        dx = np.maximum(np.maximum(b[..., 0] - a[..., 2], a[..., 0] - b[..., 2]), 0)
+        dy = np.maximum(np.maximum(b[..., 1] - a[..., 3], a[..., 1] - b[..., 3]), 0)
+        brute = np.sort(np.hypot(dx, dy), axis=1)[:, :3]
+
+        _, distances = self.knn.query_boxes(queries, k=3)
+        np.testing.assert_allclose(distances, brute)
+        np.testing.assert_array_equal(distances[:, 0], 0)
+
+    def test_few_boxes(self):
+        """Test that missing neighbours are reported with index -1."""
+        knn = BboxKNN(self.boxes[:2])
+        indices, distances = knn.query_points([(0, 0)], k=3)
+        self.assertEqual(sorted(indices[0, :2].tolist()), [0, 1])
+        self.assertEqual(indices[0, 2], -1)
+        self.assertEqual(distances[0, 2], np.inf)
+
+        indices, distances = BboxKNN([]).query_points([(0, 0)])
+        self.assertEqual(indices.tolist(), [[-1]])
+
+    def test_errors(self):
+        """Test that invalid arguments raise a ValueError."""
+        with self.assertRaises(ValueError):
+            BboxKNN(self.boxes, leaf_size=0)
+
+        with self.assertRaises(ValueError):
+            self.knn.query_points(self.points, k=0)
+
+        with self.assertRaises(ValueError):
+            self.knn.query_points(self.points, chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
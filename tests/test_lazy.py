@@ -0,0 +1,70 @@
+"""Test file for bbox/lazy.py"""
+
+import unittest
+
+import numpy as np
+
+from easy_bbox import BboxArray, LazyBboxArray
+
+
+class TestLazyBboxArray(unittest.TestCase):
+    """Unit tests for the LazyBboxArray class."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.yolo = np.concatenate(
+            (rng.uniform(0.2, 0.8, (50, 2)), rng.uniform(0.01, 0.3, (50, 2))), axis=1
+        )
+        self.boxes = BboxArray.from_yolo(self.yolo, 640, 480)
+
+    def test_round_trip(self):
+        """Test that the source format is returned as is, without conversion."""
+        lazy = LazyBboxArray(self.yolo, "yolo", img_w=640, img_h=480)
+        self.assertEqual(lazy.fmt, "norm_cwh")
+        self.assertIs(lazy.to_yolo(), lazy.coords)
+        self.assertIs(lazy.to_norm_cwh(640, 480), lazy.coords)
+        np.testing.assert_array_equal(lazy.to_yolo(), self.yolo)
+        self.assertIn("converted=False", repr(lazy))
+        self.assertFalse(lazy.coords.flags.writeable)
+
+        # An eager round-trip through tlbr is not bit-exact
+        self.assertFalse(np.array_equal(self.boxes.to_yolo(640, 480), self.yolo))
+
+    def test_conversions(self):
+        """Test that other formats match BboxArray, and that the conversion is cached."""
+        lazy = LazyBboxArray(self.yolo, "yolo", img_w=640, img_h=480)
+        np.testing.assert_array_equal(lazy.to_tlbr(), self.boxes.to_tlbr())
+        self.assertIs(lazy.boxes, lazy.boxes)
+        np.testing.assert_array_equal(lazy.to_coco(), self.boxes.to_coco())
+        np.testing.assert_array_equal(lazy.to_albu(), self.boxes.to_albu(640, 480))
+        np.testing.assert_array_equal(
+            lazy.to_yolo(320, 240), self.boxes.to_yolo(320, 240)
+        )
+
+        coco = LazyBboxArray([(10, 20, 30, 40)], "coco")
+        self.assertIs(coco.to("tlwh"), coco.coords)
+        np.testing.assert_array_equal(coco.to_xyxy(), [(10, 20, 40, 60)])
+        np.testing.assert_array_equal(coco.to_yolo(100, 100), [(0.25, 0.4, 0.3, 0.4)])
+        with self.assertRaises(ValueError):
+            coco.to_yolo()
+
+    def test_errors(self):
+        """Test unknown formats, missing image sizes and invalid boxes."""
+        with self.assertRaises(ValueError):
+            LazyBboxArray(self.yolo, "xywh")
+        with self.assertRaises(ValueError):
+            LazyBboxArray(self.yolo, "yolo")
+        with self.assertRaises(ValueError):
+            LazyBboxArray([(0, 0, -1, 1)], "coco")
+        with self.assertRaises(ValueError):
+            LazyBboxArray([(2, 0, 1, 1)])
+        for fmt in ("coco", "tlbr"):
+            with self.assertRaises(ValueError):
+                LazyBboxArray([(np.nan, 0, 1, 1)], fmt)
+            with self.assertRaises(ValueError):
+                LazyBboxArray([(0, 0, np.inf, 1)], fmt)
+        self.assertEqual(len(LazyBboxArray([(2, 0, 1, 1)], validate=False)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+"""Test file for bbox/ops.py"""
+
+import unittest
+
+import numpy as np
+
+from easy_bbox import (
+    Bbox,
+    BboxArray,
+    box_ciou,
+    box_diou,
+    box_giou,
+    box_iou,
+    nearest_box,
+    points_in_boxes,
+    points_to_boxes_distance,
+)
+
+
+class TestPointKernels(unittest.TestCase):
+    """Unit tests for the point-box kernels."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        tl = rng.uniform(0, 100, size=(40, 2))
+        self.boxes = BboxArray(
+            np.concatenate((tl, tl + rng.uniform(0, 20, (40, 2))), axis=1)
+        )
+        self.points = rng.uniform(-10, 130, size=(60, 2))
+
+    def test_points_in_boxes(self):
+        """Test that the mask matches Bbox.contains_point."""
+        mask = points_in_boxes(self.points, self.boxes)
+        self.assertEqual(mask.shape, (60, 40))
+        expected = [
+            [b.contains_point(x, y) for b in self.boxes] for x, y in self.points
+        ]
+        np.testing.assert_array_equal(mask, expected)
+
+        # Edges are included, as for Bbox.contains_point
+        bboxes = [Bbox(left=0, top=0, right=10, bottom=10)]
+        np.testing.assert_array_equal(
+            points_in_boxes([(10, 10), (10.5, 0)], bboxes), [[True], [False]]
+        )
+
+    def test_points_to_boxes_distance(self):
+        """Test that the distances match Bbox.distance_to_point."""
+        dist = points_to_boxes_distance(self.points, self.boxes)
+        expected = [
+            [b.distance_to_point(x, y) for b in self.boxes] for x, y in self.points
+        ]
+        np.testing.assert_allclose(dist, expected)
+        self.assertEqual(points_to_boxes_distance([], self.boxes).shape, (0, 40))
+
+        with self.assertRaises(ValueError):
+            points_to_boxes_distance([(1, 2, 3)], self.boxes)
+
+    def test_nearest_box(self):
+        """Test that the chunked search matches the full distance matrix."""
+        dist = points_to_boxes_distance(self.points, self.boxes)
+        for chunk_size in (1, 7, 100, 1 << 22):
+            index, nearest = nearest_box(self.points, self.boxes, chunk_size=chunk_size)
+            np.testing.assert_array_equal(index, dist.argmin(axis=1))
+            np.testing.assert_allclose(nearest, dist.min(axis=1))
+
+        with self.assertRaises(ValueError):
+            nearest_box(self.points, [])
+
+        with self.assertRaises(ValueError):
+            nearest_box(self.points, self.boxes, chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestIouMetrics(unittest.TestCase):
+    """Unit tests for the vectorized IoU metrics."""
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        tl = rng.uniform(0, 50, size=(30, 2))
+        self.boxes = BboxArray(
+            np.concatenate((tl, tl + rng.uniform(0, 30, (30, 2))), axis=1)
+        )
+        self.boxes1 = self.boxes[:12]
+        self.boxes2 = self.boxes[12:]
+
+    def test_box_iou(self):
+        """Test that the IoU matches Bbox.iou."""
+        expected = [[a.iou(b) for b in self.boxes2] for a in self.boxes1]
+        np.testing.assert_allclose(box_iou(self.boxes1, self.boxes2), expected)
+        np.testing.assert_allclose(
+            box_iou(self.boxes1, self.boxes2[:12], aligned=True),
+            np.diag(np.array(expected)[:, :12]),
+        )
+        self.assertEqual(box_iou(self.boxes1, []).shape, (12, 0))
+
+        # Degenerate boxes have an IoU of 0, as with Bbox.iou
+        point = Bbox(left=1, top=1, right=1, bottom=1)
+        self.assertEqual(box_iou([point], [point])[0, 0], 0)
+
+        with self.assertRaises(ValueError):
+            box_iou(self.boxes1, self.boxes2, aligned=True)
+
+    def test_float32(self):
+        """Test that float32 boxes are processed in float32, within tolerance."""
+        boxes1 = self.boxes1.astype(np.float32)
+        boxes2 = self.boxes2.astype(np.float32)
+        expected = box_iou(self.boxes1, self.boxes2)
+        for metric in (box_iou, box_giou, box_diou, box_ciou):
+            result = metric(boxes1, boxes2)
+            self.assertEqual(result.dtype, np.float32)
+            np.testing.assert_allclose(
+                result, metric(self.boxes1, self.boxes2), rtol=1e-5, atol=1e-6
+            )
+        self.assertEqual(box_iou(boxes1, self.boxes2).dtype, np.float64)
+        np.testing.assert_allclose(box_iou(boxes1, boxes2), expected, atol=1e-6)
+
+    def test_box_giou(self):
+        """Test the GIoU against a per-pair computation with Bbox.union."""
+        expected = []
+        for a in self.boxes1:
+            row = []
+            for b in self.boxes2:
+                inter = a & b
+                union = a.area + b.area - (inter.area if inter else 0)
+                enclosing = a.union(b).area
+                row.append(a.iou(b) - (enclosing - union) / enclosing)
+            expected.append(row)
+        np.testing.assert_allclose(box_giou(self.boxes1, self.boxes2), expected)
+
+        a = Bbox(left=0, top=0, right=1, bottom=1)
+        b = Bbox(left=2, top=0, right=3, bottom=1)
+        self.assertAlmostEqual(box_giou([a], [b])[0, 0], -1 / 3)
+        self.assertAlmostEqual(box_giou([a], [a], aligned=True)[0], 1)
+
+    def test_box_diou_ciou(self):
+        """Test DIoU and CIoU on known values."""
+        a = Bbox(left=0, top=0, right=2, bottom=2)
+        b = Bbox(left=2, top=0, right=4, bottom=2)
+        # Centers are 2 apart, the englobing box diagonal is sqrt(16 + 4)
+        self.assertAlmostEqual(box_diou([a], [b])[0, 0], -4 / 20)
+        # Same aspect ratio, so CIoU equals DIoU
+        self.assertAlmostEqual(box_ciou([a], [b])[0, 0], -4 / 20)
+
+        c = Bbox(left=0, top=0, right=2, bottom=1)
+        iou = a.iou(c)
+        v = 4 / np.pi**2 * (np.arctan(2) - np.arctan(1)) ** 2
+        alpha = v / (1 - iou + v)
+        diou = box_diou([a], [c], aligned=True)[0]
+        self.assertAlmostEqual(diou, iou - 0.25 / 8)
+        self.assertAlmostEqual(box_ciou([a], [c], aligned=True)[0], diou - alpha * v)
+
+        # The metrics are bounded and equal to 1 for identical boxes
+        for metric in (box_iou, box_giou, box_diou, box_ciou):
+            values = metric(self.boxes, self.boxes)
+            self.assertTrue(np.all(values <= 1 + 1e-12))
+            self.assertTrue(np.all(values >= -1 - 1e-12))
+            np.testing.assert_allclose(np.diag(values), 1)
@@ -0,0 +1,110 @@
+"""Test file for bbox/parallel.py"""
+
+import unittest
+
+import numpy as np
+
+from easy_bbox import BboxArray, box_iou, pairwise, pairwise_threshold, pairwise_topk
+
+
+class TestPairwise(unittest.TestCase):
+    """Unit tests for the tiled pairwise kernels."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+
+        def random_boxes(n):
+            tl = rng.uniform(0, 100, size=(n, 2))
+            return BboxArray(np.concatenate((tl, tl + rng.uniform(0, 30, (n, 2))), 1))
+
+        self.boxes1 = random_boxes(70)
+        self.boxes2 = random_boxes(90)
+        a = self.boxes1.data[:, None, :]
+        b = self.boxes2.data[None, :, :]
+        inter_w = np.maximum(
+            np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0
+        )
+        inter_h = np.maximum(
+            np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0
+        )
+        dx = np.maximum(np.maximum(b[..., 0] - a[..., 2], a[..., 0] - b[..., 2]), 0)
+        dy = np.maximum(np.maximum(b[..., 1] - a[..., 3], a[..., 1] - b[..., 3]), 0)
+        self.expected = {
+            "iou": box_iou(self.boxes1, self.boxes2),
+            "intersection": inter_w * inter_h,
+            "containment": inter_w * inter_h / self.boxes2.area,
+            "distance": np.hypot(dx, dy),
+        }
+
+    def test_pairwise(self):
+        """Test every kernel against a dense computation, with small tiles."""
+        for kernel, expected in self.expected.items():
+            result = pairwise(
+                self.boxes1, self.boxes2, kernel, tile_size=50, num_threads=4
+            )
+            np.testing.assert_allclose(result, expected, err_msg=kernel)
+
+        result = pairwise(
+            self.boxes1.astype(np.float32), self.boxes2.astype(np.float32), tile_size=50
+        )
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, self.expected["iou"], atol=1e-6)
+
+    def test_topk(self):
+        """Test the top-k reduction against sorting the dense matrix."""
+        for kernel, expected in self.expected.items():
+            indices, values = pairwise_topk(
+                self.boxes1, self.boxes2, kernel, k=3, tile_size=40, num_threads=3
+            )
+            ordered = np.sort(expected, axis=1)
+            if kernel != "distance":
+                ordered = ordered[:, ::-1]
+            np.testing.assert_allclose(values, ordered[:, :3], err_msg=kernel)
+            np.testing.assert_allclose(
+                np.take_along_axis(expected, indices, axis=1), values, err_msg=kernel
+            )
+
+        indices, values = pairwise_topk(self.boxes1, self.boxes2[:2], k=3)
+        self.assertTrue((indices[:, 2] == -1).all())
+        self.assertTrue((values[:, 2] == -np.inf).all())
+
+        boxes1, boxes2 = self.boxes1.astype(np.float32), self.boxes2.astype(np.float32)
+        for kernel in ("iou", "distance"):
+            _, values = pairwise_topk(boxes1, boxes2, kernel, k=3)
+            self.assertEqual(values.dtype, np.float32)
+
+    def test_threshold(self):
+        """Test the thresholded pairs against the dense matrix."""
+        rows, cols, values = pairwise_threshold(
+            self.boxes1, self.boxes2, 0.3, tile_size=64, num_threads=4
+        )
+        expected_rows, expected_cols = np.nonzero(self.expected["iou"] >= 0.3)
+        np.testing.assert_array_equal(rows, expected_rows)
+        np.testing.assert_array_equal(cols, expected_cols)
+        np.testing.assert_allclose(values, self.expected["iou"][rows, cols])
+
+        rows, cols, _ = pairwise_threshold(self.boxes1, self.boxes2, 5, "distance")
+        self.assertEqual(len(rows), (self.expected["distance"] <= 5).sum())
+
+        boxes = self.boxes1.astype(np.float32)
+        _, _, values = pairwise_threshold(boxes, boxes[:0], 0.3)
+        self.assertEqual(values.dtype, np.float32)
+        self.assertEqual(pairwise_threshold(boxes, boxes, 0.3)[2].dtype, np.float32)
+
+    def test_errors(self):
+        """Test that invalid arguments raise a ValueError."""
+        with self.assertRaises(ValueError):
+            pairwise(self.boxes1, self.boxes2, "giou")
+
+        with self.assertRaises(ValueError):
+            pairwise(self.boxes1, self.boxes2, tile_size=0)
+
+        with self.assertRaises(ValueError):
+            pairwise(self.boxes1, self.boxes2, num_threads=0)
+
+        with self.assertRaises(ValueError):
+            pairwise_topk(self.boxes1, self.boxes2, k=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+"""Test file for bbox/pipeline.py and bbox/formats.py"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from easy_bbox import convert_dataset
+from easy_bbox.formats import dump_voc, load_coco, parse_voc, parse_yolo
+from easy_bbox.pipeline import PROGRESS_FILE_NAME, main
+
+COCO = {
+    "images": [
+        {"id": 1, "file_name": "a.jpg", "width": 100, "height": 50},
+        {"id": 2, "file_name": "b.jpg", "width": 200, "height": 100},
+        {"id": 3, "file_name": "c.jpg", "width": 10, "height": 10},
+    ],
+    "annotations": [
+        {"id": 1, "image_id": 1, "category_id": 7, "bbox": [10, 20, 30, 10]},
+        {"id": 2, "image_id": 2, "category_id": 8, "bbox": [0, 0, 50, 50]},
+        {"id": 3, "image_id": 1, "category_id": 8, "bbox": [5, 5, 10, 10]},
+    ],
+    "categories": [{"id": 7, "name": "cat"}, {"id": 8, "name": "dog"}],
+}
+
+
+class TestFormats(unittest.TestCase):
+    """Unit tests for the annotation readers and writers."""
+
+    def test_load_coco(self):
+        """Test that COCO annotations are grouped per image."""
+        records = load_coco(json.dumps(COCO))
+        self.assertEqual([r.name for r in records], ["a.jpg", "b.jpg", "c.jpg"])
+        self.assertEqual(records[0].labels, ["cat", "dog"])
+        np.testing.assert_array_equal(
+            records[0].boxes.to_tlbr(), [(10, 20, 40, 30), (5, 5, 15, 15)]
+        )
+        self.assertEqual(len(records[2].boxes), 0)
+
+    def test_voc_round_trip(self):
+        """Test that dumping then parsing a VOC annotation is lossless."""
+        record = load_coco(json.dumps(COCO))[0]
+        parsed = parse_voc(dump_voc(record, record.boxes.to_tlbr()))
+        self.assertEqual(parsed, record)
+
+    def test_parse_voc_missing_coordinate(self):
+        """Test that a box with a missing coordinate is rejected."""
+        record = load_coco(json.dumps(COCO))[0]
+        text = dump_voc(record, record.boxes.to_tlbr()).replace("<ymax>30</ymax>", "")
+        with self.assertRaisesRegex(ValueError, "'a.jpg'.*<ymax>"):
+            parse_voc(text)
+
+    def test_parse_yolo(self):
+        """Test YOLO parsing with and without class names."""
+        record = parse_yolo("1 0.5 0.5 0.2 0.4\n\n", "a", 100, 50)
+        self.assertEqual(record.labels, ["1"])
+        np.testing.assert_array_equal(record.boxes.to_tlbr(), [(40, 15, 60, 35)])
+        self.assertEqual(
+            parse_yolo("1 0.5 0.5 0.2 0.4", "a", 100, 50, ["cat", "dog"]).labels,
+            ["dog"],
+        )
+        with self.assertRaises(ValueError):
+            parse_yolo("1 0.5 0.5 0.2", "a", 100, 50)
+
+
+class TestPipeline(unittest.TestCase):
+    """Unit tests for the dataset conversion pipeline."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.coco = self.root / "coco.json"
+        self.coco.write_text(json.dumps(COCO))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_coco_yolo_coco(self):
+        """Test a COCO -> YOLO -> COCO round trip."""
+        classes = ["cat", "dog"]
+        report = convert_dataset(
+            self.coco, self.root / "yolo", "coco", "yolo", classes=classes, batch_size=2
+        )
+        self.assertEqual((report.images, report.boxes, report.skipped), (3, 3, 0))
+        self.assertEqual(
+            (self.root / "yolo" / "a.txt").read_text(),
+            "0 0.250000 0.500000 0.300000 0.200000\n"
+            "1 0.100000 0.200000 0.100000 0.200000\n",
+        )
+
+        sizes = {"a": (100, 50), "b": (200, 100), "c": (10, 10)}
+        convert_dataset(
+            self.root / "yolo",
+            self.root / "out.json",
+            "yolo",
+            "coco",
+            classes=classes,
+            image_sizes=sizes,
+            concurrency=2,
+        )
+        out = json.loads((self.root / "out.json").read_text())
+        self.assertEqual([img["file_name"] for img in out["images"]], ["a", "b", "c"])
+        self.assertEqual(len(out["annotations"]), 3)
+        np.testing.assert_allclose(out["annotations"][0]["bbox"], [10, 20, 30, 10])
+
+    def test_resume(self):
+        """Test that already converted images are skipped."""
+        dst = self.root / "voc"
+        convert_dataset(self.coco, dst, "coco", "voc")
+        self.assertEqual(
+            sorted((dst / PROGRESS_FILE_NAME).read_text().split()),
+            ["a.jpg", "b.jpg", "c.jpg"],
+        )
+
+        (dst / "b.xml").unlink()
+        (dst / PROGRESS_FILE_NAME).write_text("a.jpg\nc.jpg\n")
+        report = convert_dataset(self.coco, dst, "coco", "voc")
+        self.assertEqual((report.images, report.skipped), (1, 2))
+        self.assertTrue((dst / "b.xml").exists())
+
+        report = convert_dataset(self.coco, dst, "coco", "voc", resume=False)
+        self.assertEqual((report.images, report.skipped), (3, 0))
+
+    def test_errors(self):
+        """Test that invalid arguments and inputs raise a ValueError."""
+        with self.assertRaises(ValueError):
+            convert_dataset(self.coco, self.root / "out", "coco", "csv")
+
+        with self.assertRaises(ValueError):
+            convert_dataset(self.coco, self.root / "out", "coco", "voc", concurrency=0)
+
+        yolo = self.root / "yolo"
+        yolo.mkdir()
+        (yolo / "a.txt").write_text("0 0.5 0.5 0.1 0.1\n")
+        with self.assertRaises(ValueError):
+            convert_dataset(yolo, self.root / "out", "yolo", "voc")
+
+    def test_colliding_stems(self):
+        """Test that images with the same stem in different directories are rejected."""
+        coco = dict(COCO, images=[dict(image) for image in COCO["images"]])
+        coco["images"][0]["file_name"] = "train/0001.jpg"
+        coco["images"][1]["file_name"] = "val/0001.jpg"
+        self.coco.write_text(json.dumps(coco))
+        for dst_format in ("yolo", "voc"):
+            with self.assertRaisesRegex(ValueError, "'train/0001.jpg'.*'val/0001.jpg'"):
+                convert_dataset(
+                    self.coco,
+                    self.root / dst_format,
+                    "coco",
+                    dst_format,
+                    classes=["cat", "dog"],
+                )
+
+    def test_main(self):
+        """Test the command line entry point."""
+        classes = self.root / "classes.txt"
+        classes.write_text("cat\ndog\n")
+        args = [
+            str(self.coco),
+            str(self.root / "yolo"),
+            "--from",
+            "coco",
+            "--to",
+            "yolo",
+        ]
+        self.assertEqual(main([*args, "--classes", str(classes)]), 0)
+        self.assertEqual(len(list((self.root / "yolo").glob("*.txt"))), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
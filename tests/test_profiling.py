@@ -0,0 +1,67 @@
+"""Test file for bbox/profiling.py"""
+
+import unittest
+
+from easy_bbox import Bbox, nms, profiling
+
+
+class TestProfiling(unittest.TestCase):
+    """Unit tests for the profiling hooks."""
+
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_by_default(self):
+        """Test that nothing is wrapped nor recorded when profiling is disabled."""
+        self.assertFalse(profiling.is_enabled())
+        self.assertFalse(hasattr(Bbox.iou, "__wrapped__"))
+        Bbox(left=0, top=0, right=1, bottom=1)
+        self.assertEqual(profiling.snapshot(), {})
+
+    def test_profile_context(self):
+        """Test the counters collected inside a profile block."""
+        a = Bbox(left=0, top=0, right=10, bottom=10)
+        b = Bbox(left=5, top=5, right=15, bottom=15)
+        original_iou = Bbox.iou
+
+        with profiling.profile() as stats:
+            a.iou(b)
+            _ = a & b
+            nms([a, b], [0.9, 0.8], iou_threshold=0.1)
+
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["Bbox.iou"]["calls"], 2)
+        # Called by the 2 iou and by the & operator
+        self.assertEqual(snapshot["Bbox.intersection"]["calls"], 3)
+        self.assertEqual(snapshot["Bbox.__init__"]["calls"], 3)
+        self.assertEqual(snapshot["nms"]["calls"], 1)
+        self.assertEqual(snapshot["nms"]["boxes_in"], 2)
+        self.assertEqual(snapshot["nms"]["boxes_out"], 1)
+        self.assertGreaterEqual(snapshot["nms"]["total_time"], 0)
+
+        # The original methods are restored after the block
+        self.assertFalse(profiling.is_enabled())
+        self.assertIs(Bbox.iou, original_iou)
+        self.assertNotIn("__init__", vars(Bbox))
+        a.iou(b)
+        self.assertEqual(stats.snapshot(), snapshot)
+
+    def test_enable_disable(self):
+        """Test the enable, reset and disable functions."""
+        stats = profiling.enable()
+        self.assertIs(profiling.enable(), stats)
+        with profiling.profile() as inner:
+            self.assertIs(inner, stats)
+        self.assertTrue(profiling.is_enabled())
+
+        Bbox(left=0, top=0, right=1, bottom=1)
+        self.assertEqual(profiling.snapshot()["Bbox.__init__"]["calls"], 1)
+        profiling.reset()
+        self.assertEqual(profiling.snapshot(), {})
+
+        profiling.disable()
+        self.assertIsNone(profiling.active_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Test file for bbox/query.py"""
+
+import unittest
+
+import numpy as np
+
+from easy_bbox import Bbox, BboxArray, BboxQuery
+
+
+class TestBboxQuery(unittest.TestCase):
+    """Unit tests for the BboxQuery class."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        tl = rng.integers(0, 100, size=(500, 2))
+        self.boxes = BboxArray(
+            np.concatenate((tl, tl + rng.integers(0, 30, (500, 2))), axis=1),
+            dtype=np.int32,
+        )
+        self.query = BboxQuery(self.boxes)
+
+    def test_range(self):
+        """Test single column ranges against a full scan."""
+        area = self.boxes.area
+        np.testing.assert_array_equal(
+            self.query.range("area", 100, 400),
+            np.flatnonzero((area >= 100) & (area <= 400)),
+        )
+        np.testing.assert_array_equal(
+            self.query.range("width", high=5), np.flatnonzero(self.boxes.width <= 5)
+        )
+        np.testing.assert_array_equal(self.query.range("top"), np.arange(500))
+        np.testing.assert_array_equal(self.query.column("area"), area)
+
+    def test_where(self):
+        """Test combined ranges, including the undefined aspect ratios."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = self.boxes.aspect_ratio
+        center_x = self.boxes.center[:, 0]
+        expected = (ratio >= 0.5) & (ratio <= 2) & (center_x <= 50)
+        result = self.query.where(aspect_ratio=(0.5, 2), center_x=(None, 50))
+        np.testing.assert_array_equal(result, np.flatnonzero(expected))
+        np.testing.assert_array_equal(
+            self.query.mask(aspect_ratio=(0.5, 2), center_x=(None, 50)), expected
+        )
+        finite = np.isfinite(ratio)
+        np.testing.assert_array_equal(
+            self.query.where(aspect_ratio=(1, None)),
+            np.flatnonzero(finite & (ratio >= 1)),
+        )
+        # The non-finite ratios are excluded whichever predicate drives the search
+        np.testing.assert_array_equal(
+            self.query.where(aspect_ratio=(None, None)), np.flatnonzero(finite)
+        )
+        np.testing.assert_array_equal(
+            self.query.where(aspect_ratio=(None, None), left=(0, 10)),
+            np.flatnonzero(finite & (self.boxes.left <= 10)),
+        )
+
+    def test_regions(self):
+        """Test the boxes within and overlapping a region."""
+        region = Bbox(left=20, top=30, right=60, bottom=70)
+        bboxes = self.boxes.to_bboxes()
+        within = [
+            i
+            for i, bbox in enumerate(bboxes)
+            if region.contains_point(bbox.left, bbox.top)
+            and region.contains_point(bbox.right, bbox.bottom)
+        ]
+        overlapping = [i for i, bbox in enumerate(bboxes) if bbox.overlaps(region)]
+        self.assertEqual(self.query.within(region).tolist(), within)
+        self.assertEqual(self.query.overlapping(region).tolist(), overlapping)
+
+    def test_errors(self):
+        """Test that unknown columns raise a ValueError."""
+        with self.assertRaises(ValueError):
+            self.query.range("volume", 0, 1)
+
+        with self.assertRaises(ValueError):
+            self.query.where(volume=(0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
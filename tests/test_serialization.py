@@ -0,0 +1,94 @@
+"""Test file for bbox/serialization.py"""
+
+import pickle
+import unittest
+
+import numpy as np
+
+from easy_bbox import Bbox, BboxArray
+from easy_bbox.serialization import dumps, loads, loads_array
+
+
+class LabeledBbox(Bbox):
+    """A Bbox subclass with an extra field, to test pickling."""
+
+    label: str
+
+
+class TestSerialization(unittest.TestCase):
+    """Unit tests for the serialization functions and Bbox pickling."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        tl = rng.integers(0, 100, size=(50, 2))
+        self.boxes = BboxArray(
+            np.concatenate((tl, tl + rng.integers(0, 30, (50, 2))), 1)
+        )
+        self.bboxes = self.boxes.to_bboxes()
+
+    def test_pickle(self):
+        """Test that a Bbox pickles compactly and round-trips."""
+        bbox = Bbox(left=1.5, top=2, right=3, bottom=4)
+        payload = pickle.dumps(bbox)
+        self.assertLess(len(payload), 100)
+        restored = pickle.loads(payload)
+        self.assertEqual(restored, bbox)
+        self.assertEqual(restored.model_dump(), bbox.model_dump())
+        self.assertEqual(restored.iou(bbox), 1.0)
+        self.assertEqual(restored.model_fields_set, bbox.model_fields_set)
+
+    def test_pickle_subclass(self):
+        """Test that a Bbox subclass keeps its type and extra fields when pickled."""
+        bbox = LabeledBbox(left=1, top=2, right=3, bottom=4, label="cat")
+        restored = pickle.loads(pickle.dumps(bbox))
+        self.assertIs(type(restored), LabeledBbox)
+        self.assertEqual(restored.label, "cat")
+        self.assertEqual(restored, bbox)
+
+    def test_round_trips(self):
+        """Test the binary and JSON round-trips, for every dtype."""
+        for dtype in (np.float64, np.float32, np.int32, np.int16):
+            payload = dumps(self.bboxes, dtype=dtype)
+            self.assertEqual(len(payload), 16 + 50 * 4 * np.dtype(dtype).itemsize)
+            self.assertEqual(loads(payload), self.bboxes)
+            self.assertEqual(loads(payload, trusted=True), self.bboxes)
+
+        payload = dumps(self.boxes, fmt="json")
+        self.assertIsInstance(payload, str)
+        self.assertEqual(loads(payload), self.bboxes)
+        self.assertEqual(loads_array(dumps(self.boxes)), self.boxes)
+        self.assertEqual(loads_array(dumps(self.boxes, dtype=np.int16)).dtype, np.int16)
+        self.assertEqual(
+            loads_array(dumps(self.boxes, dtype=np.float32)).dtype, np.float32
+        )
+        self.assertEqual(loads(dumps([])), [])
+
+    def test_errors(self):
+        """Test that malformed payloads and invalid boxes raise a ValueError."""
+        payload = dumps(self.bboxes)
+        with self.assertRaises(ValueError):
+            loads(payload[:-1])
+
+        with self.assertRaises(ValueError):
+            loads(b"XXXX" + payload[4:])
+
+        with self.assertRaises(ValueError):
+            loads("[1, 2, 3]")
+
+        with self.assertRaises(ValueError):
+            dumps(self.bboxes, fmt="xml")
+
+        with self.assertRaises(ValueError):
+            dumps(self.bboxes, dtype=np.uint8)
+
+        with self.assertRaises(ValueError):
+            dumps([Bbox(left=0.5, top=0, right=1, bottom=1)], dtype=np.int32)
+
+        invalid = dumps(BboxArray([[2, 0, 1, 1]], validate=False))
+        with self.assertRaises(ValueError):
+            loads(invalid)
+        self.assertEqual(len(loads(invalid, trusted=True)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Test file for bbox/shared.py"""
+
+import multiprocessing
+import pickle
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from easy_bbox import Bbox, BboxArray, BoxStore, SharedBoxStore
+
+
+def _image_area(args):
+    """Worker computing the total area of the boxes of an image."""
+    shared, k = args
+    return float(shared.boxes(k).area.sum())
+
+
+class TestSharedBoxStore(unittest.TestCase):
+    """Unit tests for the SharedBoxStore class."""
+
+    def setUp(self):
+        self.store = BoxStore(dtype=np.int32)
+        self.store.append("a", [[0, 0, 10, 10], [1, 1, 2, 3]], labels=[1, 2])
+        self.store.append("b", [])
+        self.store.append("c", [[5, 5, 8, 9]], scores=[0.5])
+
+    def test_create_and_attach(self):
+        """Test that attached stores and pickled stores see the same boxes."""
+        with SharedBoxStore.create(self.store) as shared:
+            self.assertEqual(len(shared), 3)
+            self.assertEqual(shared.num_boxes, 3)
+            self.assertEqual(shared.dtype, np.int32)
+            self.assertEqual(shared[0], self.store["a"])
+            np.testing.assert_array_equal(shared.labels(0), [1, 2])
+            np.testing.assert_array_equal(shared.scores(-1), [0.5])
+            self.assertEqual(len(shared.boxes(1)), 0)
+            with self.assertRaises(IndexError):
+                shared.boxes(3)
+
+            payload = pickle.dumps(shared)
+            self.assertLess(len(payload), 200)
+            attached = pickle.loads(payload)
+            self.assertEqual(attached.name, shared.name)
+            self.assertEqual(attached.flat_boxes, self.store.flat_boxes)
+            self.assertFalse(attached.flat_labels.flags.writeable)
+            copy = attached.to_store(["a", "b", "c"])
+            self.assertEqual(copy.to_dict(), self.store.to_dict())
+            attached.close()
+
+    def test_workers(self):
+        """Test that worker processes read the boxes from the segment."""
+        with SharedBoxStore.create(self.store) as shared:
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(2) as pool:
+                areas = pool.map(_image_area, [(shared, k) for k in range(3)])
+        self.assertEqual(areas, [102.0, 0.0, 12.0])
+
+    def test_independent_process(self):
+        """Test that a process that only attached does not destroy the segment on exit."""
+        script = (
+            "import sys\n"
+            "from easy_bbox import SharedBoxStore\n"
+            "shared = SharedBoxStore.attach(sys.argv[1])\n"
+            "print(shared.num_boxes)\n"
+            "shared.close()\n"
+        )
+        with SharedBoxStore.create(self.store) as shared:
+            result = subprocess.run(
+                [sys.executable, "-c", script, shared.name],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            self.assertEqual(result.stdout.strip(), "3")
+            self.assertNotIn("leaked", result.stderr)
+            attached = SharedBoxStore.attach(shared.name)
+            self.assertEqual(attached.flat_boxes, self.store.flat_boxes)
+            attached.close()
+
+    def test_close_twice(self):
+        """Test that closing a store again, e.g. on leaving its context, has no effect."""
+        with SharedBoxStore.create(self.store) as shared:
+            shared.close()
+            shared.close()
+
+    def test_plain_boxes(self):
+        """Test that a collection of boxes is shared as a single image."""
+        bboxes = [Bbox(left=0, top=0, right=1, bottom=2)]
+        with SharedBoxStore.create(bboxes) as shared:
+            self.assertEqual(len(shared), 1)
+            self.assertEqual(shared.flat_boxes, BboxArray.from_bboxes(bboxes))
+
+        boxes = BboxArray.from_bboxes(bboxes, dtype=np.float32)
+        with SharedBoxStore.create(boxes) as shared:
+            self.assertEqual(shared.dtype, np.float32)
+            self.assertEqual(shared.flat_boxes, boxes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Test file for bbox/stats.py"""
+
+import pickle
+import unittest
+
+import numpy as np
+
+from easy_bbox import BboxArray, BoxStats
+
+
+class TestBoxStats(unittest.TestCase):
+    """Unit tests for the BoxStats class."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        tl = rng.uniform(0, 500, size=(2000, 2))
+        self.boxes = BboxArray(
+            np.concatenate((tl, tl + rng.lognormal(3, 1, size=(2000, 2))), axis=1)
+        )
+        self.labels = rng.integers(0, 5, 2000)
+
+    def test_moments(self):
+        """Test the streamed moments against NumPy on the whole array."""
+        stats = BoxStats()
+        for start in range(0, 2000, 300):
+            rows = slice(start, start + 300)
+            stats.update(self.boxes[rows], img_w=640, img_h=480)
+        self.assertEqual(stats.num_boxes, 2000)
+        for column, values in (
+            ("width", self.boxes.width),
+            ("area", self.boxes.area),
+            ("aspect_ratio", self.boxes.aspect_ratio),
+            ("center_y", self.boxes.center[:, 1] / 480),
+        ):
+            self.assertEqual(stats.count(column), 2000)
+            self.assertAlmostEqual(stats.mean(column), values.mean())
+            self.assertAlmostEqual(stats.std(column), values.std())
+            self.assertEqual(stats.min(column), values.min())
+            self.assertEqual(stats.max(column), values.max())
+
+    def test_histogram_and_quantiles(self):
+        """Test the histogram counts and the accuracy of the quantiles."""
+        stats = BoxStats(bins=256)
+        stats.update(self.boxes)
+        counts, edges = stats.histogram("height")
+        np.testing.assert_array_equal(counts, np.histogram(self.boxes.height, edges)[0])
+
+        quantiles = stats.quantile("height", [0.0, 0.1, 0.5, 0.9, 1.0])
+        expected = np.quantile(self.boxes.height, [0.0, 0.1, 0.5, 0.9, 1.0])
+        np.testing.assert_allclose(quantiles, expected, rtol=0.05)
+        self.assertTrue(np.isnan(stats.quantile("center_x", 0.5)))
+
+    def test_merge(self):
+        """Test that merging accumulators matches a single accumulator."""
+        whole = BoxStats()
+        whole.update(self.boxes, 640, 480, self.labels)
+        parts = [BoxStats(), BoxStats(), BoxStats()]
+        for k, part in enumerate(parts):
+            part.update(self.boxes[k::3], 640, 480, self.labels[k::3])
+        merged = pickle.loads(pickle.dumps(parts[0])).merge(parts[1]).merge(parts[2])
+
+        self.assertEqual(merged.class_counts, whole.class_counts)
+        self.assertEqual(sum(merged.class_counts.values()), 2000)
+        for column in ("width", "aspect_ratio", "center_x"):
+            self.assertAlmostEqual(merged.mean(column), whole.mean(column))
+            self.assertAlmostEqual(merged.var(column), whole.var(column))
+            np.testing.assert_array_equal(
+                merged.histogram(column)[0], whole.histogram(column)[0]
+            )
+            self.assertEqual(merged.quantile(column, 0.9), whole.quantile(column, 0.9))
+        self.assertEqual(merged.summary()["area"]["count"], 2000)
+
+        with self.assertRaises(ValueError):
+            merged.merge(BoxStats(bins=10))
+
+    def test_edge_cases(self):
+        """Test non-finite values, empty accumulators and bad arguments."""
+        stats = BoxStats()
+        stats.update(BboxArray([[0, 0, 10, 0], [0, 0, 10, 5]]))
+        self.assertEqual(stats.count("width"), 2)
+        self.assertEqual(stats.count("aspect_ratio"), 1)
+        self.assertEqual(stats.mean("aspect_ratio"), 2.0)
+        self.assertTrue(np.isnan(BoxStats().mean("width")))
+
+        with self.assertRaises(ValueError):
+            stats.mean("depth")
+        with self.assertRaises(ValueError):
+            stats.quantile("width", 1.5)
+        with self.assertRaises(ValueError):
+            stats.update(self.boxes, img_w=640)
+        with self.assertRaises(ValueError):
+            stats.update(self.boxes, labels=[0, 1])
+        with self.assertRaises(ValueError):
+            BoxStats(size_range=(0, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
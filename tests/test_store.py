@@ -0,0 +1,92 @@
+"""Test file for bbox/store.py"""
+
+import unittest
+
+import numpy as np
+
+from easy_bbox import Bbox, BboxArray, BoxStore
+
+
+class TestBoxStore(unittest.TestCase):
+    """Unit tests for the BoxStore class."""
+
+    def setUp(self):
+        self.bboxes = {
+            "a": [Bbox(left=0, top=0, right=10, bottom=10)],
+            "b": [],
+            "c": [
+                Bbox(left=1, top=2, right=3, bottom=4),
+                Bbox(left=5, top=6, right=7, bottom=8),
+            ],
+        }
+
+    def test_dict_round_trip(self):
+        """Test the conversion from and to per-image lists of Bbox."""
+        store = BoxStore.from_dict(self.bboxes, dtype=np.int32)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.num_boxes, 3)
+        self.assertEqual(store.offsets.tolist(), [0, 1, 1, 3])
+        self.assertEqual(store.counts.tolist(), [1, 0, 2])
+        self.assertEqual(store.to_dict(), self.bboxes)
+        self.assertEqual(store["c"], BboxArray.from_bboxes(self.bboxes["c"]))
+        self.assertEqual(store.boxes("c").dtype, np.int32)
+        self.assertIn("b", store)
+        self.assertEqual(list(store), ["a", "b", "c"])
+        np.testing.assert_array_equal(store.labels("c"), [-1, -1])
+        self.assertTrue(np.isnan(store.scores("a")).all())
+
+    def test_appends(self):
+        """Test appending single images and bulk flat arrays, beyond the capacity."""
+        store = BoxStore()
+        rng = np.random.default_rng(0)
+        expected = {}
+        for k in range(50):
+            tl = rng.uniform(0, 100, size=(k % 4, 2))
+            coords = np.concatenate((tl, tl + 5), axis=1)
+            store.append(
+                k, coords, labels=np.full(k % 4, k), scores=np.full(k % 4, 0.5)
+            )
+            expected[k] = coords
+        first = store[49]
+
+        counts = [3, 0, 5]
+        coords = np.tile([[0.0, 0.0, 1.0, 1.0]], (8, 1))
+        store.extend(["x", "y", "z"], coords, counts, labels=np.arange(8))
+
+        self.assertEqual(len(store), 53)
+        for k, coords_k in expected.items():
+            np.testing.assert_array_equal(store[k].data, coords_k)
+            np.testing.assert_array_equal(store.labels(k), np.full(k % 4, k))
+        np.testing.assert_array_equal(first.data, expected[49])
+        np.testing.assert_array_equal(store.labels("z"), np.arange(3, 8))
+        self.assertEqual(len(store["y"]), 0)
+        self.assertEqual(len(store.flat_boxes), store.num_boxes)
+        self.assertTrue(np.isnan(store.scores("x")).all())
+
+    def test_errors(self):
+        """Test that invalid appends raise a ValueError and unknown images a KeyError."""
+        store = BoxStore.from_dict(self.bboxes)
+        box = [Bbox(left=0, top=0, right=1, bottom=1)]
+        with self.assertRaises(ValueError):
+            store.append("a", box)
+
+        with self.assertRaises(ValueError):
+            store.append("d", box, labels=[1, 2])
+
+        with self.assertRaises(ValueError):
+            store.append("d", box, labels=[1.5])
+
+        with self.assertRaises(ValueError):
+            store.extend(["d", "d"], box, [1, 0])
+
+        with self.assertRaises(ValueError):
+            store.extend(["d"], box, [2])
+
+        with self.assertRaises(KeyError):
+            store.boxes("d")
+
+        self.assertEqual(len(store), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()